@@ -0,0 +1,95 @@
+"""
+粒子系统基准测试
+
+在1000x600的离屏画布上保持指定数量的存活粒子，分别统计向量化更新(simulate)和批量绘制(draw)的
+单帧耗时，并与逐个粒子用Python循环更新、逐个调用blit的写法对比。需要安装NumPy。
+
+用法（在项目根目录下运行）:
+    python Benchmarks/ParticleBenchmark.py
+    python Benchmarks/ParticleBenchmark.py --counts 1000 5000 20000 --frames 60
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+# 无窗口运行，基准测试不需要真实的显示和音频设备
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+import UnityFrame.UnityFrameBase as ufb
+import UnityFrame.Components.Components as cp
+from UnityFrame.Components.ParticleSystem import ParticleSystem
+
+IMAGE = "Assets/Sprites/Effects/Particles_ash.png"
+DELTA_TIME = 1 / 60
+
+def build(count):
+    """创建一个粒子系统并一次发射count个长寿命的粒子"""
+    manager = ufb.GameObjectManager(canvasWeight=1000, canvasHeight=600, headless=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        gameObject = ufb.GameObject("Particles")
+        gameObject.addComponent(cp.Transform, (500, 300))
+        particles = gameObject.addComponent(ParticleSystem, IMAGE, max_particles=count, lifetime=(1000, 1000),
+                                            speed=(5, 30), spawn_area=(1000, 600), area=(0, 0, 23, 23), seed=1)
+    particles.emit(count)
+    return manager, particles
+
+def run_batched(count, frames):
+    """返回 (更新每帧毫秒, 绘制每帧毫秒)"""
+    manager, particles = build(count)
+    simulate_elapsed = draw_elapsed = 0.0
+    for _ in range(frames):
+        begin = time.perf_counter()
+        particles.simulate(DELTA_TIME)
+        middle = time.perf_counter()
+        particles.draw()
+        manager.flush_render_queue()
+        draw_elapsed += time.perf_counter() - middle
+        simulate_elapsed += middle - begin
+    return simulate_elapsed * 1000 / frames, draw_elapsed * 1000 / frames
+
+def run_naive(count, frames):
+    """同样的粒子用Python列表逐个更新、逐个blit，返回 (更新每帧毫秒, 绘制每帧毫秒)"""
+    manager, particles = build(count)
+    state = [[x, y, vx, vy, 0.0, life] for (x, y), (vx, vy), life in
+             zip(particles.positions.tolist(), particles.velocities.tolist(), particles.lifetimes.tolist())]
+    variants = particles.variants
+    levels = len(variants) - 1
+    half_width, half_height = particles.half_size
+    simulate_elapsed = draw_elapsed = 0.0
+    for _ in range(frames):
+        begin = time.perf_counter()
+        for particle in state:
+            particle[0] += particle[2] * DELTA_TIME
+            particle[1] += particle[3] * DELTA_TIME
+            particle[4] += DELTA_TIME
+        state = [particle for particle in state if particle[4] < particle[5]]
+        middle = time.perf_counter()
+        for x, y, _, _, age, life in state:
+            manager.canvas.blit(variants[min(int(age / life * levels + 0.5), levels)], (int(x - half_width), int(y - half_height)))
+        draw_elapsed += time.perf_counter() - middle
+        simulate_elapsed += middle - begin
+    return simulate_elapsed * 1000 / frames, draw_elapsed * 1000 / frames
+
+def main():
+    parser = argparse.ArgumentParser(description="ParticleSystem 基准测试")
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 2000, 5000, 10000])
+    parser.add_argument("--frames", type=int, default=60)
+    args = parser.parse_args()
+
+    pygame.init()
+    print("%8s %14s %14s %14s %14s %8s" % ("粒子", "逐个更新(ms)", "逐个绘制(ms)", "向量化更新(ms)", "批量绘制(ms)", "加速比"))
+    for count in args.counts:
+        naive_simulate, naive_draw = run_naive(count, args.frames)
+        simulate, draw = run_batched(count, args.frames)
+        print("%8d %14.3f %14.3f %14.3f %14.3f %7.1fx" % (count, naive_simulate, naive_draw, simulate, draw,
+                                                        (naive_simulate + naive_draw) / max(simulate + draw, 1e-9)))
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
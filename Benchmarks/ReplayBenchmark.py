@@ -0,0 +1,128 @@
+"""
+输入回放基准测试
+
+用脚本生成固定的操作场景（连续冲刺、连招攻击等），编码成输入录像后以
+Main.py --headless --offscreen --replay 快进回放，并用 --profile-frames 统计每帧耗时。
+同一个场景每次回放的输入完全一致，可以在每次改动后对比耗时是否回退。
+
+用法（在项目根目录下运行）:
+    python Benchmarks/ReplayBenchmark.py
+    python Benchmarks/ReplayBenchmark.py --scenarios dash_spam --frames 3600
+    python Benchmarks/ReplayBenchmark.py --replay my_run.hkin      # 回放自己用 --record 录制的文件
+    python Benchmarks/ReplayBenchmark.py --save-dir Benchmarks/Replays  # 保存生成的录像
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pygame
+import UnityFrame.UnityFrameBase as ufb
+
+def tap(frame, every, length=2, offset=0):
+    """每every帧按下length帧"""
+    return frame >= offset and (frame - offset) % every < length
+
+def dash_spam(frame):
+    """来回跑动并不停冲刺，偶尔在空中冲刺"""
+    keys = []
+    # 每90帧换一次方向，保持在地面范围内
+    keys.append(pygame.K_d if frame // 90 % 2 == 0 else pygame.K_a)
+    if tap(frame, 15):
+        keys.append(pygame.K_k)
+    if tap(frame, 120, 10, offset=60):
+        keys.append(pygame.K_SPACE)
+    return keys
+
+def attack_combo(frame):
+    """原地连续攻击，穿插上劈、跳劈和下劈"""
+    keys = []
+    if tap(frame, 8):
+        keys.append(pygame.K_j)
+    phase = frame // 120 % 4
+    if phase == 1:
+        keys.append(pygame.K_w)
+    elif phase == 2 and tap(frame, 60, 12):
+        keys.append(pygame.K_SPACE)
+    elif phase == 3:
+        if tap(frame, 60, 20):
+            keys.append(pygame.K_SPACE)
+        keys.append(pygame.K_s)
+    return keys
+
+def jump_walk(frame):
+    """边走边跳，包含二段跳"""
+    keys = [pygame.K_d if frame // 150 % 2 == 0 else pygame.K_a]
+    if tap(frame, 50, 14) or tap(frame, 50, 6, offset=20):
+        keys.append(pygame.K_SPACE)
+    return keys
+
+SCENARIOS = {
+    "dash_spam": dash_spam,
+    "attack_combo": attack_combo,
+    "jump_walk": jump_walk,
+}
+
+def build_recording(script, frames):
+    """运行脚本得到每帧的按键，编码为录像数据"""
+    tracked_keys = ufb.Input.get_instance().tracked_keys
+    masks = []
+    for frame in range(frames):
+        pressed = set(script(frame))
+        masks.append(sum(1 << bit for bit, key in enumerate(tracked_keys) if key in pressed))
+    return ufb.Input.encode_recording(tracked_keys, masks)
+
+def run_replay(replay_path, profile_prefix, offscreen):
+    """快进回放录像，返回逐帧耗时统计"""
+    command = [sys.executable, "Main.py", "--headless", "--replay", replay_path, "--profile-frames", profile_prefix]
+    if offscreen:
+        command.append("--offscreen")
+    result = subprocess.run(command, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr.decode(errors="replace"))
+        raise SystemExit("回放失败，返回码 %d" % result.returncode)
+    with open(profile_prefix + ".json", encoding="utf-8") as f:
+        return json.load(f)
+
+def report(name, profile):
+    stats = profile["stats_ms"]
+    frame = stats["frame"]
+    print("%-16s %8d %10.3f %10.3f %10.3f %10.3f" % (
+        name, profile["frames"], frame["mean"], frame["p50"], frame["p95"], frame["p99"]))
+    top = [item for item in stats if item.startswith(("update:", "fixUpdate:", "CollisionManager"))][:3]
+    print("%-16s 最耗时: %s" % ("", ", ".join("%s %.3f" % (item, stats[item]["p95"]) for item in top)))
+
+def main():
+    parser = argparse.ArgumentParser(description="输入回放基准测试")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--frames", type=int, default=1800)
+    parser.add_argument("--replay", nargs="*", default=[], help="额外回放的录像文件")
+    parser.add_argument("--no-render", action="store_true", help="不绘制画面，只统计逻辑耗时")
+    parser.add_argument("--save-dir", default=None, help="保存生成的场景录像")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        replays = []
+        for name in args.scenarios:
+            path = os.path.abspath(os.path.join(args.save_dir or folder, name + ".hkin"))
+            if args.save_dir:
+                os.makedirs(args.save_dir, exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(build_recording(SCENARIOS[name], args.frames))
+            replays.append((name, path))
+        for path in args.replay:
+            replays.append((os.path.splitext(os.path.basename(path))[0], os.path.abspath(path)))
+
+        print("%-16s %8s %10s %10s %10s %10s" % ("场景", "帧数", "平均ms", "p50ms", "p95ms", "p99ms"))
+        for name, path in replays:
+            report(name, run_replay(path, os.path.join(folder, name), not args.no_render))
+
+if __name__ == "__main__":
+    main()
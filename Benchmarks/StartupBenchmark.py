@@ -0,0 +1,66 @@
+"""
+冷启动基准测试
+
+在独立的子进程中以 --profile-startup --exit-after-frames 1 运行 Main.py，使用 SDL 的
+dummy 视频和音频驱动，统计从进程启动到第一帧画完的耗时，以及启动分析报告中各阶段的耗时。
+每次都是新进程，结果包含模块导入和图片解码等全部冷启动开销。
+
+用法（在项目根目录下运行）:
+    python Benchmarks/StartupBenchmark.py
+    python Benchmarks/StartupBenchmark.py --runs 10 --output startup.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_once(profile_prefix):
+    """运行一次Main.py，返回 (进程总耗时秒, 启动分析报告)"""
+    env = dict(os.environ)
+    env["SDL_VIDEODRIVER"] = "dummy"
+    env["SDL_AUDIODRIVER"] = "dummy"
+    env["PYGAME_HIDE_SUPPORT_PROMPT"] = "1"
+    command = [sys.executable, "Main.py", "--profile-startup", profile_prefix, "--exit-after-frames", "1"]
+    start = time.perf_counter()
+    result = subprocess.run(command, cwd=ROOT, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr.decode(errors="replace"))
+        raise SystemExit("Main.py 运行失败，返回码 %d" % result.returncode)
+    with open(profile_prefix + ".json", encoding="utf-8") as f:
+        return wall, json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(description="Main.py 冷启动基准测试")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", default=None, help="把每次运行的结果写成JSON，便于对比回归")
+    args = parser.parse_args()
+
+    walls = []
+    stages = {}  # 顶层阶段名 -> 每次的耗时(毫秒)
+    with tempfile.TemporaryDirectory() as folder:
+        for index in range(args.runs):
+            wall, report = run_once(os.path.join(folder, "run%d" % index))
+            walls.append(wall * 1000)
+            stages.setdefault("startup(to first frame)", []).append(report["duration_ms"])
+            for child in report["children"]:
+                stages.setdefault(child["name"], []).append(child["duration_ms"])
+            print("第 %d 次: 进程 %.1f ms, 第一帧 %.1f ms" % (index + 1, wall * 1000, report["duration_ms"]))
+
+    stages["process(wall)"] = walls
+    print("\n%-44s %10s %10s %10s" % ("阶段", "中位数ms", "最小ms", "最大ms"))
+    for name, values in stages.items():
+        print("%-44s %10.1f %10.1f %10.1f" % (name, statistics.median(values), min(values), max(values)))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"runs": args.runs, "stages_ms": stages}, f, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,7 @@ import os
 
 import UnityFrame.Components.Components as cp
 import UnityFrame.UnityFrameBase as ufb
+from UnityFrame.Profiler import StartupProfiler
 import pygame
 
 class PlayerController(ufb.Component):
@@ -15,6 +16,13 @@ class PlayerController(ufb.Component):
         # 添加一个重力禁用标记
         self.gravity_disabled = False
 
+        # 物理参数均以秒为单位，在固定步长的fixUpdate中积分，手感与渲染帧率无关
+        self.walkSpeed = 600           # 步行速度(像素/秒)
+
+        # 最近一次固定更新中产生、在渲染阶段绘制的特效 (Surface, 相对角色位置的偏移)
+        # 保留到下一次固定更新替换为止，不执行固定更新的渲染帧也照常绘制
+        self.pending_effects = []
+
     def awake(self):
         super().awake()
         self.animator=self.gameObject.getComponent(cp.Animator)
@@ -47,13 +55,13 @@ class PlayerController(ufb.Component):
     
         # 增加跳跃相关参数
         self.isGrounded = False
-        self.jumpForce = 12            # 初始跳跃力
-        self.jumpExtraForce = 0.5      # 每帧额外施加的向上力
+        self.jumpForce = 720           # 初始跳跃速度(像素/秒)
+        self.jumpExtraForce = 1800     # 按住跳跃键时额外施加的向上加速度(像素/秒²)
         self.jumpHoldMaxTime = 0.25    # 最大按住时间(秒)
         self.jumpCurrentHoldTime = 0   # 当前已按住时间
         self.isJumpButtonHeld = False  # 是否正在按住跳跃键
-        self.gravity = 0.7
-        self.velocity = 0
+        self.gravity = 2520            # 重力加速度(像素/秒²)
+        self.velocity = 0              # 竖直速度(像素/秒)，正值向下
         self.prev_position = (0, 0)
         self.canDoubleJump = False
         self.spaceKeyReleased = True   # 空格键是否已释放
@@ -70,8 +78,41 @@ class PlayerController(ufb.Component):
         self.stateMachine.initState(self.idleState)
         self.prev_position = self.gameObject.transform.position
 
-    def update(self,deltaTime):
-        super().update(deltaTime)
+    def onDestroy(self):
+        # 释放所有状态持有的图片，引用计数归零后可被资源缓存淘汰
+        for value in vars(self).values():
+            if isinstance(value, StateBase):
+                value.release_assets()
+        super().onDestroy()
+
+    def render(self):
+        # 绘制最近一次固定更新中各状态产生的特效，再让当前状态绘制自己的内容
+        self.draw_pending_effects()
+        if self.stateMachine.currentState is not None:
+            self.stateMachine.currentState.render()
+
+    def draw_effect(self, surface, position):
+        """状态在固定更新中调用，特效在渲染阶段绘制"""
+        # 记录相对角色当前位置的偏移，渲染时加上插值后的位置，特效与角色精灵一起平滑移动
+        pos_x, pos_y = self.gameObject.transform.position
+        self.pending_effects.append((surface, (position[0] - pos_x, position[1] - pos_y)))
+
+    def draw_pending_effects(self):
+        if not self.pending_effects:
+            return
+        manager = ufb.GameObjectManager.instance
+        render_x, render_y = self.gameObject.transform.getRenderPosition()
+        # 特效与角色在同一排序位置，按提交顺序画在角色之上
+        z, layer = self.animator.sortingOrder, self.animator.sortingLayer
+        for surface, (offset_x, offset_y) in self.pending_effects:
+            manager.blit_world(surface, (render_x + offset_x, render_y + offset_y), z=z, layer=layer)
+
+    def fixUpdate(self):
+        super().fixUpdate()
+        deltaTime = ufb.GameObjectManager.instance.fixed_delta_time
+
+        # 新的一步重新收集特效，替换上一步的
+        self.pending_effects = []
 
         # 保存当前位置，用于碰撞恢复
         self.prev_position = self.gameObject.transform.position
@@ -89,7 +130,7 @@ class PlayerController(ufb.Component):
             # 应用递减的余势
             current_momentum = self.dash_momentum * momentum_factor
             self.gameObject.transform.setPosition(
-                (self.gameObject.transform.position[0] + current_momentum, 
+                (self.gameObject.transform.position[0] + current_momentum * deltaTime, 
                 self.gameObject.transform.position[1])
             )
             
@@ -102,34 +143,25 @@ class PlayerController(ufb.Component):
 
         # 应用重力 - 添加对重力禁用标记的检查
         if not self.isGrounded and not self.gravity_disabled:
-            self.velocity += self.gravity
+            self.velocity += self.gravity * deltaTime
             self.gameObject.transform.setPosition(
                 (self.gameObject.transform.position[0], 
-                self.gameObject.transform.position[1] + self.velocity)
+                self.gameObject.transform.position[1] + self.velocity * deltaTime)
             )
 
         # 主动检查与地面的碰撞
         self.check_ground_collision()
 
-        self.stateMachine.currentState.update()
+        self.stateMachine.currentState.update(deltaTime)
 
     def check_ground_collision(self):
         """主动检查与地面的碰撞"""
-        # 找到所有地面物体
-        for game_object in ufb.GameObjectManager.instance.gameObjects:
-            if not game_object.active:
-                continue
-                
-            # 跳过自己
-            if game_object == self.gameObject:
-                continue
-                
-            ground_collider = game_object.getComponent(cp.BoxCollider)
-            if ground_collider and ground_collider.tag == "Ground" and ground_collider.enabled:
-                # 检查碰撞
-                if self.collider.check_collision(ground_collider):
-                    self.handle_ground_collision(ground_collider)
-                    return
+        # 通过碰撞管理器的标签索引只查询附近的地面碰撞体
+        collision_manager = ufb.GameObjectManager.instance.collision_manager
+        for ground_collider in collision_manager.overlap_box(self.collider.get_rect(), tags="Ground", exclude=self.collider):
+            if isinstance(ground_collider, cp.BoxCollider) and ground_collider.gameObject != self.gameObject:
+                self.handle_ground_collision(ground_collider)
+                return
 
         # 如果没有检测到地面碰撞，标记为未接地
         self.isGrounded = False
@@ -194,22 +226,50 @@ class StateBase:
         self.keys=None
 
         self.from_dash = False
-        self.initial_walk_speed = 10
+        self.initial_walk_speed = player.walkSpeed
         self.speed_decay_timer = 0
         self.speed_decay_duration = 0.3
 
         self.audio = ufb.AudioManager.get_instance()
+        self.assets = ufb.AssetCache.get_instance()
+        self.effects = ufb.EffectCache.get_instance()
+        self.asset_keys = []  # 本状态从资源缓存中持有的图片，用于释放引用
+
+    def load_frames(self, folder, prefix, suffix):
+        """从资源缓存加载目录下以prefix开头、suffix结尾的所有图片（按文件名排序）"""
+        frames = []
+        with StartupProfiler.get_instance().span(self.animName + ".load_frames(" + prefix + ")"):
+            for path in self.assets.list_folder(folder, prefix, suffix):
+                frames.append(self.load_image(path))
+        return frames
+
+    def load_image(self, path):
+        """从资源缓存加载单张图片"""
+        with StartupProfiler.get_instance().span(self.animName + ".load_image"):
+            image = self.assets.load(path)
+        self.asset_keys.append(path)
+        return image
+
+    def release_assets(self):
+        """释放本状态持有的所有图片引用"""
+        for path in self.asset_keys:
+            self.assets.release(path)
+        self.asset_keys = []
 
     def enter(self):
         self.animator.changeAnimation(self.animName)
 
-    def update(self):
-        self.keys=pygame.key.get_pressed()
+    def update(self, deltaTime):
+        self.keys=ufb.Input.get_pressed()
         pass
 
     def exit(self):
         pass
 
+    def render(self):
+        """渲染阶段调用，状态需要额外绘制的内容在这里提交；固定更新中产生的特效用player.draw_effect"""
+        pass
+
     def play_sound(self, sound_name):
         """播放指定音效"""
         self.audio.play_sound(sound_name)
@@ -222,16 +282,8 @@ class IdleState(StateBase):
         base_path = "Assets/Sprites/Knight"
         Action = "Idle"  # 可以改为其他动作如"Attack", "Dash"等
 
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                             if f.startswith(Action) and f.endswith('.PNG')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim=cp.SpriteAnimation("Idle",ActionFrameList,0.05)
         self.animator.addAnimation(ActionAnim)
@@ -242,8 +294,8 @@ class IdleState(StateBase):
         # 停止之前的所有声音效果（包括下落音效）
         pygame.mixer.stop()  
         pass
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
 
         # 重置跳跃相关标志，为新的跳跃周期准备
         if self.player.isGrounded:
@@ -286,15 +338,8 @@ class WalkStartState(StateBase):
         # 设置图片路径
         base_path = "Assets/Sprites/Knight/Walk"
         Action = "WalkStart"  # 可以改为其他动作如"Attack", "Dash"等
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                             if f.startswith(Action) and f.endswith('.PNG')])
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim = cp.SpriteAnimation("WalkStart", ActionFrameList, 0.08, loop=False) # 起步动画不循环
         self.animator.addAnimation(ActionAnim)
@@ -318,11 +363,11 @@ class WalkStartState(StateBase):
             self.speed_decay_timer = 0
             self.speed_decay_duration = 0.3  # 在0.3秒内逐渐降低到正常步行速度
         else:
-            self.initial_walk_speed = 10  # 正常步行速度
+            self.initial_walk_speed = self.player.walkSpeed  # 正常步行速度
 
         pass
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
 
         # self.player.dash_momentum = 0
         # self.player.dash_momentum_timer = 0
@@ -358,21 +403,21 @@ class WalkStartState(StateBase):
 
         # 计算当前应用的速度
         if self.from_dash:
-            self.speed_decay_timer += 0.016
+            self.speed_decay_timer += deltaTime
             decay_factor = max(0, 1 - (self.speed_decay_timer / self.speed_decay_duration))
-            current_speed = 10 + (self.initial_walk_speed - 10) * decay_factor
+            current_speed = self.player.walkSpeed + (self.initial_walk_speed - self.player.walkSpeed) * decay_factor
         else:
-            current_speed = 10
+            current_speed = self.player.walkSpeed
         
         # 移动时应用当前速度
         if self.keys[pygame.K_a]:
             self.player.gameObject.transform.setPosition(
-                (self.player.gameObject.transform.position[0] - current_speed, 
+                (self.player.gameObject.transform.position[0] - current_speed * deltaTime, 
                  self.player.gameObject.transform.position[1]))
             self.animator.flipX = False
         elif self.keys[pygame.K_d]:
             self.player.gameObject.transform.setPosition(
-                (self.player.gameObject.transform.position[0] + current_speed, 
+                (self.player.gameObject.transform.position[0] + current_speed * deltaTime, 
                  self.player.gameObject.transform.position[1]))
             self.animator.flipX = True
         else:
@@ -392,15 +437,8 @@ class WalkLoopState(StateBase):
         # 设置图片路径
         base_path = "Assets/Sprites/Knight/Walk"
         Action = "WalkLoop"  # 可以改为其他动作如"Attack", "Dash"等
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                             if f.startswith(Action) and f.endswith('.PNG')])
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim = cp.SpriteAnimation("WalkLoop", ActionFrameList, 0.05) 
         self.animator.addAnimation(ActionAnim)
@@ -421,7 +459,7 @@ class WalkLoopState(StateBase):
             self.speed_decay_timer = prev_state.speed_decay_timer
             self.speed_decay_duration = prev_state.speed_decay_duration
         else:
-            self.initial_walk_speed = 10
+            self.initial_walk_speed = self.player.walkSpeed
             self.from_dash = False
             self.speed_decay_timer = 0
             self.speed_decay_duration = 0.3
@@ -430,8 +468,8 @@ class WalkLoopState(StateBase):
         self.lastFacingRight = True
         pass
 
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
  
         currentFacingRight = self.animator.flipX  # 当前朝向
 
@@ -460,16 +498,16 @@ class WalkLoopState(StateBase):
 
         # 计算当前应用的速度
         if self.from_dash:
-            self.speed_decay_timer += 0.016
+            self.speed_decay_timer += deltaTime
             decay_factor = max(0, 1 - (self.speed_decay_timer / self.speed_decay_duration))
-            current_speed = 10 + (self.initial_walk_speed - 10) * decay_factor
+            current_speed = self.player.walkSpeed + (self.initial_walk_speed - self.player.walkSpeed) * decay_factor
         else:
-            current_speed = 10
+            current_speed = self.player.walkSpeed
 
         # 移动
         if self.keys[pygame.K_a]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] - current_speed, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] - current_speed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX=False
             # 检测是否转向
             if currentFacingRight != self.animator.flipX:
@@ -477,7 +515,7 @@ class WalkLoopState(StateBase):
 
         elif self.keys[pygame.K_d]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] + current_speed, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] + current_speed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX=True
             # 检测是否转向
             if currentFacingRight != self.animator.flipX:
@@ -503,16 +541,8 @@ class JumpStartState(StateBase):
         base_path = "Assets/Sprites/Knight/Jump"
         Action = "Jump"  # 可以改为其他动作如"Attack", "Dash"等
 
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                                if f.startswith(Action) and f.endswith('.PNG')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim=cp.SpriteAnimation("Jump",ActionFrameList,0.05,loop=False)
         self.animator.addAnimation(ActionAnim)
@@ -540,18 +570,18 @@ class JumpStartState(StateBase):
         self.player.spaceKeyReleased = False  # 重置释放标记
         pass
 
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
 
         # 检查是否持续按住跳跃键
         if self.keys[pygame.K_SPACE] and self.player.isJumpButtonHeld:
             # 增加持续按住时间
-            self.player.jumpCurrentHoldTime += 0.016  # 假设16ms每帧
+            self.player.jumpCurrentHoldTime += deltaTime
             
             # 如果未超过最大持续时间，继续施加向上的力
             if self.player.jumpCurrentHoldTime <= self.player.jumpHoldMaxTime:
                 # 额外向上力（负值表示向上）
-                self.player.velocity -= self.player.jumpExtraForce
+                self.player.velocity -= self.player.jumpExtraForce * deltaTime
         else:
             # 如果释放了跳跃键，停止施加额外的向上力
             self.player.isJumpButtonHeld = False
@@ -594,11 +624,11 @@ class JumpStartState(StateBase):
         # 左右横移
         if self.keys[pygame.K_a]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] - 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] - self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX=False
         elif self.keys[pygame.K_d]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] + 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] + self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX=True
         pass
     def exit(self):
@@ -613,16 +643,8 @@ class JumpLoopState(StateBase):
         base_path = "Assets/Sprites/Knight/Jump"
         Action = "JumpLoop"  # 可以改为其他动作如"Attack", "Dash"等
 
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                                if f.startswith(Action) and f.endswith('.PNG')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim=cp.SpriteAnimation("JumpLoop",ActionFrameList,0.05)
         self.animator.addAnimation(ActionAnim)
@@ -635,18 +657,18 @@ class JumpLoopState(StateBase):
         self.play_sound("falling")
 
         pass
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
 
         # 继续检查是否持续按住跳跃键
         if self.keys[pygame.K_SPACE] and self.player.isJumpButtonHeld:
             # 增加持续按住时间
-            self.player.jumpCurrentHoldTime += 0.016  # 假设16ms每帧
+            self.player.jumpCurrentHoldTime += deltaTime
             
             # 如果未超过最大持续时间，继续施加向上的力
             if self.player.jumpCurrentHoldTime <= self.player.jumpHoldMaxTime:
                 # 额外向上力
-                self.player.velocity -= self.player.jumpExtraForce
+                self.player.velocity -= self.player.jumpExtraForce * deltaTime
         else:
             # 如果释放了跳跃键，停止施加额外的向上力
             self.player.isJumpButtonHeld = False
@@ -685,11 +707,11 @@ class JumpLoopState(StateBase):
         # 左右横移
         if self.keys[pygame.K_a]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] - 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] - self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX=False
         elif self.keys[pygame.K_d]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] + 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] + self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX=True
 
         pass
@@ -707,16 +729,8 @@ class JumpLandState(StateBase):
         base_path = "Assets/Sprites/Knight/Jump"
         Action = "Land"  # 可以改为其他动作如"Attack", "Dash"等
 
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                                if f.startswith(Action) and f.endswith('.PNG')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim=cp.SpriteAnimation("JumpLand",ActionFrameList,0.05,loop=False)
         self.animator.addAnimation(ActionAnim)
@@ -742,13 +756,13 @@ class JumpLandState(StateBase):
         pass
 
         pass
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
 
         # if self.animator.currentAnimation.finished:
         #     self.player.stateMachine.changeState(self.player.idleState)
 
-        self.timeInState += 0.016  # 假设每帧约16ms
+        self.timeInState += deltaTime
         
         # 允许在落地缓冲期过后立即接受跳跃输入
         if self.timeInState > self.landBuffer:
@@ -775,11 +789,11 @@ class JumpLandState(StateBase):
 
         if self.keys[pygame.K_a]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] - 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] - self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX=False
         elif self.keys[pygame.K_d]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] + 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] + self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX=True
         pass
     def exit(self):
@@ -794,16 +808,8 @@ class DoubleJumpState(StateBase):
         base_path = "Assets/Sprites/Knight"
         Action = "DoubleJump"  # 可以改为其他动作如"Attack", "Dash"等
 
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                                if f.startswith(Action) and f.endswith('.PNG')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim=cp.SpriteAnimation("DoubleJump",ActionFrameList,0.05,loop=False)
         self.animator.addAnimation(ActionAnim)
@@ -820,13 +826,7 @@ class DoubleJumpState(StateBase):
         self.effect_scale = 0.9  # 特效缩放比例
         
         effect_path = "Assets/Sprites/Knight/DoubleJumpEffect"
-        effect_frames = sorted([f for f in os.listdir(effect_path) 
-                                if f.startswith("doublejump_effect") and f.endswith('.png')])
-            
-        for img_file in effect_frames:
-            img_path = os.path.join(effect_path, img_file)
-            effect_image = pygame.image.load(img_path).convert_alpha()
-            self.dashEffects.append(effect_image)
+        self.dashEffects.extend(self.load_frames(effect_path, "doublejump_effect", '.png'))
 
 
     def enter(self):
@@ -859,29 +859,12 @@ class DoubleJumpState(StateBase):
         # 获取当前角色位置
         pos_x, pos_y = self.player.gameObject.transform.position
         
-        # 获取特效图像并缩放
-        effect_image = self.dashEffects[frame_index]
-        
         # 使用传入的缩放系数，如果没传则使用默认值
         actual_scale = scale_factor if scale_factor is not None else self.effect_scale
         
-        # 缩放特效
-        original_width = effect_image.get_width()
-        original_height = effect_image.get_height()
-        new_width = int(original_width * actual_scale)
-        new_height = int(original_height * actual_scale)
-        effect_image = pygame.transform.scale(effect_image, (new_width, new_height))
-        
-        
-        # 根据朝向翻转特效
-        if self.animator.flipX == True:  # 角色朝右
-            flipped_effect = effect_image  # 不需要翻转
-        else:  # 角色朝左
-            flipped_effect = pygame.transform.flip(effect_image, True, False)
-            
-        # 制作一个带透明度的特效副本
-        effect_copy = flipped_effect.copy()
-        effect_copy.set_alpha(self.dashEffectAlpha)
+        # 从特效缓存获取已缩放、按朝向翻转(角色朝左时翻转)并带透明度的特效
+        effect_copy = self.effects.get(self.dashEffects[frame_index], actual_scale,
+                                       not self.animator.flipX, self.dashEffectAlpha)
         
         # 计算特效中心点 - 确保特效居中显示在角色周围
         effect_center_x = pos_x - effect_copy.get_width() // 2
@@ -891,22 +874,21 @@ class DoubleJumpState(StateBase):
         draw_x = effect_center_x + self.effectOffsetX
         draw_y = effect_center_y + self.effectOffsetY
         
-        # 将特效绘制到游戏画布上，确保它在角色下方
-        # 我们直接绘制到主画布上，但在所有游戏对象之前
-        ufb.GameObjectManager.instance.canvas.blit(effect_copy, (draw_x, draw_y))
+        # 特效交给PlayerController在渲染阶段绘制到画布上
+        self.player.draw_effect(effect_copy, (draw_x, draw_y))
 
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
 
         # 检查是否持续按住跳跃键
         if self.keys[pygame.K_SPACE] and self.player.isJumpButtonHeld:
             # 增加持续按住时间
-            self.player.jumpCurrentHoldTime += 0.016  # 假设16ms每帧
+            self.player.jumpCurrentHoldTime += deltaTime
             
             # 如果未超过最大持续时间，继续施加向上的力
             if self.player.jumpCurrentHoldTime <= self.player.jumpHoldMaxTime:
                 # 额外向上力，二段跳的额外力可以稍微小一点
-                self.player.velocity -= self.player.jumpExtraForce * 0.95
+                self.player.velocity -= self.player.jumpExtraForce * 0.95 * deltaTime
         else:
             # 如果释放了跳跃键，停止施加额外的向上力
             self.player.isJumpButtonHeld = False
@@ -945,11 +927,11 @@ class DoubleJumpState(StateBase):
         # 左右横移
         if self.keys[pygame.K_a]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] - 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] - self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX=False
         elif self.keys[pygame.K_d]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] + 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] + self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX=True
 
     def exit(self):
@@ -965,16 +947,8 @@ class DashState(StateBase):
         base_path = "Assets/Sprites/Knight"
         Action = "Dash"  # 可以改为其他动作如"Attack", "Dash"等
 
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                                if f.startswith(Action) and f.endswith('.PNG')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim=cp.SpriteAnimation("Dash",ActionFrameList,0.05,loop=False)
         self.animator.addAnimation(ActionAnim)
@@ -990,19 +964,13 @@ class DashState(StateBase):
         
 
         effect_path = "Assets/Sprites/Knight/DashEffect"
-        effect_frames = sorted([f for f in os.listdir(effect_path) 
-                                if f.startswith("dash_effect") and f.endswith('.png')])
-            
-        for img_file in effect_frames:
-            img_path = os.path.join(effect_path, img_file)
-            effect_image = pygame.image.load(img_path).convert_alpha()
-            self.dashEffects.append(effect_image)
+        self.dashEffects.extend(self.load_frames(effect_path, "dash_effect", '.png'))
 
 
 
         # Dash属性参数
-        self.dashSpeed = 35  # 每帧移动速度
-        self.dashDuration = 8  # 冲刺持续多少帧
+        self.dashSpeed = 2100  # 冲刺速度(像素/秒)
+        self.dashDuration = 0.13  # 冲刺持续时间(秒)，约8个物理步
         self.dashProgress = 0  # 记录冲刺进度
         self.dashDirection = 0  # 冲刺方向 (-1为左, 1为右)
 
@@ -1020,13 +988,13 @@ class DashState(StateBase):
         self.dashProgress = 0  # 重置冲刺进度
         pass
         
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
         
         # 如果冲刺还未完成，继续移动
         if self.dashProgress < self.dashDuration:
             # 计算当前帧的移动距离
-            moveDistance = self.dashSpeed * self.dashDirection
+            moveDistance = self.dashSpeed * self.dashDirection * deltaTime
             
             # 应用移动
             self.player.gameObject.transform.setPosition(
@@ -1040,10 +1008,10 @@ class DashState(StateBase):
             self.draw_dash_effect(current_frame_index,scale_factor=0.6) # 可以传参数
                  
             # 增加冲刺进度
-            self.dashProgress += 1
+            self.dashProgress += deltaTime
         
-        # 判断冲刺是否接近结束，预先判断玩家按键状态
-        if self.dashProgress >= self.dashDuration - 2 and not self.animator.currentAnimation.finished:
+        # 判断冲刺是否接近结束(最后约2个物理步)，预先判断玩家按键状态
+        if self.dashProgress >= self.dashDuration - 0.04 and not self.animator.currentAnimation.finished:
             # 预读取按键状态，为接下来的状态转换做准备
             if self.keys[pygame.K_a] or self.keys[pygame.K_d]:
                 # 可以预先设置角色朝向
@@ -1062,9 +1030,9 @@ class DashState(StateBase):
         
         # 提供更强的余势和更长的持续时间
         if self.dashDirection > 0:  # 向右冲刺
-            self.player.dash_momentum = 15  # 增加余势强度
+            self.player.dash_momentum = 900  # 增加余势强度(像素/秒)
         else:  # 向左冲刺
-            self.player.dash_momentum = -15
+            self.player.dash_momentum = -900
             
         self.player.dash_momentum_timer = 0
         self.player.dash_momentum_duration = 0.2  # 增加持续时间
@@ -1084,28 +1052,10 @@ class DashState(StateBase):
         # 获取当前特效帧
         effect_image = self.dashEffects[frame_index]
         
-        # 应用缩放 - 根据传入的缩放系数调整特效大小
-        if scale_factor != 1.0:
-            original_width = effect_image.get_width()
-            original_height = effect_image.get_height()
-            new_width = int(original_width * scale_factor)
-            new_height = int(original_height * scale_factor)
-            effect_image = pygame.transform.scale(effect_image, (new_width, new_height))
-        
-         # 根据朝向翻转特效
-        if self.animator.flipX == True:  # 角色朝右
-            flipped_effect = pygame.transform.flip(effect_image, True, False)         
-        else:  # 角色朝左
-            flipped_effect = effect_image
-            
-        # 制作一个带透明度的特效副本
-        effect_copy = flipped_effect.copy()
-        # 应用透明度
-        effect_copy.set_alpha(self.dashEffectAlpha)
-        
-        # 计算特效中心点
-        effect_center_x = pos_x - effect_copy.get_width() // 2
-        effect_center_y = pos_y - effect_copy.get_height() // 2
+        # 特效中心点只与缩放后的尺寸有关，翻转和透明度不影响尺寸
+        effect_base = self.effects.get(effect_image, scale_factor)
+        effect_center_x = pos_x - effect_base.get_width() // 2
+        effect_center_y = pos_y - effect_base.get_height() // 2
         
         # 从中心点应用偏移
         draw_x = effect_center_x + self.effectOffsetX
@@ -1113,9 +1063,9 @@ class DashState(StateBase):
         
         # 在冲刺路径上留下残影 - 根据冲刺方向调整位置
         for i in range(1, 4):  # 创建3个残影
-            # 每个残影的透明度递减
+            # 每个残影的透明度递减，角色朝右时翻转；同一组合只烘焙一次
             trail_alpha = self.dashEffectAlpha // (i + 1)
-            effect_copy.set_alpha(trail_alpha)
+            trail_effect = self.effects.get(effect_image, scale_factor, self.animator.flipX == True, trail_alpha)
             
             # 计算残影位置 - 在角色身后
             trail_offset = -self.dashDirection * i * 20  # 根据冲刺方向和距离调整
@@ -1123,10 +1073,7 @@ class DashState(StateBase):
             trail_y = draw_y
             
             # 绘制残影
-            ufb.GameObjectManager.instance.canvas.blit(effect_copy, (trail_x, trail_y))
-
-        # 设置回原透明度用于下次绘制
-        effect_copy.set_alpha(self.dashEffectAlpha)
+            self.player.draw_effect(trail_effect, (trail_x, trail_y))
 
 class JumpDashState(StateBase):
     def __init__(self, animName, player, animator):
@@ -1136,16 +1083,8 @@ class JumpDashState(StateBase):
         base_path = "Assets/Sprites/Knight"
         Action = "Dash"  # 可以改为其他动作如"Attack", "Dash"等
 
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                                if f.startswith(Action) and f.endswith('.PNG')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim=cp.SpriteAnimation("JumpDash",ActionFrameList,0.05,loop=False)
         self.animator.addAnimation(ActionAnim)
@@ -1158,18 +1097,12 @@ class JumpDashState(StateBase):
         
 
         effect_path = "Assets/Sprites/Knight/DashEffect"
-        effect_frames = sorted([f for f in os.listdir(effect_path) 
-                                if f.startswith("dash_effect") and f.endswith('.png')])
-            
-        for img_file in effect_frames:
-            img_path = os.path.join(effect_path, img_file)
-            effect_image = pygame.image.load(img_path).convert_alpha()
-            self.dashEffects.append(effect_image)
+        self.dashEffects.extend(self.load_frames(effect_path, "dash_effect", '.png'))
 
 
         # Dash属性参数
-        self.dashSpeed = 35  # 每帧移动速度
-        self.dashDuration = 8  # 冲刺持续多少帧
+        self.dashSpeed = 2100  # 冲刺速度(像素/秒)
+        self.dashDuration = 0.13  # 冲刺持续时间(秒)，约8个物理步
         self.dashProgress = 0  # 记录冲刺进度
         self.dashDirection = 0  # 冲刺方向 (-1为左, 1为右)
 
@@ -1189,13 +1122,13 @@ class JumpDashState(StateBase):
         self.dashProgress = 0  # 重置冲刺进度
         pass
         
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
         
         # 如果冲刺还未完成，继续移动
         if self.dashProgress < self.dashDuration:
             # 计算当前帧的移动距离
-            moveDistance = self.dashSpeed * self.dashDirection
+            moveDistance = self.dashSpeed * self.dashDirection * deltaTime
             
             # 应用移动
             self.player.gameObject.transform.setPosition(
@@ -1207,10 +1140,10 @@ class JumpDashState(StateBase):
             self.draw_dash_effect(current_frame_index,scale_factor=0.6)
 
             # 增加冲刺进度
-            self.dashProgress += 1
+            self.dashProgress += deltaTime
 
-        # 判断冲刺是否接近结束，预先判断玩家按键状态
-        if self.dashProgress >= self.dashDuration - 2 and not self.animator.currentAnimation.finished:
+        # 判断冲刺是否接近结束(最后约2个物理步)，预先判断玩家按键状态
+        if self.dashProgress >= self.dashDuration - 0.04 and not self.animator.currentAnimation.finished:
             # 预读取按键状态，为接下来的状态转换做准备
             if self.keys[pygame.K_a] or self.keys[pygame.K_d]:
                 # 可以预先设置角色朝向
@@ -1226,9 +1159,9 @@ class JumpDashState(StateBase):
         
         # 提供更强的余势和更长的持续时间
         if self.dashDirection > 0:  # 向右冲刺
-            self.player.dash_momentum = 15  # 增加余势强度
+            self.player.dash_momentum = 900  # 增加余势强度(像素/秒)
         else:  # 向左冲刺
-            self.player.dash_momentum = -15
+            self.player.dash_momentum = -900
             
         self.player.dash_momentum_timer = 0
         self.player.dash_momentum_duration = 0.2  # 增加持续时间
@@ -1248,28 +1181,10 @@ class JumpDashState(StateBase):
         # 获取当前特效帧
         effect_image = self.dashEffects[frame_index]
         
-        # 应用缩放 - 根据传入的缩放系数调整特效大小
-        if scale_factor != 1.0:
-            original_width = effect_image.get_width()
-            original_height = effect_image.get_height()
-            new_width = int(original_width * scale_factor)
-            new_height = int(original_height * scale_factor)
-            effect_image = pygame.transform.scale(effect_image, (new_width, new_height))
-        
-        # 根据朝向翻转特效
-        if self.animator.flipX == True:  # 角色朝右
-            flipped_effect = pygame.transform.flip(effect_image, True, False)         
-        else:  # 角色朝左
-            flipped_effect = effect_image
-            
-        # 制作一个带透明度的特效副本
-        effect_copy = flipped_effect.copy()
-        # 应用透明度
-        effect_copy.set_alpha(self.dashEffectAlpha)
-        
-        # 计算特效中心点
-        effect_center_x = pos_x - effect_copy.get_width() // 2
-        effect_center_y = pos_y - effect_copy.get_height() // 2
+        # 特效中心点只与缩放后的尺寸有关，翻转和透明度不影响尺寸
+        effect_base = self.effects.get(effect_image, scale_factor)
+        effect_center_x = pos_x - effect_base.get_width() // 2
+        effect_center_y = pos_y - effect_base.get_height() // 2
         
         # 从中心点应用偏移
         draw_x = effect_center_x + self.effectOffsetX
@@ -1277,9 +1192,9 @@ class JumpDashState(StateBase):
         
         # 在冲刺路径上留下残影 - 根据冲刺方向调整位置
         for i in range(1, 4):  # 创建3个残影
-            # 每个残影的透明度递减
+            # 每个残影的透明度递减，角色朝右时翻转；同一组合只烘焙一次
             trail_alpha = self.dashEffectAlpha // (i + 1)
-            effect_copy.set_alpha(trail_alpha)
+            trail_effect = self.effects.get(effect_image, scale_factor, self.animator.flipX == True, trail_alpha)
             
             # 计算残影位置 - 在角色身后
             trail_offset = -self.dashDirection * i * 20  # 根据冲刺方向和距离调整
@@ -1287,10 +1202,7 @@ class JumpDashState(StateBase):
             trail_y = draw_y
             
             # 绘制残影
-            ufb.GameObjectManager.instance.canvas.blit(effect_copy, (trail_x, trail_y))
-
-        # 设置回原透明度用于下次绘制
-        effect_copy.set_alpha(self.dashEffectAlpha)
+            self.player.draw_effect(trail_effect, (trail_x, trail_y))
 
 
 class AttackState(StateBase):
@@ -1301,22 +1213,14 @@ class AttackState(StateBase):
         base_path = "Assets/Sprites/Knight/Attack/Attack"
         Action = "Attack"  # 可以改为其他动作如"Attack", "Dash"等
 
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                             if f.startswith(Action) and f.endswith('.PNG')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim=cp.SpriteAnimation("Attack",ActionFrameList,0.05,loop=False)
         self.animator.addAnimation(ActionAnim)
 
         effect_path = os.path.join("Assets/Sprites/Knight/Attack/Attack/AttackEffect", "AttackEffect_01.PNG")
-        self.effect_image = pygame.image.load(effect_path).convert_alpha()
+        self.effect_image = self.load_image(effect_path)
 
         # 初始化攻击相关变量
         self.attackTriggered = False
@@ -1349,19 +1253,19 @@ class AttackState(StateBase):
             self.was_grounded = True
         
         # 获取键盘状态
-        self.keys = pygame.key.get_pressed()
+        self.keys = ufb.Input.get_pressed()
         
         if self.keys[pygame.K_j]:
             self.attack_key_released = False
         else:
             self.attack_key_released = True
 
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
         
         # 更新连击窗口计时器
         if self.combo_window_active:
-            self.combo_window_timer += 0.016  # 假设16ms每帧
+            self.combo_window_timer += deltaTime
             
             # 检查是否已释放攻击键并再次按下（用于连击）
             if self.attack_key_released and self.keys[pygame.K_j]:
@@ -1394,10 +1298,10 @@ class AttackState(StateBase):
                             self.player.gameObject.transform.position[1])
                 
                 # 特效绘制
-                flipped_effect = pygame.transform.flip(self.effect_image, self.animator.flipX, False)
-                ufb.GameObjectManager.instance.canvas.blit(flipped_effect, 
-                                                        (effect_pos[0] - self.effect_image.get_width()//2,
-                                                        effect_pos[1] - self.effect_image.get_height()//2))
+                flipped_effect = self.effects.get(self.effect_image, flipX=self.animator.flipX)
+                self.player.draw_effect(flipped_effect, 
+                                        (effect_pos[0] - self.effect_image.get_width()//2,
+                                        effect_pos[1] - self.effect_image.get_height()//2))
                 
         # 当动画完成时返回到相应状态
         if self.animator.currentAnimation.finished:
@@ -1413,13 +1317,13 @@ class AttackState(StateBase):
         # 可以在攻击时允许有限的移动
         if self.keys[pygame.K_a]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] - 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] - self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = False
             # 播放音效
             self.play_sound("run")
         elif self.keys[pygame.K_d]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] + 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] + self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = True
             # 播放音效
             self.play_sound("run")
@@ -1438,16 +1342,8 @@ class AttackTwiceState(StateBase):
         base_path = "Assets/Sprites/Knight/Attack/Attack"
         Action = "AttackTwice"  # 可以改为其他动作如"Attack", "Dash"等
 
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                             if f.startswith(Action) and f.endswith('.PNG')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim=cp.SpriteAnimation("AttackTwice",ActionFrameList,0.05,loop=False)
         self.animator.addAnimation(ActionAnim)
@@ -1455,7 +1351,7 @@ class AttackTwiceState(StateBase):
         # 加载二段攻击特效
 
         effect_path = os.path.join("Assets/Sprites/Knight/Attack/Attack/AttackTwiceEffect", "AttackTwiceEffect_01.PNG")
-        self.effect_image = pygame.image.load(effect_path).convert_alpha()
+        self.effect_image = self.load_image(effect_path)
 
             
         # 初始化攻击相关变量
@@ -1481,8 +1377,8 @@ class AttackTwiceState(StateBase):
             # 如果是从一段攻击来的，继承一段攻击的地面状态
             self.was_grounded = prev_state.was_grounded
         
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
         
         # 当攻击动画进行到一半时触发特效
         if not self.attackTriggered and self.animator.currentAnimation.currentFrame >= len(self.animator.currentAnimation.frames) // 2:
@@ -1498,10 +1394,10 @@ class AttackTwiceState(StateBase):
                             self.player.gameObject.transform.position[1])
                 
                 # 特效绘制
-                flipped_effect = pygame.transform.flip(self.effect_image, self.animator.flipX, False)
-                ufb.GameObjectManager.instance.canvas.blit(flipped_effect, 
-                                                        (effect_pos[0] - self.effect_image.get_width()//2,
-                                                        effect_pos[1] - self.effect_image.get_height()//2))
+                flipped_effect = self.effects.get(self.effect_image, flipX=self.animator.flipX)
+                self.player.draw_effect(flipped_effect, 
+                                        (effect_pos[0] - self.effect_image.get_width()//2,
+                                        effect_pos[1] - self.effect_image.get_height()//2))
                 
         # # 当动画完成时返回到相应状态
         # if self.animator.currentAnimation.finished:
@@ -1527,13 +1423,13 @@ class AttackTwiceState(StateBase):
         # 可以在攻击时允许有限的移动
         if self.keys[pygame.K_a]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] - 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] - self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = False
             # 播放音效
             self.play_sound("run")
         elif self.keys[pygame.K_d]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] + 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] + self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = True
             # 播放音效
             self.play_sound("run")
@@ -1551,22 +1447,14 @@ class AttackTopState(StateBase):
         base_path = "Assets/Sprites/Knight/Attack"
         Action = "AttackTop"  # 可以改为其他动作如"Attack", "Dash"等
 
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                             if f.startswith(Action) and f.endswith('.PNG')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim=cp.SpriteAnimation("AttackTop",ActionFrameList,0.05,loop=False)
         self.animator.addAnimation(ActionAnim)
 
         effect_path = os.path.join("Assets/Sprites/Knight/Attack/AttackTopEffect", "AttackTopEffect_01.PNG")
-        self.effect_image = pygame.image.load(effect_path).convert_alpha()
+        self.effect_image = self.load_image(effect_path)
 
         # 初始化攻击相关变量
         self.attackTriggered = False
@@ -1578,8 +1466,8 @@ class AttackTopState(StateBase):
         self.attackTriggered = False  # 重置触发状态
         self.animator.currentAnimation.finished = False  # 确保动画状态正确
 
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
         
         # 当攻击动画进行到一半时触发特效
         if not self.attackTriggered and self.animator.currentAnimation.currentFrame >= len(self.animator.currentAnimation.frames) // 2:
@@ -1597,10 +1485,10 @@ class AttackTopState(StateBase):
                 
                 # 特效绘制 - 可以根据游戏引擎实现方式调整
                 # 这里简单示例如何绘制
-                flipped_effect = pygame.transform.flip(self.effect_image, self.animator.flipX, False)
-                ufb.GameObjectManager.instance.canvas.blit(flipped_effect, 
-                                                        (effect_pos[0] - self.effect_image.get_width()//2,
-                                                        effect_pos[1] - self.effect_image.get_height()//2))
+                flipped_effect = self.effects.get(self.effect_image, flipX=self.animator.flipX)
+                self.player.draw_effect(flipped_effect, 
+                                        (effect_pos[0] - self.effect_image.get_width()//2,
+                                        effect_pos[1] - self.effect_image.get_height()//2))
                 
         # 当动画完成时返回到空闲状态
         if self.animator.currentAnimation.finished:
@@ -1609,13 +1497,13 @@ class AttackTopState(StateBase):
         # 可以在攻击时允许有限的移动
         if self.keys[pygame.K_a]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] - 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] - self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = False
             # 播放音效
             self.play_sound("run")
         elif self.keys[pygame.K_d]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] + 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] + self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = True
             # 播放音效
             self.play_sound("run")
@@ -1634,21 +1522,13 @@ class AttackBottomState(StateBase):
         base_path = "Assets/Sprites/Knight/Attack"
         Action = "AttackBottom"  # 可以改为其他动作如"Attack", "Dash"等
 
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                             if f.startswith(Action) and f.endswith('.PNG')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim=cp.SpriteAnimation("AttackBottom",ActionFrameList,0.05,loop=False)
         self.animator.addAnimation(ActionAnim)
         effect_path = os.path.join("Assets/Sprites/Knight/Attack/AttackBottomEffect", "AttackBottomEffect_01.PNG")
-        self.effect_image = pygame.image.load(effect_path).convert_alpha()
+        self.effect_image = self.load_image(effect_path)
 
         # 初始化攻击相关变量
         self.attackTriggered = False
@@ -1660,8 +1540,8 @@ class AttackBottomState(StateBase):
         self.attackTriggered = False  # 重置触发状态
         self.animator.currentAnimation.finished = False  # 确保动画状态正确
 
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
         
         # 当攻击动画进行到一半时触发特效
         if not self.attackTriggered and self.animator.currentAnimation.currentFrame >= len(self.animator.currentAnimation.frames) // 2:
@@ -1679,10 +1559,10 @@ class AttackBottomState(StateBase):
                 
                 # 特效绘制 - 可以根据游戏引擎实现方式调整
                 # 这里简单示例如何绘制
-                flipped_effect = pygame.transform.flip(self.effect_image, self.animator.flipX, False)
-                ufb.GameObjectManager.instance.canvas.blit(flipped_effect, 
-                                                        (effect_pos[0] - self.effect_image.get_width()//2,
-                                                        effect_pos[1] - self.effect_image.get_height()//2))
+                flipped_effect = self.effects.get(self.effect_image, flipX=self.animator.flipX)
+                self.player.draw_effect(flipped_effect, 
+                                        (effect_pos[0] - self.effect_image.get_width()//2,
+                                        effect_pos[1] - self.effect_image.get_height()//2))
                 
         # 当动画完成时返回到空闲状态
         if self.animator.currentAnimation.finished:
@@ -1691,13 +1571,13 @@ class AttackBottomState(StateBase):
         # 可以在攻击时允许有限的移动
         if self.keys[pygame.K_a]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] - 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] - self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = False
             # 播放音效
             self.play_sound("run")
         elif self.keys[pygame.K_d]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] + 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] + self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = True
             # 播放音效
             self.play_sound("run")
@@ -1718,22 +1598,14 @@ class JumpAttackState(StateBase):
         base_path = "Assets/Sprites/Knight/Attack/Attack"
         Action = "Attack"  # 可以改为其他动作如"Attack", "Dash"等
 
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                             if f.startswith(Action) and f.endswith('.PNG')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim=cp.SpriteAnimation("JumpAttack",ActionFrameList,0.05,loop=False)
         self.animator.addAnimation(ActionAnim)
 
         effect_path = os.path.join("Assets/Sprites/Knight/Attack/Attack/AttackEffect", "AttackEffect_01.PNG")
-        self.effect_image = pygame.image.load(effect_path).convert_alpha()
+        self.effect_image = self.load_image(effect_path)
 
         # 初始化攻击相关变量
         self.attackTriggered = False
@@ -1754,7 +1626,7 @@ class JumpAttackState(StateBase):
         self.attack_key_released = False     # 重置攻击键状态
         
         # 获取键盘状态
-        self.keys = pygame.key.get_pressed()
+        self.keys = ufb.Input.get_pressed()
         
         # 检查之前是否按住了J键
         if self.keys[pygame.K_j]:
@@ -1762,12 +1634,12 @@ class JumpAttackState(StateBase):
         else:
             self.attack_key_released = True
 
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
         
         # 更新连击窗口计时器
         if self.combo_window_active:
-            self.combo_window_timer += 0.016  # 假设16ms每帧
+            self.combo_window_timer += deltaTime
             
             # 检查是否已释放攻击键并再次按下（用于连击）
             if self.attack_key_released and self.keys[pygame.K_j]:
@@ -1800,10 +1672,10 @@ class JumpAttackState(StateBase):
                             self.player.gameObject.transform.position[1])
                 
                 # 特效绘制
-                flipped_effect = pygame.transform.flip(self.effect_image, self.animator.flipX, False)
-                ufb.GameObjectManager.instance.canvas.blit(flipped_effect, 
-                                                        (effect_pos[0] - self.effect_image.get_width()//2,
-                                                        effect_pos[1] - self.effect_image.get_height()//2))
+                flipped_effect = self.effects.get(self.effect_image, flipX=self.animator.flipX)
+                self.player.draw_effect(flipped_effect, 
+                                        (effect_pos[0] - self.effect_image.get_width()//2,
+                                        effect_pos[1] - self.effect_image.get_height()//2))
                 
         # 当动画完成时返回到空闲状态
         if self.animator.currentAnimation.finished:
@@ -1812,11 +1684,11 @@ class JumpAttackState(StateBase):
         # 可以在攻击时允许有限的移动
         if self.keys[pygame.K_a]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] - 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] - self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = False
         elif self.keys[pygame.K_d]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] + 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] + self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = True
         
     def exit(self):
@@ -1831,23 +1703,15 @@ class JumpAttackTwiceState(StateBase):
         base_path = "Assets/Sprites/Knight/Attack/Attack"
         Action = "AttackTwice"  # 可以改为其他动作如"Attack", "Dash"等
 
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                             if f.startswith(Action) and f.endswith('.PNG')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim = cp.SpriteAnimation("JumpAttackTwice", ActionFrameList, 0.05, loop=False)
         self.animator.addAnimation(ActionAnim)
         
         # 加载二段攻击特效
         effect_path = os.path.join("Assets/Sprites/Knight/Attack/Attack/AttackTwiceEffect", "AttackTwiceEffect_01.PNG")
-        self.effect_image = pygame.image.load(effect_path).convert_alpha()
+        self.effect_image = self.load_image(effect_path)
 
         # 初始化攻击相关变量
         self.attackTriggered = False
@@ -1863,8 +1727,8 @@ class JumpAttackTwiceState(StateBase):
         # 检查是否来自空中攻击状态
         self.fromJumpAttack = isinstance(prev_state, JumpAttackState)
         
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
         
         # 当攻击动画进行到一半时触发特效
         if not self.attackTriggered and self.animator.currentAnimation.currentFrame >= len(self.animator.currentAnimation.frames) // 2:
@@ -1880,10 +1744,10 @@ class JumpAttackTwiceState(StateBase):
                             self.player.gameObject.transform.position[1])
                 
                 # 特效绘制
-                flipped_effect = pygame.transform.flip(self.effect_image, self.animator.flipX, False)
-                ufb.GameObjectManager.instance.canvas.blit(flipped_effect, 
-                                                        (effect_pos[0] - self.effect_image.get_width()//2,
-                                                        effect_pos[1] - self.effect_image.get_height()//2))
+                flipped_effect = self.effects.get(self.effect_image, flipX=self.animator.flipX)
+                self.player.draw_effect(flipped_effect, 
+                                        (effect_pos[0] - self.effect_image.get_width()//2,
+                                        effect_pos[1] - self.effect_image.get_height()//2))
                 
         # 当动画完成时根据情况返回到相应状态
         if self.animator.currentAnimation.finished:
@@ -1893,11 +1757,11 @@ class JumpAttackTwiceState(StateBase):
         # 可以在攻击时允许有限的移动
         if self.keys[pygame.K_a]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] - 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] - self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = False
         elif self.keys[pygame.K_d]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] + 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] + self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = True
             
     def exit(self):
@@ -1912,22 +1776,14 @@ class JumpAttackTopState(StateBase):
         base_path = "Assets/Sprites/Knight/Attack"
         Action = "AttackTop"  # 可以改为其他动作如"Attack", "Dash"等
 
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                             if f.startswith(Action) and f.endswith('.PNG')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim=cp.SpriteAnimation("JumpAttackTop",ActionFrameList,0.05,loop=False)
         self.animator.addAnimation(ActionAnim)
 
         effect_path = os.path.join("Assets/Sprites/Knight/Attack/AttackTopEffect", "AttackTopEffect_01.PNG")
-        self.effect_image = pygame.image.load(effect_path).convert_alpha()
+        self.effect_image = self.load_image(effect_path)
 
         # 初始化攻击相关变量
         self.attackTriggered = False
@@ -1939,8 +1795,8 @@ class JumpAttackTopState(StateBase):
         self.attackTriggered = False  # 重置触发状态
         self.animator.currentAnimation.finished = False  # 确保动画状态正确
 
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
         
         # 当攻击动画进行到一半时触发特效
         if not self.attackTriggered and self.animator.currentAnimation.currentFrame >= len(self.animator.currentAnimation.frames) // 2:
@@ -1958,10 +1814,10 @@ class JumpAttackTopState(StateBase):
                 
                 # 特效绘制 - 可以根据游戏引擎实现方式调整
                 # 这里简单示例如何绘制
-                flipped_effect = pygame.transform.flip(self.effect_image, self.animator.flipX, False)
-                ufb.GameObjectManager.instance.canvas.blit(flipped_effect, 
-                                                        (effect_pos[0] - self.effect_image.get_width()//2,
-                                                        effect_pos[1] - self.effect_image.get_height()//2))
+                flipped_effect = self.effects.get(self.effect_image, flipX=self.animator.flipX)
+                self.player.draw_effect(flipped_effect, 
+                                        (effect_pos[0] - self.effect_image.get_width()//2,
+                                        effect_pos[1] - self.effect_image.get_height()//2))
                 
         # 当动画完成时返回到空闲状态
         if self.animator.currentAnimation.finished:
@@ -1970,11 +1826,11 @@ class JumpAttackTopState(StateBase):
         # 可以在攻击时允许有限的移动
         if self.keys[pygame.K_a]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] - 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] - self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = False
         elif self.keys[pygame.K_d]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] + 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] + self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = True
 
     def exit(self):
@@ -1989,22 +1845,14 @@ class JumpAttackBottomState(StateBase):
         base_path = "Assets/Sprites/Knight/Attack"
         Action = "AttackBottom"  # 可以改为其他动作如"Attack", "Dash"等
 
-        # 获取该动作目录下所有图片文件
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                             if f.startswith(Action) and f.endswith('.PNG')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()  # convert_alpha保留透明度
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.PNG')
 
         ActionAnim=cp.SpriteAnimation("JumpAttackBottom",ActionFrameList,0.05,loop=False)
         self.animator.addAnimation(ActionAnim)
 
         effect_path = os.path.join("Assets/Sprites/Knight/Attack/AttackBottomEffect", "AttackBottomEffect_01.PNG")
-        self.effect_image = pygame.image.load(effect_path).convert_alpha()
+        self.effect_image = self.load_image(effect_path)
 
         # 初始化攻击相关变量
         self.attackTriggered = False
@@ -2016,8 +1864,8 @@ class JumpAttackBottomState(StateBase):
         self.attackTriggered = False  # 重置触发状态
         self.animator.currentAnimation.finished = False  # 确保动画状态正确
 
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
         
         # 当攻击动画进行到一半时触发特效
         if not self.attackTriggered and self.animator.currentAnimation.currentFrame >= len(self.animator.currentAnimation.frames) // 2:
@@ -2035,10 +1883,10 @@ class JumpAttackBottomState(StateBase):
                 
                 # 特效绘制 - 可以根据游戏引擎实现方式调整
                 # 这里简单示例如何绘制
-                flipped_effect = pygame.transform.flip(self.effect_image, self.animator.flipX, False)
-                ufb.GameObjectManager.instance.canvas.blit(flipped_effect, 
-                                                        (effect_pos[0] - self.effect_image.get_width()//2,
-                                                        effect_pos[1] - self.effect_image.get_height()//2))
+                flipped_effect = self.effects.get(self.effect_image, flipX=self.animator.flipX)
+                self.player.draw_effect(flipped_effect, 
+                                        (effect_pos[0] - self.effect_image.get_width()//2,
+                                        effect_pos[1] - self.effect_image.get_height()//2))
                 
         # 当动画完成时返回到空闲状态
         if self.animator.currentAnimation.finished:
@@ -2047,11 +1895,11 @@ class JumpAttackBottomState(StateBase):
         # 可以在攻击时允许有限的移动
         if self.keys[pygame.K_a]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] - 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] - self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = False
         elif self.keys[pygame.K_d]:
             self.player.gameObject.transform.setPosition(
-            (self.player.gameObject.transform.position[0] + 10, self.player.gameObject.transform.position[1]))
+            (self.player.gameObject.transform.position[0] + self.player.walkSpeed * deltaTime, self.player.gameObject.transform.position[1]))
             self.animator.flipX = True
 
     def exit(self):
@@ -2066,15 +1914,8 @@ class SitState(StateBase):
         base_path = "Assets/Sprites/Knight"
         Action = "Sit"  # 坐下动作
 
-        ActionFrames = sorted([f for f in os.listdir(os.path.join(base_path, Action))
-                             if f.startswith(Action) and f.endswith('.png')])
-
-        # 加载所有图片到列表
-        ActionFrameList = []
-        for img_file in ActionFrames:
-            img_path = os.path.join(base_path, Action, img_file)
-            image = pygame.image.load(img_path).convert_alpha()
-            ActionFrameList.append(image)
+        # 从全局资源缓存获取该动作目录下所有图片，相同图片只解码一次
+        ActionFrameList = self.load_frames(os.path.join(base_path, Action), Action, '.png')
 
         ActionAnim = cp.SpriteAnimation("Sit", ActionFrameList, 0.05, loop=False)
         self.animator.addAnimation(ActionAnim)
@@ -2100,8 +1941,8 @@ class SitState(StateBase):
         # 如果有任何动作限制，可以在这里设置
         self.sit_time = 0  # 跟踪已坐时间
 
-    def update(self):
-        super().update()
+    def update(self, deltaTime):
+        super().update(deltaTime)
         
         # 确保在坐下状态下保持位置稳定
         self.player.velocity = 0
@@ -2156,7 +1997,7 @@ class Interactable(ufb.Component):
             
         # 检查交互键按下
         if self.is_in_range and self.can_interact:
-            keys = pygame.key.get_pressed()
+            keys = ufb.Input.get_pressed()
             if keys[pygame.K_e]:
                 self.interact(player)
                 
@@ -2181,7 +2022,8 @@ class BenchInteraction(Interactable):
         self.player_sitting = False
         self.prompt_font = None
         self.prompt_alpha = 0  # 透明度
-        self.fade_speed = 5  # 渐变速度
+        self.fade_speed = 300  # 渐变速度(透明度/秒)，与帧率无关
+        self.prompt_sortingLayer = 1  # 提示文字画在场景物体(排序层0)之上
         
         # 添加按键状态追踪
         self.e_key_pressed = False  # 追踪E键是否已经按下
@@ -2209,6 +2051,11 @@ class BenchInteraction(Interactable):
         else:
             self.prompt_alpha = 0
     
+    def render(self):
+        # 仅当提示可见时渲染
+        if self.prompt_alpha > 0:
+            self.render_interaction_prompt()
+
     def render_interaction_prompt(self):
         """渲染交互提示文本"""
         if not self.prompt_font:
@@ -2218,14 +2065,14 @@ class BenchInteraction(Interactable):
         text_surface = self.prompt_font.render(self.interaction_message, True, (255, 255, 255))
         
         # 设置文本透明度
-        text_surface.set_alpha(self.prompt_alpha)
+        text_surface.set_alpha(int(self.prompt_alpha))
         
         # 计算文本位置（在物体上方居中）
         pos_x = self.gameObject.transform.position[0] - text_surface.get_width() // 2
         pos_y = self.gameObject.transform.position[1] - 120  # 在物体上方显示
         
         # 绘制文本
-        ufb.GameObjectManager.instance.canvas.blit(text_surface, (pos_x, pos_y))
+        ufb.GameObjectManager.instance.blit_world(text_surface, (pos_x, pos_y), layer=self.prompt_sortingLayer)
     
     def interact(self, player):
         """执行与椅子的交互"""
@@ -2273,7 +2120,7 @@ class BenchInteraction(Interactable):
             self.cooldown_timer -= deltaTime
         
         # 获取当前键盘状态
-        keys = pygame.key.get_pressed()
+        keys = ufb.Input.get_pressed()
         
         # 检测E键的按下状态变化（从未按下到按下的瞬间）
         e_key_just_pressed = keys[pygame.K_e] and not self.e_key_pressed
@@ -2302,15 +2149,12 @@ class BenchInteraction(Interactable):
         elif not self.is_in_range and was_in_range:
             self.on_player_exit_range()
             
-        # 渐变显示/隐藏提示
+        # 渐变显示/隐藏提示，按帧时间推进
+        fade = self.fade_speed * deltaTime
         if self.is_in_range and self.prompt_alpha < 255:
-            self.prompt_alpha = min(255, self.prompt_alpha + self.fade_speed)
+            self.prompt_alpha = min(255, self.prompt_alpha + fade)
         elif not self.is_in_range and self.prompt_alpha > 0:
-            self.prompt_alpha = max(0, self.prompt_alpha - self.fade_speed)
-            
-        # 仅当提示可见时渲染
-        if self.prompt_alpha > 0:
-            self.render_interaction_prompt()
+            self.prompt_alpha = max(0, self.prompt_alpha - fade)
             
         # 检查交互键按下 - 只在按键刚按下时触发一次，并且冷却时间结束
         if self.is_in_range and self.can_interact and e_key_just_pressed and self.cooldown_timer <= 0:
@@ -1,31 +1,134 @@
-import pygame
-import UnityFrame.UnityFrameBase as ufb
-import UnityFrame.Components.Components as cp
-import Entity
-pygame.init()
+import argparse
+import os
+import time
+from UnityFrame.Profiler import StartupProfiler
+
+parser = argparse.ArgumentParser(description="Hollow Knight")
+parser.add_argument("--profile-startup", nargs="?", const="startup_profile", default=None, metavar="PREFIX",
+                    help="记录启动耗时，第一帧结束后写出 PREFIX.json 和 PREFIX.folded(火焰图格式)")
+parser.add_argument("--profile-frames", nargs="?", const="frame_profile", default=None, metavar="PREFIX",
+                    help="记录每帧各阶段、各物体update、各类组件的耗时，F3切换画面上的统计，退出时写出 PREFIX.csv 和 PREFIX.json")
+parser.add_argument("--exit-after-frames", type=int, default=0, metavar="N",
+                    help="运行N帧后自动退出，用于基准测试")
+parser.add_argument("--headless", action="store_true",
+                    help="不打开窗口、不绘制画面，按固定步长尽可能快地运行模拟")
+parser.add_argument("--offscreen", action="store_true",
+                    help="与--headless一起使用：仍然完整绘制画面，只是画到离屏Surface上")
+parser.add_argument("--dirty-rects", action="store_true",
+                    help="脏矩形渲染：背景烘焙成一层，每帧只擦除和提交变化的区域")
+parser.add_argument("--input-script", default=None, metavar="SCHEDULE",
+                    help="用脚本代替键盘输入，格式为 键名:起始帧-结束帧，逗号分隔，例如 d:10-40,k:20-25")
+parser.add_argument("--record", default=None, metavar="PATH",
+                    help="把每帧的按键录制到二进制录像文件，退出时保存")
+parser.add_argument("--replay", default=None, metavar="PATH",
+                    help="回放录像文件代替键盘输入，录像结束后退出；配合--headless即为快进回放")
+parser.add_argument("--level", default=None, metavar="PATH",
+                    help="在房间右侧流式加载分块关卡(由 Tools/LevelBuilder.py 生成)，例如 Assets/Levels/Demo")
+parser.add_argument("--particles", type=int, default=0, metavar="RATE",
+                    help="在房间中飘落灰烬粒子，RATE为每秒发射的数量(需要NumPy)")
+args = parser.parse_args()
+
+if args.headless:
+    # 无窗口运行时使用SDL的dummy驱动，不需要显示和音频设备
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+profiler = StartupProfiler.get_instance()
+if args.profile_startup:
+    profiler.enable()
+
+with profiler.span("import"):
+    import pygame
+    import UnityFrame.UnityFrameBase as ufb
+    import UnityFrame.Components.Components as cp
+    import Entity
+    import UnityFrame.Level as lv
+with profiler.span("pygame.init"):
+    pygame.init()
 
 pygame.display.set_caption("Hollow Knight")
 
-gameObjectManager=ufb.GameObjectManager() # 注册游戏物体管理器
+with profiler.span("GameObjectManager()"):
+    gameObjectManager=ufb.GameObjectManager(headless=args.headless, render=args.offscreen or not args.headless) # 注册游戏物体管理器
+
+if args.input_script:
+    ufb.Input.get_instance().set_script(args.input_script)
+if args.replay:
+    replay_frames = ufb.Input.get_instance().load_recording(args.replay)
+    if not args.exit_after_frames:
+        args.exit_after_frames = replay_frames
+
+# 如果已经用 Tools/AtlasBuilder.py 打包好骑士图集，则从图集加载动画帧
+if os.path.exists("Assets/Atlases/Knight.json"):
+    ufb.AssetCache.get_instance().register_atlas("Assets/Atlases/Knight.json")
+
+# 在后台线程中预加载场景用到的图片，主线程只负责显示加载画面并分批完成convert_alpha
+asset_cache = ufb.AssetCache.get_instance()
+preload_futures = asset_cache.preload_folder("Assets/Sprites/Knight")
+preload_futures += asset_cache.preload([
+    "Assets/background.png",
+    "Assets/Sprites/Objects/Bench/Bench.png",
+    "Assets/Sprites/Objects/Floor/Floor.png",
+])
+loading_start = pygame.time.get_ticks()
+with profiler.span("loading_screen"):
+    while args.headless and asset_cache.is_loading():
+        # 无窗口运行时没有加载画面，直接等待后台解码完成
+        if not asset_cache.pump(budget_ms=100):
+            pygame.time.wait(1)
+    while asset_cache.is_loading():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                raise SystemExit
+        asset_cache.pump(budget_ms=8)  # 每帧最多花8毫秒转换图片，保证加载画面流畅
+
+        # 绘制进度条和一个转动的小方块
+        done = sum(1 for future in preload_futures if future.done())
+        canvas = gameObjectManager.canvas
+        canvas.fill((0, 0, 0))
+        bar = pygame.Rect(300, 400, 400, 16)
+        pygame.draw.rect(canvas, (80, 80, 80), bar, 2)
+        pygame.draw.rect(canvas, (230, 230, 230), (bar.x + 3, bar.y + 3, (bar.width - 6) * done // max(len(preload_futures), 1), bar.height - 6))
+        angle = (pygame.time.get_ticks() - loading_start) / 1000 * 180
+        spinner = pygame.transform.rotate(pygame.Surface((20, 20)), angle)
+        spinner.fill((230, 230, 230), special_flags=pygame.BLEND_RGB_ADD)
+        canvas.blit(spinner, spinner.get_rect(center=(500, 350)))
+        pygame.display.flip()
+        gameObjectManager.clock.tick(gameObjectManager.target_fps)
 
 # 创建背景
 background = ufb.GameObject("Background", True)
-# 将背景对象放在渲染序列的最前面，确保它在所有对象之下
-gameObjectManager.gameObjects.remove(background)
-gameObjectManager.gameObjects.insert(0, background)
 
 # 为背景添加Transform组件（位置设置为屏幕中心）
 backgroundTransform = background.addComponent(cp.Transform, (500, 300))  # 假设屏幕大小为1000x600
 # 添加背景图像渲染器
 backgroundRenderer = background.addComponent(cp.SpriteRenderer, 
                                            "Assets/background.png",
-                                           (1000, 600))  # 设置背景图像大小为全屏
+                                           (1000, 600),  # 设置背景图像大小为全屏
+                                           static=True, sortingOrder=0)  # 静态层最底层
+
+# 碰撞层：层碰撞矩阵中忽略的两层之间不做任何碰撞检测
+collisionManager = gameObjectManager.collision_manager
+PLAYER_LAYER = collisionManager.define_layer(8, "Player")
+GROUND_LAYER = collisionManager.define_layer(9, "Ground")
+INTERACTABLE_LAYER = collisionManager.define_layer(10, "Interactable")
+ENEMY_LAYER = collisionManager.define_layer(11, "Enemy")
+ENEMY_PROJECTILE_LAYER = collisionManager.define_layer(12, "EnemyProjectile")
+DECORATION_LAYER = collisionManager.define_layer(13, "Decoration")
+collisionManager.ignore_layer_collision(GROUND_LAYER, GROUND_LAYER)
+collisionManager.ignore_layer_collision(GROUND_LAYER, INTERACTABLE_LAYER)
+collisionManager.ignore_layer_collision(INTERACTABLE_LAYER, INTERACTABLE_LAYER)
+collisionManager.ignore_layer_collision(ENEMY_LAYER, ENEMY_PROJECTILE_LAYER)
+collisionManager.ignore_layer_collision(ENEMY_PROJECTILE_LAYER, ENEMY_PROJECTILE_LAYER)
+collisionManager.ignore_layer_collision(DECORATION_LAYER, DECORATION_LAYER)
 
 # 修改椅子的初始化部分
 chair = ufb.GameObject("Chair", True)
 chairTransform = chair.addComponent(cp.Transform, (200, 490))  # 调整位置到地面上
-chairRender = chair.addComponent(cp.SpriteRenderer, "Assets/Sprites/Objects/Bench/Bench.png", (183, 90))
-chairCollider = chair.addComponent(cp.BoxCollider, 150, 60, (0, -10), False, "Bench")  # 为椅子添加碰撞体
+chairRender = chair.addComponent(cp.SpriteRenderer, "Assets/Sprites/Objects/Bench/Bench.png", (183, 90),
+                               static=True, sortingOrder=1)
+chairCollider = chair.addComponent(cp.BoxCollider, 150, 60, (0, -10), False, "Bench", static=True, layer=INTERACTABLE_LAYER)  # 为椅子添加碰撞体
 chairInteraction = chair.addComponent(Entity.BenchInteraction)  # 添加椅子交互组件
 
 # 创建玩家
@@ -36,7 +139,7 @@ playerDebug = player.addComponent(cp.DebugRenderer, False)  # 传递参数控制
 playerAnimator=player.addComponent(cp.Animator) # 动画控制
 playerTransform=player.addComponent(cp.Transform,(200,100)) # 位置控制
 playerController=player.addComponent(Entity.PlayerController) # 玩家控制器
-playerCollider = player.addComponent(cp.BoxCollider, 60, 120)  # 添加长方形碰撞体
+playerCollider = player.addComponent(cp.BoxCollider, 60, 120, layer=PLAYER_LAYER)  # 添加长方形碰撞体
 
 # 创建地面
 ground = ufb.GameObject("Ground", True)
@@ -44,32 +147,112 @@ groundDebug = ground.addComponent(cp.DebugRenderer, False)
 
 
 groundTransform = ground.addComponent(cp.Transform, (500, 600))  # 水平居中，垂直在下方
-groundCollider = ground.addComponent(cp.BoxCollider, 1000, 150, (0, 0), False, "Ground") # 为地面添加碰撞体，宽度较大，高度较小
-groundRenderer = ground.addComponent(cp.SpriteRenderer, "Assets/Sprites/Objects/Floor/Floor.png",(1000,500))  # 假设您有地面图像
+groundCollider = ground.addComponent(cp.BoxCollider, 1000, 150, (0, 0), False, "Ground", static=True, layer=GROUND_LAYER) # 为地面添加碰撞体，宽度较大，高度较小
+groundRenderer = ground.addComponent(cp.SpriteRenderer, "Assets/Sprites/Objects/Floor/Floor.png",(1000,500),
+                                 static=True, sortingOrder=2)  # 假设您有地面图像
+
+# 创建摄像机：跟随玩家，视口不超出房间范围
+mainCamera = ufb.GameObject("MainCamera", True)
+mainCameraTransform = mainCamera.addComponent(cp.Transform, (500, 300))
+camera = mainCamera.addComponent(cp.Camera, target=player, bounds=(0, 0, 1000, 600))
+
+# 分块关卡：摄像机附近的区块在后台读取，远处的区块被卸载
+if args.level:
+    level = lv.Level(args.level)
+    levelObject = ufb.GameObject("Level", True)
+    levelStreamer = levelObject.addComponent(lv.LevelStreamer, level,
+                                             tag_layers={"Ground": GROUND_LAYER, "Bench": INTERACTABLE_LAYER})
+    camera.bounds.union_ip(level.bounds)
 
 
-gameObjectManager.startGame() # 游戏物体管理器启动
+# 环境粒子：从房间上方缓缓飘落的灰烬
+if args.particles:
+    from UnityFrame.Components.ParticleSystem import ParticleSystem
+    ash = ufb.GameObject("AmbientAsh", True)
+    ashTransform = ash.addComponent(cp.Transform, (500, -20))
+    ashParticles = ash.addComponent(ParticleSystem, "Assets/Sprites/Effects/Particles_ash.png",
+                                    max_particles=args.particles * 12, emission_rate=args.particles,
+                                    lifetime=(8, 11), speed=(30, 60), angle=(70, 110), gravity=(0, 2),
+                                    spawn_area=(1000, 0), area=(0, 0, 23, 23), scale=0.6,
+                                    start_alpha=230, end_alpha=0, seed=1)
+
+with profiler.span("startGame"):
+    gameObjectManager.startGame() # 游戏物体管理器启动
 
 # 创建音频管理器单例
 audio_manager = ufb.AudioManager.get_instance()
 
 # 播放背景音乐
-audio_manager.play_background_music("Assets/Audios/cityoftears.wav", volume=0.5)
+with profiler.span("play_background_music"):
+    audio_manager.play_background_music("Assets/Audios/cityoftears.wav", volume=0.5)
+
+# 逐帧耗时分析
+show_profiler_overlay = False
+if args.profile_frames:
+    # 固定帧数运行时统计全部帧，否则只统计最近300帧
+    gameObjectManager.enable_profiler(window=max(300, args.exit_after_frames))
+    show_profiler_overlay = True
+
+# 脏矩形渲染：静态层(背景、椅子、地面)合成为背景，每帧只擦除和提交变化的区域
+dirty_renderer = None
+if args.dirty_rects:
+    dirty_renderer = gameObjectManager.enable_dirty_rects((0, 0, 255))
 
+if args.record:
+    ufb.Input.get_instance().start_recording()
+
+frame_index = 0
+simulation_start = time.perf_counter()
 running = True
 while running:
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
             running = False
+        elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+            show_profiler_overlay = not show_profiler_overlay
 
-    # 填充背景色
-    gameObjectManager.instance.canvas.fill((0, 0, 255))
+    if dirty_renderer is not None:
+        # 只擦除上一帧画过的区域
+        dirty_renderer.begin_frame()
+    else:
+        # 填充背景色
+        gameObjectManager.instance.canvas.fill((0, 0, 255))
     gameObjectManager.gameLoopLogic() # 游戏物体管理器的循环逻辑
 
     # 绘制碰撞箱
     # draw_colliders()
 
+    if gameObjectManager.profiler is not None and show_profiler_overlay:
+        gameObjectManager.mark_dirty(gameObjectManager.profiler.draw_overlay(gameObjectManager.canvas))
+
     # 更新显示
-    pygame.display.flip()
+    if dirty_renderer is not None:
+        dirty_renderer.present(display=not args.headless)
+    elif not args.headless:
+        pygame.display.flip()
+    frame_index += 1
+
+    # 第一帧画出来之后结束启动分析并写出报告
+    if profiler.enabled:
+        profiler.finish()
+        json_path, folded_path = profiler.save(args.profile_startup)
+        print(profiler.summary())
+        print(f"启动分析报告已写入 {json_path} 和 {folded_path}")
+
+    if args.exit_after_frames and frame_index >= args.exit_after_frames:
+        running = False
+
+if args.headless:
+    elapsed = time.perf_counter() - simulation_start
+    print(f"无窗口模拟 {frame_index} 帧，用时 {elapsed:.2f} 秒，平均 {frame_index / max(elapsed, 1e-9):.0f} 帧/秒")
+
+if args.record:
+    recorded_frames = ufb.Input.get_instance().save_recording(args.record)
+    print(f"已录制 {recorded_frames} 帧按键到 {args.record}")
+
+if gameObjectManager.profiler is not None:
+    gameObjectManager.profiler.dump_csv(args.profile_frames + ".csv")
+    gameObjectManager.profiler.dump_json(args.profile_frames + ".json")
+    print(f"逐帧耗时统计已写入 {args.profile_frames}.csv 和 {args.profile_frames}.json")
 
 pygame.quit()
@@ -0,0 +1,126 @@
+"""
+图集打包工具（离线运行）
+
+把一个精灵目录下的所有PNG打包进一张大图，并生成JSON帧索引。运行时通过
+AssetCache.register_atlas 注册索引后，原来按文件路径加载的图片会自动变成图集上的
+subsurface，不再逐个打开文件、也不再为每一帧单独持有一份像素数据。
+
+帧不会被裁剪透明边缘，保证动画的中心点与原图一致。
+
+用法（在项目根目录下运行）:
+    python Tools/AtlasBuilder.py                                   # 整个骑士图集 -> Assets/Atlases/Knight.png/.json
+    python Tools/AtlasBuilder.py Assets/Sprites/Knight --per-folder # 每个动作目录单独打包
+"""
+import argparse
+import json
+import math
+import os
+import sys
+
+# 打包过程不需要窗口
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from _common import compact_rects
+
+IMAGE_SUFFIXES = (".png",)
+
+def collect_images(folder, recursive=True):
+    """收集目录下的所有图片路径（按路径排序，保证每次打包结果一致）"""
+    paths = []
+    if recursive:
+        for root, _, files in os.walk(folder):
+            for name in files:
+                if name.lower().endswith(IMAGE_SUFFIXES):
+                    paths.append(os.path.join(root, name))
+    else:
+        for name in os.listdir(folder):
+            path = os.path.join(folder, name)
+            if os.path.isfile(path) and name.lower().endswith(IMAGE_SUFFIXES):
+                paths.append(path)
+    return sorted(paths)
+
+def pack_shelves(sizes, max_width, padding):
+    """
+    货架式装箱：按高度从大到小依次放入，一行放不下就另起一行
+
+    参数:
+        sizes: [(宽, 高), ...]
+    返回:
+        (每个尺寸对应的左上角坐标列表, 图集宽, 图集高)
+    """
+    order = sorted(range(len(sizes)), key=lambda i: (-sizes[i][1], -sizes[i][0]))
+    positions = [None] * len(sizes)
+    x = y = shelf_height = used_width = 0
+    for index in order:
+        width, height = sizes[index]
+        if width > max_width:
+            raise ValueError("图片宽度 %d 超过图集最大宽度 %d" % (width, max_width))
+        if x + width > max_width:
+            # 当前行放不下，换到下一行
+            y += shelf_height + padding
+            x = shelf_height = 0
+        positions[index] = (x, y)
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+        used_width = max(used_width, x - padding)
+    return positions, used_width, y + shelf_height
+
+def build_atlas(image_paths, output_dir, name, max_size=4096, padding=2):
+    """把图片打包为 name.png 和 name.json，返回索引文件路径"""
+    images = [pygame.image.load(path) for path in image_paths]
+    sizes = [image.get_size() for image in images]
+    # 以总面积估算一个接近正方形的行宽，避免打包成一条很长的窄图
+    area = sum((width + padding) * (height + padding) for width, height in sizes)
+    row_width = min(max_size, max(max(width for width, _ in sizes), int(math.sqrt(area) * 1.2)))
+    positions, width, height = pack_shelves(sizes, row_width, padding)
+    if height > max_size:
+        raise ValueError("图集 %s 高度 %d 超过上限 %d，请使用 --per-folder 分开打包" % (name, height, max_size))
+
+    sheet = pygame.Surface((max(width, 1), max(height, 1)), pygame.SRCALPHA)
+    frames = {}
+    for path, image, (x, y) in zip(image_paths, images, positions):
+        sheet.blit(image, (x, y))
+        # 统一使用 / 分隔的相对路径作为键，运行时再按当前平台规范化
+        frames[os.path.relpath(path).replace(os.sep, "/")] = [x, y, image.get_width(), image.get_height()]
+
+    os.makedirs(output_dir, exist_ok=True)
+    sheet_path = os.path.join(output_dir, name + ".png")
+    index_path = os.path.join(output_dir, name + ".json")
+    pygame.image.save(sheet, sheet_path)
+    text = json.dumps({"image": name + ".png", "size": [sheet.get_width(), sheet.get_height()], "frames": frames},
+                      ensure_ascii=False, indent=2)
+    with open(index_path, "w", encoding="utf-8") as index_file:
+        index_file.write(compact_rects(text))
+    print("打包 %s: %d 帧 -> %s (%dx%d)" % (name, len(frames), sheet_path, sheet.get_width(), sheet.get_height()))
+    return index_path
+
+def main():
+    parser = argparse.ArgumentParser(description="把精灵目录打包成图集")
+    parser.add_argument("source", nargs="?", default="Assets/Sprites/Knight", help="要打包的精灵目录")
+    parser.add_argument("--output", default="Assets/Atlases", help="图集输出目录")
+    parser.add_argument("--name", default=None, help="图集名称，默认使用源目录名")
+    parser.add_argument("--per-folder", action="store_true", help="每个包含图片的子目录单独打包成一个图集")
+    parser.add_argument("--max-size", type=int, default=4096, help="图集最大边长")
+    parser.add_argument("--padding", type=int, default=2, help="帧之间的间隔像素")
+    args = parser.parse_args()
+
+    pygame.init()
+    source = os.path.normpath(args.source)
+    if args.per_folder:
+        for root, _, _ in sorted(os.walk(source)):
+            image_paths = collect_images(root, recursive=False)
+            if image_paths:
+                name = os.path.relpath(root, os.path.dirname(source)).replace(os.sep, "_")
+                build_atlas(image_paths, args.output, name, args.max_size, args.padding)
+    else:
+        image_paths = collect_images(source)
+        if not image_paths:
+            print("目录 %s 下没有找到图片" % source)
+            sys.exit(1)
+        build_atlas(image_paths, args.output, args.name or os.path.basename(source), args.max_size, args.padding)
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
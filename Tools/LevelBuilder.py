@@ -0,0 +1,68 @@
+"""
+关卡构建工具（离线运行）
+
+把用字符画编写的关卡源文件切分成 UnityFrame.Level 使用的分块关卡目录，
+实心图块的碰撞盒在构建时预先合并好，运行时不再计算。
+
+源文件格式(JSON):
+    {
+        "name": "Demo",
+        "origin": [1000, 0],
+        "tile_size": 75,
+        "chunk_size": 8,
+        "legend": {"#": {"image": "Assets/Sprites/Environment/black_solid.png", "solid": "Ground"}},
+        "map": ["........", "########"],       # 每个字符一个图块，"." 和空格为空
+        "objects": [{"name": "Door", "position": [1500, 436], "image": "...", "size": [97, 177]}]
+    }
+
+用法（在项目根目录下运行）:
+    python Tools/LevelBuilder.py                                         # Assets/Levels/DemoSource.json -> Assets/Levels/Demo
+    python Tools/LevelBuilder.py my_level.json Assets/Levels/MyLevel
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from UnityFrame.Level import Level
+
+def build(source_path, output_folder):
+    with open(source_path, encoding="utf-8") as f:
+        source = json.load(f)
+
+    # 图例中的字符按出现顺序编号，0保留给空图块
+    tile_ids = {}
+    tile_defs = {}
+    for char, tile in source["legend"].items():
+        tile_ids[char] = len(tile_ids) + 1
+        tile_defs[tile_ids[char]] = tile
+
+    tiles = []
+    for line_number, line in enumerate(source["map"], 1):
+        row = []
+        for char in line:
+            if char in ". ":
+                row.append(0)
+            elif char in tile_ids:
+                row.append(tile_ids[char])
+            else:
+                raise SystemExit(f"第 {line_number} 行: 图例中没有字符 {char!r}")
+        tiles.append(row)
+    width = max(len(row) for row in tiles)
+    tiles = [row + [0] * (width - len(row)) for row in tiles]
+
+    index = Level.save(output_folder, source["name"], tiles, tile_defs, source["tile_size"], source["chunk_size"],
+                       tuple(source.get("origin", (0, 0))), source.get("objects", ()))
+    print(f"{source['name']}: {index['size'][0]}x{index['size'][1]} 图块, {len(index['chunks'])} 个区块 -> {output_folder}")
+
+def main():
+    parser = argparse.ArgumentParser(description="把字符画关卡源文件构建为分块关卡")
+    parser.add_argument("source", nargs="?", default="Assets/Levels/DemoSource.json")
+    parser.add_argument("output", nargs="?", default="Assets/Levels/Demo")
+    args = parser.parse_args()
+    build(args.source, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+精灵表元数据生成工具（离线运行）
+
+Enemies、Bosses 下的精灵表没有统一网格，本工具根据透明度（或与左上角背景色的差异）
+自动找出每个精灵的包围矩形，
+按行分组后写成 SpriteSheet 可直接读取的元数据文件（每行一个动画，名称为 Row01、Row02...），
+之后只需要手动把动画改成有意义的名字、删掉不需要的行即可。
+
+用法（在项目根目录下运行）:
+    python Tools/SheetSlicer.py Assets/Sprites/Enemies/Vengefly.png
+    python Tools/SheetSlicer.py Assets/Sprites/Enemies/*.png --min-size 16 --merge-distance 4
+"""
+import argparse
+import json
+import os
+
+# 生成元数据不需要窗口
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from _common import compact_rects
+
+def foreground_mask(image):
+    """左上角透明时按透明度区分精灵，否则把与左上角颜色不同的像素视为精灵"""
+    background = image.get_at((0, 0))
+    if background.a == 0:
+        return pygame.mask.from_surface(image)
+    mask = pygame.mask.from_threshold(image, background, (8, 8, 8, 255))
+    mask.invert()
+    return mask
+
+def find_sprite_rects(image, min_size, merge_distance):
+    """找出精灵像素连通区域的包围矩形，相距不超过merge_distance的矩形合并为同一个精灵"""
+    rects = foreground_mask(image).get_bounding_rects()
+    merged = True
+    while merged:
+        merged = False
+        result = []
+        for rect in rects:
+            grown = rect.inflate(merge_distance * 2, merge_distance * 2)
+            for index, other in enumerate(result):
+                if grown.colliderect(other):
+                    result[index] = other.union(rect)
+                    merged = True
+                    break
+            else:
+                result.append(rect)
+        rects = result
+    return [rect for rect in rects if rect.width >= min_size and rect.height >= min_size]
+
+def group_rows(rects):
+    """把垂直方向上有重叠的矩形归为一行，行内按从左到右排序"""
+    rows = []
+    for rect in sorted(rects, key=lambda rect: (rect.top, rect.left)):
+        if rows and rect.top < rows[-1]["bottom"]:
+            rows[-1]["rects"].append(rect)
+            rows[-1]["bottom"] = max(rows[-1]["bottom"], rect.bottom)
+        else:
+            rows.append({"rects": [rect], "bottom": rect.bottom})
+    return [sorted(row["rects"], key=lambda rect: rect.left) for row in rows]
+
+def write_metadata(image_path, min_size, merge_distance, frame_duration):
+    """生成与图片同名的 .json 元数据文件，返回文件路径"""
+    image = pygame.image.load(image_path)
+    rows = group_rows(find_sprite_rects(image, min_size, merge_distance))
+    animations = {}
+    for index, row in enumerate(rows, start=1):
+        animations["Row%02d" % index] = {
+            "frame_duration": frame_duration,
+            "loop": True,
+            "rects": [[rect.x, rect.y, rect.width, rect.height] for rect in row],
+        }
+    metadata_path = os.path.splitext(image_path)[0] + ".json"
+    text = json.dumps({"image": os.path.basename(image_path), "animations": animations}, indent=2)
+    with open(metadata_path, "w", encoding="utf-8") as metadata_file:
+        metadata_file.write(compact_rects(text))
+    print("%s: %d 行, %d 帧 -> %s" % (image_path, len(rows), sum(len(row) for row in rows), metadata_path))
+    return metadata_path
+
+def main():
+    parser = argparse.ArgumentParser(description="为不规则精灵表生成切分元数据")
+    parser.add_argument("images", nargs="+", help="精灵表图片路径")
+    parser.add_argument("--min-size", type=int, default=24, help="忽略宽或高小于该值的碎片（如表上的文字标注）")
+    parser.add_argument("--merge-distance", type=int, default=2, help="相距不超过该像素数的区域视为同一个精灵")
+    parser.add_argument("--frame-duration", type=float, default=0.08, help="写入元数据的默认帧时长(秒)")
+    args = parser.parse_args()
+
+    pygame.init()
+    for image_path in args.images:
+        write_metadata(image_path, args.min_size, args.merge_distance, args.frame_duration)
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""
+离线工具共用的辅助函数
+
+工具以 python Tools/xxx.py 的方式运行，Tools 目录就在模块搜索路径上，直接 from _common import ... 即可。
+"""
+import re
+
+def compact_rects(text):
+    """把缩进JSON中的 [x, y, 宽, 高] 矩形压缩到一行，便于阅读和比对"""
+    return re.sub(r"\[\s*(\d+),\s*(\d+),\s*(\d+),\s*(\d+)\s*\]", r"[\1, \2, \3, \4]", text)
@@ -0,0 +1,186 @@
+"""
+数组存储(可选，需要NumPy)
+
+调用GameObjectManager.enable_array_store()之后，ArrayTransform组件把位置和速度存放在连续的NumPy数组中，
+挂在它上面的碰撞体把相对位置的包围盒存放在另一组数组中，组件本身只是按编号访问数组的视图。这样可以:
+    - 每次固定更新用一次向量运算按速度移动所有物体(integrate)
+    - 宽检测一次算出所有碰撞体的包围盒，用向量化的扫描排序(sweep and prune)找出相交的候选对
+
+适合成千上万个同时移动的碰撞体(弹幕、粒子等)；物体不多时普通存储更快。
+没有安装NumPy时导入本模块不会出错，但创建ArrayStore会抛出ImportError。
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from UnityFrame.UnityFrameBase import BroadPhase
+
+
+class ArrayStore:
+    """按编号存放Transform位置/速度和碰撞体形状的结构体数组"""
+    def __init__(self, capacity=1024):
+        if np is None:
+            raise ImportError("ArrayStore需要NumPy，请先安装: pip install numpy")
+        self.version = 0  # 批量修改位置后加一，碰撞体据此让缓存失效
+
+        # Transform
+        self.positions = np.zeros((capacity, 2))
+        self.velocities = np.zeros((capacity, 2))
+        self.transform_alive = np.zeros(capacity, dtype=bool)
+        self.transform_count = 0  # 用过的最大编号+1
+        self.free_transforms = []
+
+        # 碰撞体: 所属Transform的编号，包围盒左上角和右下角相对Transform位置的偏移
+        self.collider_transforms = np.zeros(capacity, dtype=np.intp)
+        self.collider_mins = np.zeros((capacity, 2))
+        self.collider_maxs = np.zeros((capacity, 2))
+        self.collider_count = 0
+        self.free_colliders = []
+
+    @staticmethod
+    def _grow(array, size):
+        grown = np.zeros((size,) + array.shape[1:], dtype=array.dtype)
+        grown[:len(array)] = array
+        return grown
+
+    # ---------- Transform ----------
+    def allocate_transform(self, position):
+        if self.free_transforms:
+            index = self.free_transforms.pop()
+        else:
+            index = self.transform_count
+            self.transform_count += 1
+            if index >= len(self.positions):
+                size = len(self.positions) * 2
+                self.positions = self._grow(self.positions, size)
+                self.velocities = self._grow(self.velocities, size)
+                self.transform_alive = self._grow(self.transform_alive, size)
+        self.positions[index] = position
+        self.velocities[index] = 0
+        self.transform_alive[index] = True
+        return index
+
+    def release_transform(self, index):
+        self.transform_alive[index] = False
+        self.velocities[index] = 0
+        self.free_transforms.append(index)
+
+    def get_position(self, index):
+        x, y = self.positions[index].tolist()
+        return (x, y)
+
+    def set_position(self, index, position):
+        self.positions[index] = position
+
+    def get_velocity(self, index):
+        x, y = self.velocities[index].tolist()
+        return (x, y)
+
+    def set_velocity(self, index, velocity):
+        self.velocities[index] = velocity
+
+    def integrate(self, deltaTime):
+        """按速度移动所有物体"""
+        count = self.transform_count
+        self.positions[:count] += self.velocities[:count] * deltaTime
+        self.version += 1
+
+    # ---------- 碰撞体 ----------
+    def allocate_collider(self, transform_index, local_min, local_max):
+        if self.free_colliders:
+            index = self.free_colliders.pop()
+        else:
+            index = self.collider_count
+            self.collider_count += 1
+            if index >= len(self.collider_transforms):
+                size = len(self.collider_transforms) * 2
+                self.collider_transforms = self._grow(self.collider_transforms, size)
+                self.collider_mins = self._grow(self.collider_mins, size)
+                self.collider_maxs = self._grow(self.collider_maxs, size)
+        self.collider_transforms[index] = transform_index
+        self.set_collider_shape(index, local_min, local_max)
+        return index
+
+    def set_collider_shape(self, index, local_min, local_max):
+        self.collider_mins[index] = local_min
+        self.collider_maxs[index] = local_max
+
+    def release_collider(self, index):
+        self.free_colliders.append(index)
+
+    def collider_bounds(self, indices):
+        """一次算出一组碰撞体的包围盒，返回 (最小点, 最大点) 两个 (n, 2) 数组"""
+        positions = self.positions[self.collider_transforms[indices]]
+        return positions + self.collider_mins[indices], positions + self.collider_maxs[indices]
+
+
+def sweep_and_prune(mins, maxs):
+    """
+    向量化的扫描排序宽检测，返回包围盒相交的 (i, j) 索引数组，i < j
+
+    按左边界排序后，每个包围盒只需要和左边界落在它 [left, right] 区间内的后续包围盒比较；
+    用searchsorted一次求出每个区间的终点，再把所有区间展开成候选对，最后过滤y方向不相交的。
+    """
+    count = len(mins)
+    if count < 2:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty
+    order = np.argsort(mins[:, 0], kind="stable")
+    sorted_left = mins[order, 0]
+    ends = np.searchsorted(sorted_left, maxs[order, 0], side="right")
+    starts = np.arange(1, count + 1)
+    counts = np.maximum(ends - starts, 0)
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty
+    first = np.repeat(np.arange(count), counts)
+    # 每段区间内的偏移: 全局序号减去该段起始位置
+    segment_starts = np.repeat(np.cumsum(counts) - counts, counts)
+    second = np.arange(total) - segment_starts + np.repeat(starts, counts)
+
+    first, second = order[first], order[second]
+    overlap = (mins[second, 1] <= maxs[first, 1]) & (mins[first, 1] <= maxs[second, 1])
+    first, second = first[overlap], second[overlap]
+    return np.minimum(first, second), np.maximum(first, second)
+
+
+class ArrayBroadPhase(BroadPhase):
+    """
+    基于数组存储的向量化宽检测
+
+    使用数组存储的碰撞体直接从数组中取包围盒，其余碰撞体调用get_bounds；
+    然后用sweep_and_prune一次求出所有相交的候选对。
+    包围盒各向外扩margin像素，保证精确检测用的pygame.Rect取整之后相交的碰撞对不会被漏掉。
+    """
+    def __init__(self, store=None, margin=1.0):
+        if np is None:
+            raise ImportError("ArrayBroadPhase需要NumPy，请先安装: pip install numpy")
+        self.store = store
+        self.margin = margin
+
+    def find_pairs(self, colliders):
+        count = len(colliders)
+        if count < 2:
+            return []
+        mins = np.empty((count, 2))
+        maxs = np.empty((count, 2))
+        store = self.store
+        slots = [collider.array_slot for collider in colliders] if store is not None else [None] * count
+        stored = [index for index, slot in enumerate(slots) if slot is not None]
+        if stored:
+            stored_mins, stored_maxs = store.collider_bounds(np.array([slots[index] for index in stored], dtype=np.intp))
+            mins[stored] = stored_mins
+            maxs[stored] = stored_maxs
+        if len(stored) < count:
+            for index, slot in enumerate(slots):
+                if slot is None:
+                    left, top, right, bottom = colliders[index].get_bounds()
+                    mins[index] = (left, top)
+                    maxs[index] = (right, bottom)
+
+        first, second = sweep_and_prune(mins - self.margin, maxs + self.margin)
+        # 与其他宽检测一致，按 (i, j) 升序返回
+        order = np.lexsort((second, first))
+        return list(zip(first[order].tolist(), second[order].tolist()))
@@ -1,16 +1,29 @@
+import json
+import os
 import pygame
 import UnityFrame.UnityFrameBase as ufb
 
 class Transform(ufb.Component):
     def __init__(self,gameObject:ufb.GameObject,position:()=(0,0),rotation:int=0,scale:()=(1,1),parent=None): # type: ignore
         super().__init__(gameObject)
+        self.version=0 # 位置每次改变加一，碰撞体据此判断缓存的包围盒是否过期
         self.position=position
+        self.previous_position=position # 上一次固定更新前的位置，用于插值渲染
         self.rotation=rotation
         self.scale=scale
         self.parent=parent
         self.children=[]
         if parent!=None:
             parent.children.append(self)
+    @property
+    def position(self):
+        return self._position
+
+    @position.setter
+    def position(self, value):
+        self._position = value
+        self.version += 1
+
     #设置父物体
     def setParent(self,parent):
         if parent==None:
@@ -31,6 +44,16 @@ class Transform(ufb.Component):
                             child.position[1] + tempPositionY)
         self.position = newPosition
 
+    #获取渲染位置
+    def getRenderPosition(self):
+        """在上一次固定更新前后的位置之间按插值系数线性插值，渲染帧率与物理步长不同时画面依然平滑"""
+        alpha = ufb.GameObjectManager.instance.interpolation_alpha
+        previous = self.previous_position
+        if alpha >= 1.0 or previous == self.position:
+            return self.position
+        return (previous[0] + (self.position[0] - previous[0]) * alpha,
+                previous[1] + (self.position[1] - previous[1]) * alpha)
+
     #设置旋转角度
     def setRtoation(self, newRoation):
         tempRotation = newRoation - self.rotation
@@ -48,16 +71,61 @@ class Transform(ufb.Component):
                         child.scale[1] * tempScaleY)
         self.scale = newScale
 
+# 数组存储的Transform：位置和速度存放在管理器的ArrayStore中，需要先调用manager.enable_array_store()
+class ArrayTransform(Transform):
+    def __init__(self,gameObject:ufb.GameObject,position:()=(0,0),velocity:()=(0,0),rotation:int=0,scale:()=(1,1),parent=None): # type: ignore
+        store=ufb.GameObjectManager.instance.array_store
+        if store is None:
+            raise RuntimeError("使用ArrayTransform之前需要先调用GameObjectManager.enable_array_store()")
+        self.array_store=store
+        self.array_index=store.allocate_transform(position)
+        self._version=0
+        super().__init__(gameObject,position,rotation,scale,parent)
+        self.velocity=velocity
+
+    # 批量移动(ArrayStore.integrate)不会逐个修改版本号，因此版本号要加上存储的版本号
+    @property
+    def version(self):
+        return self._version + self.array_store.version
+
+    @version.setter
+    def version(self, value):
+        self._version = value - self.array_store.version
+
+    @property
+    def position(self):
+        return self.array_store.get_position(self.array_index)
+
+    @position.setter
+    def position(self, value):
+        self.array_store.set_position(self.array_index, value)
+        self._version += 1
+
+    @property
+    def velocity(self):
+        """每秒移动的距离，固定更新之后由ArrayStore.integrate统一移动"""
+        return self.array_store.get_velocity(self.array_index)
+
+    @velocity.setter
+    def velocity(self, value):
+        self.array_store.set_velocity(self.array_index, value)
+
+    def onDestroy(self):
+        self.array_store.release_transform(self.array_index)
+        super().onDestroy()
+
 #动画类
 class SpriteAnimation:
-    def __init__(self, name,frames, frame_duration, loop=True):
+    def __init__(self, name,frames, frame_duration, loop=True, scale=None):
         self.name=name
         self.frames = frames
         self.frame_duration = frame_duration
         self.loop = loop
+        self.scale = scale # 可选的预缩放比例，数字或 (x缩放, y缩放)
         self.currentFrame = 0
         self.finished = False
         self.currentFrameElapsedTime = 0
+        self.frameTables = {} # flipX -> 预处理后的帧列表，首次使用时生成
 
     def update_frame(self, dt):
         if self.finished and self.loop == False:
@@ -73,20 +141,119 @@ class SpriteAnimation:
                 self.finished = True
                 self.currentFrame = len(self.frames) - 1
 
-    def get_current_frame(self):
-        return self.frames[self.currentFrame]
+    def get_frames(self, flipX=False):
+        """获取缩放/翻转后的帧列表，每种变体只在第一次使用时生成一次"""
+        table = self.frameTables.get(flipX)
+        if table is None:
+            if flipX:
+                table = [pygame.transform.flip(frame, True, False) for frame in self.get_frames(False)]
+            elif self.scale is None:
+                table = self.frames
+            else:
+                scaleX, scaleY = self.scale if isinstance(self.scale, tuple) else (self.scale, self.scale)
+                table = [pygame.transform.scale(frame, (int(frame.get_width() * scaleX), int(frame.get_height() * scaleY)))
+                         for frame in self.frames]
+            self.frameTables[flipX] = table
+        return table
+
+    def get_current_frame(self, flipX=False):
+        return self.get_frames(flipX)[self.currentFrame]
 
     def resetAnimation(self):
         self.currentFrame = 0
 
+#精灵表类
+class SpriteSheet:
+    """
+    精灵表：整张大图通过资源缓存只解码一次，切出的每一帧都是大图的subsurface，不复制像素
+
+    可以按网格切分，也可以按元数据文件中记录的矩形切分。元数据文件格式:
+        {
+            "image": "HuskSentry.png",
+            "animations": {
+                "Walk": {"frame_duration": 0.08, "loop": true, "rects": [[x, y, 宽, 高], ...]},
+                "Idle": {"grid": {"frame_width": 120, "frame_height": 160, "count": 6,
+                                  "x": 0, "y": 0, "columns": 6, "spacing": [0, 0]}}
+            }
+        }
+    """
+    def __init__(self, image_path, animations=None):
+        self.image_path = image_path
+        self.sheet = ufb.AssetCache.get_instance().load(image_path)
+        self.animations = animations if animations is not None else {} # 动画名 -> 元数据中的切分描述
+
+    @classmethod
+    def from_metadata(cls, metadata_path):
+        """从元数据文件创建精灵表，图片路径相对于元数据文件所在目录"""
+        with open(metadata_path, encoding="utf-8") as metadata_file:
+            metadata = json.load(metadata_file)
+        image_path = os.path.join(os.path.dirname(metadata_path), metadata["image"])
+        return cls(image_path, metadata.get("animations", {}))
+
+    def slice_grid(self, frame_width, frame_height, count=None, x=0, y=0, columns=None, spacing=(0, 0)):
+        """
+        按网格切分帧，从 (x, y) 开始逐行从左到右
+
+        参数:
+            frame_width, frame_height: 每帧大小
+            count: 帧数，默认切满整个网格
+            columns: 每行帧数，默认尽量放满图片宽度
+            spacing: 帧之间的 (水平, 垂直) 间隔
+        """
+        if columns is None:
+            columns = max(1, (self.sheet.get_width() - x + spacing[0]) // (frame_width + spacing[0]))
+        if count is None:
+            rows = max(1, (self.sheet.get_height() - y + spacing[1]) // (frame_height + spacing[1]))
+            count = columns * rows
+        rects = []
+        for index in range(count):
+            column, row = index % columns, index // columns
+            rects.append((x + column * (frame_width + spacing[0]), y + row * (frame_height + spacing[1]),
+                          frame_width, frame_height))
+        return self.slice_rects(rects)
+
+    def slice_rects(self, rects):
+        """按矩形列表切分帧，返回共享大图像素的subsurface列表"""
+        return [self.sheet.subsurface(pygame.Rect(rect)) for rect in rects]
+
+    def get_frames(self, name):
+        """按元数据中的描述切分指定动画的帧"""
+        spec = self.animations.get(name)
+        if spec is None:
+            print("精灵表 " + self.image_path + " 中没有名为" + name + "的动画！")
+            return []
+        if "grid" in spec:
+            grid = dict(spec["grid"])
+            if "spacing" in grid:
+                grid["spacing"] = tuple(grid["spacing"])
+            return self.slice_grid(**grid)
+        return self.slice_rects(spec["rects"])
+
+    def create_animation(self, name, frame_duration=None, loop=None, animation_name=None):
+        """按元数据创建SpriteAnimation，参数未指定时使用元数据中的设置"""
+        spec = self.animations.get(name, {})
+        if frame_duration is None:
+            frame_duration = spec.get("frame_duration", 0.05)
+        if loop is None:
+            loop = spec.get("loop", True)
+        return SpriteAnimation(animation_name or name, self.get_frames(name), frame_duration, loop)
+
+    def release(self):
+        """释放大图在资源缓存中的引用"""
+        if self.sheet is not None:
+            ufb.AssetCache.get_instance().release(self.image_path)
+            self.sheet = None
+
 #动画机组件
 class Animator(ufb.Component):
-    def __init__(self,gameObject):
+    def __init__(self,gameObject,sortingOrder=0,sortingLayer=0):
         super().__init__(gameObject)
         self.animations={}
         self.currentAnimation=None
         self.sprite=None
         self.flipX=False #判断是否翻转精灵图片
+        self.sortingLayer=sortingLayer # 渲染队列中的排序层，小的先画
+        self.sortingOrder=sortingOrder # 同一排序层中的顺序，小的先画
 
     def addAnimation(self,animation):
         if animation.name in self.animations.keys():
@@ -111,47 +278,104 @@ class Animator(ufb.Component):
             print("当前没有播放的动画")
             return
         self.currentAnimation.update_frame(deltaTime)
-        self.sprite=self.currentAnimation.get_current_frame()
+        # 直接取预先翻转好的帧，避免每帧调用 pygame.transform.flip 分配新的 Surface
+        self.sprite=self.currentAnimation.get_current_frame(self.flipX)
 
+    def render(self):
+        if self.sprite==None:
+            return
         # 计算精灵的宽度和高度
         sprite_width = self.sprite.get_width()
         sprite_height = self.sprite.get_height()     
-        # 计算绘制位置（让物体位置对应图像中心）
-        draw_x = self.gameObject.transform.position[0] - sprite_width // 2
-        draw_y = self.gameObject.transform.position[1] - sprite_height // 2
+        # 计算绘制位置（让物体位置对应图像中心），使用插值后的渲染位置
+        render_x, render_y = self.gameObject.transform.getRenderPosition()
+        draw_x = render_x - sprite_width // 2
+        draw_y = render_y - sprite_height // 2
 
         # # 根据flipX属性决定是否翻转精灵
         # if self.flipX:
         #     flipped_sprite = pygame.transform.flip(self.sprite, True, False)
-        #     ufb.GameObjectManager.instance.canvas.blit(flipped_sprite, (self.gameObject.transform.position[0],self.gameObject.transform.position[1]))
+        #     ufb.GameObjectManager.instance.blit(flipped_sprite, (self.gameObject.transform.position[0],self.gameObject.transform.position[1]))
         # else:
-        #     ufb.GameObjectManager.instance.canvas.blit(self.sprite, (self.gameObject.transform.position[0],self.gameObject.transform.position[1]))
-           # 根据flipX属性决定是否翻转精灵
-        if self.flipX:
-            flipped_sprite = pygame.transform.flip(self.sprite, True, False)
-            ufb.GameObjectManager.instance.canvas.blit(flipped_sprite, (draw_x, draw_y))
-        else:
-            ufb.GameObjectManager.instance.canvas.blit(self.sprite, (draw_x, draw_y))
+        #     ufb.GameObjectManager.instance.blit(self.sprite, (self.gameObject.transform.position[0],self.gameObject.transform.position[1]))
+        ufb.GameObjectManager.instance.blit_world(self.sprite, (draw_x, draw_y), z=self.sortingOrder, layer=self.sortingLayer)
 
 # 碰撞体基类
 class Collider(ufb.Component):
-    def __init__(self, gameObject, isTrigger=False, tag=""):
+    def __init__(self, gameObject, isTrigger=False, tag="", static=False, layer=0):
         super().__init__(gameObject)
         self.isTrigger = isTrigger  # 是否为触发器
         self.tag = tag  # 碰撞体标签，用于过滤碰撞
-        self.offset = (0, 0)  # 相对于游戏对象位置的偏移
+        self._offset = (0, 0)  # 相对于游戏对象位置的偏移，通过offset属性修改
         self.enabled = True  # 是否启用碰撞
+        self.static = static  # 静态碰撞体不会移动，只与动态碰撞体检测
+        self.layer = layer  # 碰撞层(0~31)，查询时可以用层掩码筛选
+        self.order = 0  # 加入碰撞管理器的序号
+
+        # 缓存的世界坐标位置和包围盒，Transform的版本号变化或形状改变后才重新计算
+        self.cached_version = -1
+        self.cached_position = (0, 0)
+        self.cached_bounds = (0, 0, 0, 0)
+
+        # 挂在ArrayTransform上的碰撞体把相对包围盒也放进数组存储，供向量化的宽检测使用
+        self.array_store = None
+        self.array_slot = None
+        transform = gameObject.transform
+        if transform is not None and getattr(transform, "array_store", None) is not None:
+            self.array_store = transform.array_store
+            self.array_slot = self.array_store.allocate_collider(transform.array_index, *self.local_extents())
         
         # 自动注册到碰撞管理器
         ufb.GameObjectManager.instance.collision_manager.add_collider(self)
         
+    # offset以及子类的width、height、radius是属性，修改时让缓存失效并同步数组存储中的形状
+    @property
+    def offset(self):
+        return self._offset
+
+    @offset.setter
+    def offset(self, value):
+        self._offset = value
+        self._shape_changed()
+
+    def _shape_changed(self):
+        """形状改变后调用：让缓存的包围盒失效，并更新数组存储中的相对包围盒"""
+        self.cached_version = -1
+        if self.array_slot is not None:
+            self.array_store.set_collider_shape(self.array_slot, *self.local_extents())
+
     def awake(self):
         super().awake()
-        
+
+    def _refresh_cache(self):
+        """物体移动或形状改变后重新计算缓存"""
+        transform = self.gameObject.transform
+        if self.cached_version != transform.version:
+            transform_pos = transform.position
+            offset = self._offset
+            self._update_cache((transform_pos[0] + offset[0], transform_pos[1] + offset[1]))
+            self.cached_version = transform.version
+
+    def _update_cache(self, position):
+        """根据世界坐标位置计算缓存的包围盒，子类需要重写此方法"""
+        self.cached_position = position
+        self.cached_bounds = (position[0], position[1], position[0], position[1])
+
+    def local_extents(self):
+        """包围盒左上角和右下角相对Transform位置的偏移，子类需要重写此方法"""
+        return self.offset, self.offset
+
     def get_position(self):
         """获取碰撞体在世界坐标中的位置"""
-        transform_pos = self.gameObject.transform.position
-        return (transform_pos[0] + self.offset[0], transform_pos[1] + self.offset[1])
+        if self.cached_version != self.gameObject.transform.version:
+            self._refresh_cache()
+        return self.cached_position
+
+    def get_bounds(self):
+        """获取碰撞体的轴对齐包围盒 (left, top, right, bottom)，供宽检测使用"""
+        if self.cached_version != self.gameObject.transform.version:
+            self._refresh_cache()
+        return self.cached_bounds
     
     def check_collision(self, other):
         """检查与其他碰撞体的碰撞，子类需要重写此方法"""
@@ -181,28 +405,106 @@ class Collider(ufb.Component):
         """当触发器碰撞结束时调用"""
         pass
     
+    def set_static(self, static):
+        """设置是否为静态碰撞体；静态碰撞体移动后需要调用collision_manager.invalidate_static()"""
+        ufb.GameObjectManager.instance.collision_manager.set_static(self, static)
+
+    def set_tag(self, tag):
+        """修改标签，同时更新碰撞管理器中的标签索引"""
+        ufb.GameObjectManager.instance.collision_manager.set_tag(self, tag)
+
+    def set_layer(self, layer):
+        """修改碰撞层，同时更新碰撞管理器中的层索引"""
+        ufb.GameObjectManager.instance.collision_manager.set_layer(self, layer)
+
+    def overlaps_rect(self, rect):
+        """是否与世界坐标的矩形相交，子类需要重写此方法"""
+        return False
+
+    def intersect_ray(self, origin, direction, max_distance):
+        """射线与碰撞体的交点，返回 (距离, 法线) 或None，子类需要重写此方法"""
+        return None
+
     def onDestroy(self):
         """组件销毁时从碰撞管理器中移除"""
         ufb.GameObjectManager.instance.collision_manager.remove_collider(self)
+        if self.array_slot is not None:
+            self.array_store.release_collider(self.array_slot)
+            self.array_slot = None
         super().onDestroy()
 
 # 矩形碰撞体
 class BoxCollider(Collider):
-    def __init__(self, gameObject, width=50, height=50, offset=(0, 0), isTrigger=False, tag=""):
-        super().__init__(gameObject, isTrigger, tag)
-        self.width = width
-        self.height = height
+    def __init__(self, gameObject, width=50, height=50, offset=(0, 0), isTrigger=False, tag="", static=False, layer=0):
+        # 宽高在基类初始化之前设置，基类分配数组存储时需要用到
+        self.cached_rect = None
+        self._width = width
+        self._height = height
+        super().__init__(gameObject, isTrigger, tag, static, layer)
         self.offset = offset
+
+    @property
+    def width(self):
+        return self._width
+
+    @width.setter
+    def width(self, value):
+        self._width = value
+        self._shape_changed()
+
+    @property
+    def height(self):
+        return self._height
+
+    @height.setter
+    def height(self, value):
+        self._height = value
+        self._shape_changed()
+
+    def _update_cache(self, position):
+        width, height = self._width, self._height
+        left = position[0] - width // 2
+        top = position[1] - height // 2
+        self.cached_position = position
+        self.cached_bounds = (left, top, left + width, top + height)
+        self.cached_rect = pygame.Rect(left, top, width, height)
+
+    def local_extents(self):
+        left = self.offset[0] - self.width // 2
+        top = self.offset[1] - self.height // 2
+        return (left, top), (left + self.width, top + self.height)
     
     def get_rect(self):
-        """获取碰撞体的rect对象"""
-        pos = self.get_position()
-        return pygame.Rect(
-            pos[0] - self.width // 2,
-            pos[1] - self.height // 2,
-            self.width,
-            self.height
-        )
+        """获取碰撞体的rect对象；返回的是缓存，不要修改"""
+        if self.cached_version != self.gameObject.transform.version:
+            self._refresh_cache()
+        return self.cached_rect
+
+    def overlaps_rect(self, rect):
+        return self.get_rect().colliderect(rect)
+
+    def intersect_ray(self, origin, direction, max_distance):
+        """射线与矩形求交(slab方法)"""
+        left, top, right, bottom = self.get_bounds()
+        near, far = 0.0, max_distance
+        normal = (0, 0)
+        for axis, low, high in ((0, left, right), (1, top, bottom)):
+            start, step = origin[axis], direction[axis]
+            if step == 0:
+                if start < low or start > high:
+                    return None
+                continue
+            t1, t2 = (low - start) / step, (high - start) / step
+            axis_normal = (-1, 0) if axis == 0 else (0, -1)
+            if t1 > t2:
+                t1, t2 = t2, t1
+                axis_normal = (-axis_normal[0], -axis_normal[1])
+            if t1 > near:
+                near, normal = t1, axis_normal
+            far = min(far, t2)
+            if near > far:
+                return None
+        return near, normal
     
     def check_collision(self, other):
         """检查与其他碰撞体的碰撞"""
@@ -231,20 +533,68 @@ class BoxCollider(Collider):
         if not self.enabled or not self.gameObject.active:
             return
             
-        rect = self.get_rect()
-        pygame.draw.rect(
-            ufb.GameObjectManager.instance.canvas,
+        rect = ufb.GameObjectManager.instance.world_rect_to_screen(self.get_rect())
+        ufb.GameObjectManager.instance.draw_command(lambda canvas: pygame.draw.rect(
+            canvas,
             color,
             rect,
             1  # 线宽
-        )
+        ))
 
 # 圆形碰撞体
 class CircleCollider(Collider):
-    def __init__(self, gameObject, radius=25, offset=(0, 0), isTrigger=False, tag=""):
-        super().__init__(gameObject, isTrigger, tag)
-        self.radius = radius
+    def __init__(self, gameObject, radius=25, offset=(0, 0), isTrigger=False, tag="", static=False, layer=0):
+        self._radius = radius
+        super().__init__(gameObject, isTrigger, tag, static, layer)
         self.offset = offset
+
+    @property
+    def radius(self):
+        return self._radius
+
+    @radius.setter
+    def radius(self, value):
+        self._radius = value
+        self._shape_changed()
+
+    def _update_cache(self, position):
+        radius = self._radius
+        self.cached_position = position
+        self.cached_bounds = (position[0] - radius, position[1] - radius,
+                              position[0] + radius, position[1] + radius)
+
+    def local_extents(self):
+        return ((self.offset[0] - self.radius, self.offset[1] - self.radius),
+                (self.offset[0] + self.radius, self.offset[1] + self.radius))
+
+    def overlaps_rect(self, rect):
+        pos = self.get_position()
+        rect = pygame.Rect(rect)
+        distance_x = pos[0] - max(rect.left, min(pos[0], rect.right))
+        distance_y = pos[1] - max(rect.top, min(pos[1], rect.bottom))
+        return distance_x * distance_x + distance_y * distance_y < self.radius * self.radius
+
+    def intersect_ray(self, origin, direction, max_distance):
+        """射线与圆求交，direction为单位向量"""
+        pos = self.get_position()
+        to_center_x, to_center_y = pos[0] - origin[0], pos[1] - origin[1]
+        projection = to_center_x * direction[0] + to_center_y * direction[1]
+        distance_squared = to_center_x * to_center_x + to_center_y * to_center_y - projection * projection
+        radius_squared = self.radius * self.radius
+        if distance_squared > radius_squared:
+            return None
+        half_chord = (radius_squared - distance_squared) ** 0.5
+        distance = projection - half_chord
+        if distance < 0:
+            if projection + half_chord < 0:
+                return None  # 圆在射线起点后方
+            distance = 0.0  # 起点在圆内
+        if distance > max_distance:
+            return None
+        hit_x, hit_y = origin[0] + direction[0] * distance, origin[1] + direction[1] * distance
+        normal_x, normal_y = hit_x - pos[0], hit_y - pos[1]
+        length = (normal_x * normal_x + normal_y * normal_y) ** 0.5 or 1.0
+        return distance, (normal_x / length, normal_y / length)
     
     def check_collision(self, other):
         """检查与其他碰撞体的碰撞"""
@@ -270,49 +620,153 @@ class CircleCollider(Collider):
         if not self.enabled or not self.gameObject.active:
             return
             
-        pos = self.get_position()
-        pygame.draw.circle(
-            ufb.GameObjectManager.instance.canvas,
+        pos = ufb.GameObjectManager.instance.world_to_screen(self.get_position())
+        ufb.GameObjectManager.instance.draw_command(lambda canvas: pygame.draw.circle(
+            canvas,
             color,
             (int(pos[0]), int(pos[1])),
             self.radius,
             1  # 线宽
-        )
+        ))
 
 
 
 
 # 地面渲染器
 class SpriteRenderer(ufb.Component):
-    def __init__(self, gameObject, image_path=None, size=None):
+    def __init__(self, gameObject, image_path=None, size=None, static=False, sortingOrder=0, sortingLayer=0):
         super().__init__(gameObject)
         self.image = None
+        self.image_key = None  # 当前图片在资源缓存中的 (路径, 尺寸)
+        self.static = False  # 静态渲染组件烘焙到静态层中，不再每帧单独绘制
+        self.sortingOrder = sortingOrder  # 绘制顺序，小的先画；静态渲染组件在静态层内部排序
+        self.sortingLayer = sortingLayer  # 渲染队列中的排序层，静态渲染组件不使用
         if image_path:
             self.load_image(image_path, size)
+        self.set_static(static)
+
+    def set_static(self, static):
+        """设置是否为静态渲染组件(不会移动的背景、地面等)"""
+        static_layer = ufb.GameObjectManager.instance.static_layer
+        if static:
+            static_layer.register(self)
+        else:
+            static_layer.unregister(self)
+        self.static = static
+
+    def static_signature(self):
+        """静态层用来判断是否需要重新烘焙的状态"""
+        transform = self.gameObject.transform
+        return (self.image, transform.position if transform else None,
+                self.enable and self.gameObject.active, self.sortingOrder)
+
+    def world_rect(self):
+        """图片在世界坐标中占据的矩形，不显示时返回None"""
+        transform = self.gameObject.transform
+        if not (self.image and transform and self.enable and self.gameObject.active):
+            return None
+        return pygame.Rect(transform.position[0] - self.image.get_width() // 2,
+                           transform.position[1] - self.image.get_height() // 2,
+                           self.image.get_width(), self.image.get_height())
+
+    def draw_to(self, surface, offset=(0, 0)):
+        """把图片画到静态层上，offset为世界坐标到静态层坐标的偏移"""
+        rect = self.world_rect()
+        if rect is not None:
+            surface.blit(self.image, (rect.x + offset[0], rect.y + offset[1]))
     
     def awake(self):
         super().awake()
             
     def load_image(self, image_path, size=None):
-        """加载指定路径的图片"""
+        """加载指定路径的图片，图片由全局资源缓存共享"""
         try:
-            self.image = pygame.image.load(image_path).convert_alpha()
-            if size:
-                self.image = pygame.transform.scale(self.image, size)
+            image = ufb.AssetCache.get_instance().load(image_path, size)
         except pygame.error as e:
             print(f"无法加载图片 {image_path}: {e}")
+            return
+        self.release_image()
+        self.image = image
+        self.image_key = (image_path, size)
+
+    def release_image(self):
+        """释放当前图片在资源缓存中的引用"""
+        if self.image_key is not None:
+            ufb.AssetCache.get_instance().release(*self.image_key)
+            self.image_key = None
+
+    def onDestroy(self):
+        self.set_static(False)
+        self.release_image()
+        super().onDestroy()
             
-    def update(self, deltaTime):
-        """渲染精灵"""
-        if self.image and self.gameObject.active:
+    def render(self):
+        """渲染精灵；静态渲染组件由静态层统一绘制"""
+        if self.image and self.gameObject.active and not self.static:
             # 获取变换组件
-            transform = self.gameObject.transform
+            render_x, render_y = self.gameObject.transform.getRenderPosition()
             # 计算绘制位置（让物体位置对应图像中心）
-            draw_x = transform.position[0] - self.image.get_width() // 2
-            draw_y = transform.position[1] - self.image.get_height() // 2
+            draw_x = render_x - self.image.get_width() // 2
+            draw_y = render_y - self.image.get_height() // 2
             
-            # 绘制到画布上
-            ufb.GameObjectManager.instance.canvas.blit(self.image, (draw_x, draw_y))
+            # 绘制到画布上，视口外的会被剔除
+            ufb.GameObjectManager.instance.blit_world(self.image, (draw_x, draw_y), z=self.sortingOrder, layer=self.sortingLayer)
+
+
+# 摄像机
+class Camera(ufb.Component):
+    """
+    摄像机组件
+
+    视口中心为物体的位置，或者跟随的目标的渲染位置；bounds限制视口不超出关卡范围。
+    第一个创建的摄像机成为主摄像机，渲染组件通过GameObjectManager.blit_world按世界坐标绘制，
+    由主摄像机换算成屏幕坐标，完全在视口外的精灵不会被绘制。
+    """
+    def __init__(self, gameObject, viewport_size=None, target=None, bounds=None):
+        super().__init__(gameObject)
+        manager = ufb.GameObjectManager.instance
+        self.viewport_size = viewport_size or (manager.canvasWeight, manager.canvasHeight)
+        self.target = target          # 跟随的游戏物体，为None时使用自身位置
+        self.bounds = pygame.Rect(bounds) if bounds is not None else None  # 视口允许的世界范围
+        self.offset = (0, 0)          # 视口左上角的世界坐标
+        self.view_rect = pygame.Rect((0, 0), self.viewport_size)
+        self.culled_count = 0         # 本帧被剔除的绘制次数
+        if manager.camera is None:
+            manager.camera = self
+
+    def set_main(self):
+        """设置为主摄像机"""
+        ufb.GameObjectManager.instance.camera = self
+
+    def refresh(self):
+        """每帧渲染前由管理器调用，更新视口位置"""
+        self.culled_count = 0
+        source = self.target if self.target is not None else self.gameObject
+        if source.transform is None:
+            return
+        center_x, center_y = source.transform.getRenderPosition()
+        view = self.view_rect
+        # 取整，避免精灵在小数坐标上抖动
+        view.center = (int(round(center_x)), int(round(center_y)))
+        if self.bounds is not None:
+            view.clamp_ip(self.bounds)
+        self.offset = view.topleft
+
+    def world_to_screen(self, position):
+        return (position[0] - self.offset[0], position[1] - self.offset[1])
+
+    def screen_to_world(self, position):
+        return (position[0] + self.offset[0], position[1] + self.offset[1])
+
+    def is_visible(self, rect):
+        """世界坐标的矩形是否与视口相交"""
+        return self.view_rect.colliderect(rect)
+
+    def onDestroy(self):
+        manager = ufb.GameObjectManager.instance
+        if manager.camera is self:
+            manager.camera = None
+        super().onDestroy()
 
 
 # 调试组件
@@ -323,8 +777,8 @@ class DebugRenderer(ufb.Component):
         super().__init__(gameObject)
         self.show_colliders = show_colliders
         
-    def update(self, deltaTime):
-        """每帧更新时绘制调试信息"""
+    def render(self):
+        """渲染阶段绘制调试信息"""
         if self.show_colliders:
             self.draw_colliders()
     
@@ -335,9 +789,10 @@ class DebugRenderer(ufb.Component):
                 
         collider = self.gameObject.getComponent(BoxCollider)
         if collider and collider.enabled:
-            rect = collider.get_rect()
+            rect = ufb.GameObjectManager.instance.world_rect_to_screen(collider.get_rect())
             color = (0, 0, 255) if collider.isTrigger else (0, 255, 0)
-            pygame.draw.rect(ufb.GameObjectManager.instance.canvas, color, rect, 2)
+            # pygame.draw不能合并进blits，作为命令提交到渲染队列，保持绘制顺序
+            ufb.GameObjectManager.instance.draw_command(lambda canvas: pygame.draw.rect(canvas, color, rect, 2))
     
     def set_show_colliders(self, value):
         """设置是否显示碰撞体"""
@@ -0,0 +1,194 @@
+"""
+粒子系统组件(需要NumPy)
+
+粒子的位置、速度、存活时间存放在NumPy数组中，每帧用向量运算统一更新；透明度随存活时间
+从start_alpha渐变到end_alpha，预先烘焙alpha_levels档透明度的贴图，绘制时按档位取图，
+剔除视口外的粒子后通过GameObjectManager.blits作为渲染队列中的一项整批提交；
+开启脏矩形渲染时按粒子逐个登记改动区域。
+"""
+import math
+import pygame
+import UnityFrame.UnityFrameBase as ufb
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ParticleSystem(ufb.Component):
+    """
+    粒子发射器
+
+    参数:
+        image_path: 粒子贴图
+        max_particles: 同时存在的粒子上限，超出的发射会被丢弃
+        emission_rate: 每秒持续发射的粒子数，0表示只通过emit(count)爆发
+        lifetime: 存活时间范围(秒)
+        speed: 初速度范围(像素/秒)
+        angle: 发射方向范围(度，0为向右，90为向下)
+        gravity: 加速度(像素/秒²)
+        spawn_area: 以物体位置为中心的发射区域 (宽, 高)
+        area: 只使用贴图中的这块区域 (x, y, 宽, 高)，用于条状的粒子图集
+        scale: 贴图缩放比例
+        start_alpha, end_alpha: 出生和消失时的透明度
+        alpha_levels: 预烘焙的透明度档位数
+        seed: 随机数种子，给定后每次运行的粒子完全相同
+        sortingOrder, sortingLayer: 整批粒子在渲染队列中的排序
+    """
+    def __init__(self, gameObject, image_path, max_particles=1000, emission_rate=0, lifetime=(1.0, 2.0),
+                 speed=(20, 60), angle=(0, 360), gravity=(0, 0), spawn_area=(0, 0), area=None, scale=1.0,
+                 start_alpha=255, end_alpha=0, alpha_levels=16, seed=None, sortingOrder=0, sortingLayer=0):
+        if np is None:
+            raise ImportError("ParticleSystem需要NumPy，请先安装: pip install numpy")
+        super().__init__(gameObject)
+        self.max_particles = max_particles
+        self.emission_rate = emission_rate
+        self.lifetime = lifetime
+        self.speed = speed
+        self.angle = angle
+        self.gravity = np.array(gravity, dtype=float)
+        self.spawn_area = spawn_area
+        self.sortingOrder = sortingOrder
+        self.sortingLayer = sortingLayer
+        self.playing = True
+        self.emission_accumulator = 0.0  # 不足一个粒子的发射量留到下一帧
+        self.rng = np.random.default_rng(seed)
+
+        # 粒子状态，存活的粒子总是排在前count个
+        self.count = 0
+        self.positions = np.zeros((max_particles, 2))
+        self.velocities = np.zeros((max_particles, 2))
+        self.ages = np.zeros(max_particles)
+        self.lifetimes = np.ones(max_particles)
+
+        self.image_key = (image_path, None)
+        image = ufb.AssetCache.get_instance().load(image_path)
+        if area is not None:
+            image = image.subsurface(area)
+        self.variants = self._bake_variants(image, scale, start_alpha, end_alpha, alpha_levels)
+        self.half_size = (self.variants[0].get_width() // 2, self.variants[0].get_height() // 2)
+
+    @staticmethod
+    def _bake_variants(image, scale, start_alpha, end_alpha, levels):
+        """
+        按存活进度从0到1烘焙levels档透明度的贴图
+
+        透明度直接乘进每个像素的alpha，而不是用set_alpha：逐像素透明度加整体透明度的组合
+        blit时要走慢路径；同时复制到与画布通道顺序一致的SRCALPHA格式，无窗口时没有convert_alpha也能快速绘制。
+        """
+        base = ufb.EffectCache.get_instance().get(image, scale)
+        levels = max(2, levels)
+        variants = []
+        for index in range(levels):
+            alpha = int(round(start_alpha + (end_alpha - start_alpha) * index / (levels - 1)))
+            variant = pygame.Surface(base.get_size(), pygame.SRCALPHA)
+            variant.blit(base, (0, 0), special_flags=pygame.BLEND_RGBA_MAX)  # 原样复制，不与透明的底色混合
+            variant.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+            variants.append(variant)
+        return variants
+
+    def play(self):
+        self.playing = True
+
+    def stop(self, clear=False):
+        """停止持续发射；clear为True时同时清除已有的粒子"""
+        self.playing = False
+        self.emission_accumulator = 0.0
+        if clear:
+            self.count = 0
+
+    def emit(self, count, position=None):
+        """在position(默认物体位置)发射count个粒子，返回实际发射的数量"""
+        count = min(int(count), self.max_particles - self.count)
+        if count <= 0:
+            return 0
+        if position is None:
+            position = self.gameObject.transform.position
+        rng = self.rng
+        start, end = self.count, self.count + count
+        half_width, half_height = self.spawn_area[0] / 2, self.spawn_area[1] / 2
+        self.positions[start:end, 0] = position[0] + rng.uniform(-half_width, half_width, count)
+        self.positions[start:end, 1] = position[1] + rng.uniform(-half_height, half_height, count)
+        angles = np.radians(rng.uniform(self.angle[0], self.angle[1], count))
+        speeds = rng.uniform(self.speed[0], self.speed[1], count)
+        self.velocities[start:end, 0] = np.cos(angles) * speeds
+        self.velocities[start:end, 1] = np.sin(angles) * speeds
+        self.ages[start:end] = 0.0
+        self.lifetimes[start:end] = rng.uniform(self.lifetime[0], self.lifetime[1], count)
+        self.count = end
+        return count
+
+    def simulate(self, deltaTime):
+        """持续发射、移动粒子并移除到期的粒子"""
+        if self.playing and self.emission_rate > 0:
+            self.emission_accumulator += self.emission_rate * deltaTime
+            spawn = math.floor(self.emission_accumulator)
+            if spawn > 0:
+                self.emission_accumulator -= spawn
+                self.emit(spawn)
+
+        count = self.count
+        if count == 0:
+            return
+        velocities = self.velocities[:count]
+        velocities += self.gravity * deltaTime
+        self.positions[:count] += velocities * deltaTime
+        ages = self.ages[:count]
+        ages += deltaTime
+
+        alive = ages < self.lifetimes[:count]
+        if not alive.all():
+            # 把存活的粒子挪到数组前面
+            keep = np.flatnonzero(alive)
+            kept = len(keep)
+            self.positions[:kept] = self.positions[keep]
+            self.velocities[:kept] = self.velocities[keep]
+            self.ages[:kept] = self.ages[keep]
+            self.lifetimes[:kept] = self.lifetimes[keep]
+            self.count = kept
+
+    def draw(self):
+        """剔除视口外的粒子，按透明度档位取图后一次批量绘制"""
+        count = self.count
+        if count == 0:
+            return
+        manager = ufb.GameObjectManager.instance
+        half_width, half_height = self.half_size
+        # 贴图左上角的屏幕坐标
+        screen = self.positions[:count] - (half_width, half_height)
+        if manager.camera is not None:
+            screen -= manager.camera.offset
+        view_width, view_height = manager.canvas.get_size()
+        visible = ((screen[:, 0] > -2 * half_width) & (screen[:, 0] < view_width) &
+                   (screen[:, 1] > -2 * half_height) & (screen[:, 1] < view_height))
+        screen = screen[visible]
+        if len(screen) == 0:
+            return
+        levels = len(self.variants) - 1
+        progress = self.ages[:count][visible] / self.lifetimes[:count][visible]
+        indices = np.minimum((progress * levels + 0.5).astype(np.intp), levels)
+
+        points = screen.astype(np.intp)
+        variants = self.variants
+        width, height = variants[0].get_size()
+        # 开启脏矩形渲染时默认逐个登记粒子实际画过的区域(由canvas.blits返回)，稀疏的粒子不会让整屏重绘；
+        # 粒子总面积已经超过整屏提交的比例时必然整屏提交，只登记一个包围盒，省去逐个登记的开销
+        rect = None
+        dirty_renderer = manager.dirty_renderer
+        if dirty_renderer is not None and len(points) * width * height > view_width * view_height * dirty_renderer.full_update_ratio:
+            left, top = points.min(axis=0).tolist()
+            right, bottom = points.max(axis=0).tolist()
+            rect = pygame.Rect(left, top, right - left + width, bottom - top + height)
+        manager.blits(list(zip([variants[index] for index in indices.tolist()], points.tolist())), rect,
+                      self.sortingOrder, self.sortingLayer)
+
+    def update(self, deltaTime):
+        self.simulate(deltaTime)
+
+    def render(self):
+        self.draw()
+
+    def onDestroy(self):
+        ufb.AssetCache.get_instance().release(*self.image_key)
+        super().onDestroy()
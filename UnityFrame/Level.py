@@ -0,0 +1,352 @@
+"""
+分块关卡
+
+关卡目录中有一个索引文件 level.json 和若干区块文件，区块按 chunk_size x chunk_size 个图块划分:
+
+    level.json
+    {
+        "version": 1,
+        "name": "Demo",
+        "origin": [1000, 0],          # 关卡左上角的世界坐标
+        "tile_size": 75,              # 图块边长(像素)
+        "chunk_size": 8,              # 每个区块的边长(图块数)
+        "size": [64, 8],              # 关卡大小(图块数)
+        "tiles": {"1": {"image": "Assets/...png", "solid": "Ground"}},  # 图块编号 -> 图片、碰撞标签
+        "chunks": {"0,0": "chunk_0_0.json"}
+    }
+
+    chunk_0_0.json
+    {
+        "tiles": [[0, 0, 1, ...], ...],                  # 行优先的图块编号，0为空
+        "colliders": [[col, row, width, height, "Ground"]],  # 合并好的碰撞盒(图块坐标)，可省略
+        "objects": [{"name": "Door", "position": [x, y], "image": "...", "size": [w, h],
+                     "collider": {"width": w, "height": h, "offset": [0, 0], "tag": "", "trigger": false,
+                                  "static": true, "layer": "Interactable"}}]
+    }
+
+LevelStreamer组件在后台线程读取摄像机附近的区块，图片交给AssetCache预加载，准备好后在主线程
+每帧最多生成build_budget个区块；远离摄像机的区块被销毁。区块的图块烘焙成一张图片，相邻的实心图块
+合并为少量碰撞盒，所以同时存在的物体数量和内存占用都是有上限的。
+碰撞体的层由物体的 "layer"(层名或层号)指定，没有指定时按标签查LevelStreamer的tag_layers。
+"""
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+import UnityFrame.UnityFrameBase as ufb
+import UnityFrame.Components.Components as cp
+
+LEVEL_VERSION = 1
+
+
+def merge_solid_tiles(tiles, solid_tags):
+    """
+    把相邻的实心图块合并为矩形，返回 [列, 行, 宽, 高, 标签] 列表(图块坐标)
+
+    先把每一行中连续且标签相同的图块合并为横条，再把上下相邻、起止列相同的横条合并为矩形。
+    solid_tags为 图块编号 -> 碰撞标签，不在其中的图块没有碰撞。
+    """
+    rects = []
+    open_runs = {}  # (起始列, 宽, 标签) -> 上一行延伸下来的矩形
+    for row_index, row in enumerate(tiles):
+        next_runs = {}
+        col = 0
+        while col < len(row):
+            tag = solid_tags.get(row[col])
+            if tag is None:
+                col += 1
+                continue
+            start = col
+            while col < len(row) and solid_tags.get(row[col]) == tag:
+                col += 1
+            run = (start, col - start, tag)
+            rect = open_runs.get(run)
+            if rect is not None:
+                rect[3] += 1
+            else:
+                rect = [start, row_index, col - start, 1, tag]
+                rects.append(rect)
+            next_runs[run] = rect
+        open_runs = next_runs
+    return rects
+
+
+class Level:
+    """关卡索引，负责读取区块文件和坐标换算，本身不创建任何物体"""
+    def __init__(self, path):
+        self.folder = path if os.path.isdir(path) else os.path.dirname(path)
+        index_path = os.path.join(path, "level.json") if os.path.isdir(path) else path
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != LEVEL_VERSION:
+            raise ValueError(f"不支持的关卡版本: {index.get('version')}")
+        self.name = index["name"]
+        self.origin = tuple(index.get("origin", (0, 0)))
+        self.tile_size = index["tile_size"]
+        self.chunk_size = index["chunk_size"]
+        self.size = tuple(index["size"])
+        self.tiles = {int(tile_id): tile for tile_id, tile in index["tiles"].items()}
+        self.solid_tags = {tile_id: tile["solid"] for tile_id, tile in self.tiles.items() if tile.get("solid")}
+        self.chunks = {tuple(int(value) for value in coord.split(",")): file_name
+                       for coord, file_name in index["chunks"].items()}
+        self.chunk_pixels = self.tile_size * self.chunk_size
+        self.bounds = pygame.Rect(self.origin, (self.size[0] * self.tile_size, self.size[1] * self.tile_size))
+
+    def read_chunk(self, coord):
+        """读取区块文件，可以在后台线程中调用"""
+        with open(os.path.join(self.folder, self.chunks[coord]), encoding="utf-8") as f:
+            data = json.load(f)
+        if "colliders" not in data:
+            data["colliders"] = merge_solid_tiles(data["tiles"], self.solid_tags)
+        return data
+
+    def chunk_rect(self, coord):
+        """区块在世界坐标中的矩形"""
+        return pygame.Rect(self.origin[0] + coord[0] * self.chunk_pixels,
+                           self.origin[1] + coord[1] * self.chunk_pixels,
+                           self.chunk_pixels, self.chunk_pixels)
+
+    def chunk_at(self, position):
+        """世界坐标所在的区块坐标(可能不存在)"""
+        return (int((position[0] - self.origin[0]) // self.chunk_pixels),
+                int((position[1] - self.origin[1]) // self.chunk_pixels))
+
+    def chunk_images(self, data):
+        """区块用到的所有图片路径"""
+        paths = {self.tiles[tile_id]["image"] for row in data["tiles"] for tile_id in row if tile_id}
+        paths.update(entry["image"] for entry in data.get("objects", ()) if entry.get("image"))
+        return sorted(paths)
+
+    @staticmethod
+    def save(folder, name, tiles, tile_defs, tile_size, chunk_size, origin=(0, 0), objects=()):
+        """
+        把整张图块表切分成区块写入folder，碰撞盒在保存时预先合并好
+
+        参数:
+            tiles: 行优先的图块编号二维列表，0为空
+            tile_defs: 图块编号 -> {"image": 路径, "solid": 碰撞标签或省略}
+            objects: 物体列表，position为世界坐标，按所在区块保存
+        """
+        os.makedirs(folder, exist_ok=True)
+        rows, cols = len(tiles), max(len(row) for row in tiles)
+        solid_tags = {tile_id: tile["solid"] for tile_id, tile in tile_defs.items() if tile.get("solid")}
+        chunk_pixels = tile_size * chunk_size
+        chunk_objects = {}
+        for entry in objects:
+            coord = (int((entry["position"][0] - origin[0]) // chunk_pixels),
+                     int((entry["position"][1] - origin[1]) // chunk_pixels))
+            chunk_objects.setdefault(coord, []).append(entry)
+
+        chunks = {}
+        for chunk_y in range((rows + chunk_size - 1) // chunk_size):
+            for chunk_x in range((cols + chunk_size - 1) // chunk_size):
+                chunk_tiles = []
+                for row in tiles[chunk_y * chunk_size:(chunk_y + 1) * chunk_size]:
+                    part = row[chunk_x * chunk_size:(chunk_x + 1) * chunk_size]
+                    chunk_tiles.append(part + [0] * (chunk_size - len(part)))
+                chunk_tiles += [[0] * chunk_size] * (chunk_size - len(chunk_tiles))
+                entries = chunk_objects.get((chunk_x, chunk_y), [])
+                if not entries and not any(any(row) for row in chunk_tiles):
+                    continue  # 空区块不保存
+                file_name = f"chunk_{chunk_x}_{chunk_y}.json"
+                data = {"tiles": chunk_tiles, "colliders": merge_solid_tiles(chunk_tiles, solid_tags), "objects": entries}
+                with open(os.path.join(folder, file_name), "w", encoding="utf-8") as f:
+                    json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+                chunks[f"{chunk_x},{chunk_y}"] = file_name
+
+        index = {
+            "version": LEVEL_VERSION,
+            "name": name,
+            "origin": list(origin),
+            "tile_size": tile_size,
+            "chunk_size": chunk_size,
+            "size": [cols, rows],
+            "tiles": {str(tile_id): tile for tile_id, tile in tile_defs.items()},
+            "chunks": chunks,
+        }
+        with open(os.path.join(folder, "level.json"), "w", encoding="utf-8") as f:
+            json.dump(index, f, ensure_ascii=False, indent=2)
+        return index
+
+
+class LevelChunk:
+    """已生成的区块，记录属于它的物体和图片引用，卸载时一起释放"""
+    def __init__(self, coord):
+        self.coord = coord
+        self.gameObjects = []
+
+    def destroy(self):
+        for gameObject in self.gameObjects:
+            gameObject.destroy()
+        self.gameObjects = []
+
+
+class LevelStreamer(ufb.Component):
+    """
+    按摄像机位置流式加载关卡区块
+
+    摄像机所在区块周围load_radius圈内的区块会被加载，超出unload_radius圈的被卸载；
+    unload_radius大于load_radius，摄像机在区块边界来回移动时不会反复加载卸载。
+    """
+    def __init__(self, gameObject, level, load_radius=1, unload_radius=2, build_budget=1, pump_budget_ms=2.0,
+                 merge_colliders=True, tag_layers=None):
+        super().__init__(gameObject)
+        self.level = level
+        self.load_radius = load_radius
+        self.unload_radius = max(unload_radius, load_radius)
+        self.build_budget = build_budget      # 每帧最多生成的区块数
+        self.pump_budget_ms = pump_budget_ms  # 每帧用于转换预加载图片的时间
+        self.merge_colliders = merge_colliders  # 生成区块时合并相邻的静态碰撞体
+        self.tag_layers = tag_layers or {}      # 标签 -> 碰撞层，用于没有指定层的碰撞体
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="LevelLoader")
+        self.pending = {}  # 区块坐标 -> [读取区块的Future, 区块数据, 图片预加载Future列表]
+        self.loaded = {}   # 区块坐标 -> LevelChunk
+
+    def update(self, deltaTime):
+        center = self._center_chunk()
+        self._unload_far_chunks(center)
+        self._request_near_chunks(center)
+        ufb.AssetCache.get_instance().pump(self.pump_budget_ms)
+        self._build_ready_chunks(center)
+
+    def _center_chunk(self):
+        camera = ufb.GameObjectManager.instance.camera
+        if camera is not None:
+            return self.level.chunk_at(camera.view_rect.center)
+        return self.level.chunk_at(self.gameObject.transform.position)
+
+    @staticmethod
+    def _distance(coord, center):
+        return max(abs(coord[0] - center[0]), abs(coord[1] - center[1]))
+
+    def _request_near_chunks(self, center):
+        radius = self.load_radius
+        for chunk_y in range(center[1] - radius, center[1] + radius + 1):
+            for chunk_x in range(center[0] - radius, center[0] + radius + 1):
+                coord = (chunk_x, chunk_y)
+                if coord in self.level.chunks and coord not in self.loaded and coord not in self.pending:
+                    self.pending[coord] = [self.executor.submit(self.level.read_chunk, coord), None, None]
+
+    def _unload_far_chunks(self, center):
+        for coord in [coord for coord in self.loaded if self._distance(coord, center) > self.unload_radius]:
+            self.loaded.pop(coord).destroy()
+        for coord in [coord for coord in self.pending if self._distance(coord, center) > self.unload_radius]:
+            self.pending.pop(coord)[0].cancel()
+
+    def _build_ready_chunks(self, center):
+        ready = []
+        for coord, request in self.pending.items():
+            read_future, data, image_futures = request
+            if data is None:
+                if not read_future.done():
+                    continue
+                try:
+                    request[1] = data = read_future.result()
+                except Exception as e:
+                    print(f"无法读取区块 {coord}: {e}")
+                    request[1] = data = {"tiles": [], "colliders": [], "objects": []}
+                request[2] = image_futures = ufb.AssetCache.get_instance().preload(self.level.chunk_images(data))
+            if all(future.done() for future in image_futures):
+                ready.append(coord)
+        # 离摄像机近的区块先生成
+        ready.sort(key=lambda coord: self._distance(coord, center))
+        for coord in ready[:self.build_budget]:
+            self.loaded[coord] = self._build_chunk(coord, self.pending.pop(coord)[1])
+
+    def _build_chunk(self, coord, data):
+        """在主线程中生成区块的物体：一张烘焙好的图块图片、合并后的碰撞盒和区块中的物体"""
+        manager = ufb.GameObjectManager.instance
+        level = self.level
+        chunk = LevelChunk(coord)
+        chunk_rect = level.chunk_rect(coord)
+        prefix = f"{level.name}:{coord[0]},{coord[1]}"
+
+        tiles_image = self._bake_tiles(data["tiles"])
+        if tiles_image is not None:
+            tilesObject = ufb.GameObject(prefix, True)
+            tilesObject.addComponent(cp.Transform, chunk_rect.center)
+            # 图块画在同一排序层的角色和物体之下
+            tilesRenderer = tilesObject.addComponent(cp.SpriteRenderer, sortingOrder=-1)
+            tilesRenderer.image = tiles_image
+            chunk.gameObjects.append(tilesObject)
+
+        tile_size = level.tile_size
+        for index, (col, row, width, height, tag) in enumerate(data["colliders"]):
+            colliderObject = ufb.GameObject(f"{prefix}:collider{index}", True)
+            colliderObject.addComponent(cp.Transform, (chunk_rect.x + (col + width / 2) * tile_size,
+                                                       chunk_rect.y + (row + height / 2) * tile_size))
+            colliderObject.addComponent(cp.BoxCollider, width * tile_size, height * tile_size, (0, 0), False, tag,
+                                        static=True, layer=self._resolve_layer(None, tag))
+            chunk.gameObjects.append(colliderObject)
+
+        for entry in data.get("objects", ()):
+            entryObject = ufb.GameObject(f"{prefix}:{entry['name']}", True)
+            entryObject.addComponent(cp.Transform, tuple(entry["position"]))
+            if entry.get("image"):
+                entryObject.addComponent(cp.SpriteRenderer, entry["image"], tuple(entry["size"]) if entry.get("size") else None)
+            collider = entry.get("collider")
+            if collider:
+                entryObject.addComponent(cp.BoxCollider, collider["width"], collider["height"],
+                                         tuple(collider.get("offset", (0, 0))), collider.get("trigger", False),
+                                         collider.get("tag", ""), static=collider.get("static", True),
+                                         layer=self._resolve_layer(collider.get("layer"), collider.get("tag", "")))
+            chunk.gameObjects.append(entryObject)
+
+        if self.merge_colliders:
+            # 区块中的图块碰撞盒已经预先合并，这里再把与它们相邻的物体碰撞体合并进去
+            manager.collision_manager.merge_static_colliders(
+                [gameObject.getComponent(cp.BoxCollider) for gameObject in chunk.gameObjects
+                 if gameObject.getComponent(cp.BoxCollider) is not None])
+
+        for gameObject in chunk.gameObjects:
+            manager.startGameObject(gameObject)
+        return chunk
+
+    def _resolve_layer(self, layer, tag):
+        """碰撞层可以是层号或层名；没有指定时按标签查找，找不到则为0层"""
+        if layer is None:
+            return self.tag_layers.get(tag, 0)
+        if isinstance(layer, int):
+            return layer
+        collision_manager = ufb.GameObjectManager.instance.collision_manager
+        result = collision_manager.name_to_layer(layer)
+        if result < 0:
+            print(f"关卡 {self.level.name} 使用了没有定义的层 {layer}，改为0层")
+            return 0
+        return result
+
+    def _bake_tiles(self, tiles):
+        """把区块的图块画到一张图片上，区块没有图块时返回None"""
+        if not any(any(row) for row in tiles):
+            return None
+        level = self.level
+        tile_size = level.tile_size
+        surface = pygame.Surface((level.chunk_pixels, level.chunk_pixels), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        asset_cache = ufb.AssetCache.get_instance()
+        images = {}
+        for row_index, row in enumerate(tiles):
+            for col_index, tile_id in enumerate(row):
+                if not tile_id:
+                    continue
+                image = images.get(tile_id)
+                if image is None:
+                    image = images[tile_id] = asset_cache.load(level.tiles[tile_id]["image"], (tile_size, tile_size))
+                surface.blit(image, (col_index * tile_size, row_index * tile_size))
+        # 图块已经画进区块图片，不再持有引用
+        for tile_id in images:
+            asset_cache.release(level.tiles[tile_id]["image"], (tile_size, tile_size))
+        return surface
+
+    def loaded_object_count(self):
+        """当前由关卡生成的物体数量"""
+        return sum(len(chunk.gameObjects) for chunk in self.loaded.values())
+
+    def onDestroy(self):
+        for chunk in self.loaded.values():
+            chunk.destroy()
+        self.loaded = {}
+        self.pending = {}
+        self.executor.shutdown(wait=False)
+        super().onDestroy()
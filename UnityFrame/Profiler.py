@@ -0,0 +1,260 @@
+import csv
+import json
+import time
+from collections import deque
+
+
+class _NullSpan:
+    """未开启分析时使用的空计时区间，几乎没有额外开销"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """一次计时区间，退出时记录耗时并回到父节点"""
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        profiler = self.profiler
+        parent = profiler.stack[-1]
+        node = {"name": self.name, "start": 0.0, "duration": 0.0, "children": []}
+        parent["children"].append(node)
+        profiler.stack.append(node)
+        node["start"] = time.perf_counter() - profiler.origin
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        profiler = self.profiler
+        node = profiler.stack.pop()
+        node["duration"] = time.perf_counter() - profiler.origin - node["start"]
+        return False
+
+
+class _FrameSpan:
+    """逐帧分析的计时区间，退出时把耗时累加到当前帧的指定项目上"""
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.add(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class StartupProfiler:
+    """
+    启动耗时分析器(单例)
+
+    用 span(name) 包住需要计时的代码，嵌套的区间组成一棵调用树；未开启时 span 返回空区间。
+    结果可以导出为JSON树，或导出为火焰图工具(flamegraph.pl、speedscope)使用的折叠栈格式。
+    """
+    _instance = None
+
+    def __init__(self):
+        if StartupProfiler._instance is not None:
+            raise Exception("StartupProfiler is a singleton class")
+        else:
+            StartupProfiler._instance = self
+
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.root = {"name": "startup", "start": 0.0, "duration": 0.0, "children": []}
+        self.stack = [self.root]
+
+    @staticmethod
+    def get_instance():
+        """获取单例实例"""
+        if StartupProfiler._instance is None:
+            StartupProfiler()
+        return StartupProfiler._instance
+
+    def enable(self):
+        """开始记录，之前的记录会被清空"""
+        self.enabled = True
+        self.origin = time.perf_counter()
+        self.root = {"name": "startup", "start": 0.0, "duration": 0.0, "children": []}
+        self.stack = [self.root]
+
+    def span(self, name):
+        """返回一个计时区间，配合with使用"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def finish(self):
+        """停止记录，根节点的耗时为开启到现在的总时间"""
+        self.root["duration"] = time.perf_counter() - self.origin
+        self.enabled = False
+        return self.root
+
+    def to_dict(self):
+        """以毫秒为单位返回调用树"""
+        def convert(node):
+            return {
+                "name": node["name"],
+                "start_ms": round(node["start"] * 1000, 3),
+                "duration_ms": round(node["duration"] * 1000, 3),
+                "children": [convert(child) for child in node["children"]],
+            }
+        return convert(self.root)
+
+    def collapsed_stacks(self):
+        """
+        生成折叠栈格式的行: "startup;父;子 自身耗时(微秒)"
+
+        相同路径的区间会合并，每行的数值是该节点除去子节点之后的自身耗时。
+        """
+        totals = {}
+
+        def visit(node, prefix):
+            path = prefix + ";" + node["name"] if prefix else node["name"]
+            self_time = node["duration"] - sum(child["duration"] for child in node["children"])
+            totals[path] = totals.get(path, 0) + max(self_time, 0.0)
+            for child in node["children"]:
+                visit(child, path)
+
+        visit(self.root, "")
+        return [f"{path} {int(round(seconds * 1000000))}" for path, seconds in totals.items()]
+
+    def save(self, prefix):
+        """写出 <prefix>.json 和 <prefix>.folded 两个文件，返回文件路径"""
+        json_path = prefix + ".json"
+        folded_path = prefix + ".folded"
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        with open(folded_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(self.collapsed_stacks()) + "\n")
+        return json_path, folded_path
+
+    def summary(self, depth=2):
+        """返回按层级缩进的耗时摘要文本，只展开到指定深度"""
+        lines = []
+
+        def visit(node, level):
+            lines.append(f"{'  ' * level}{node['name']}: {node['duration'] * 1000:.1f} ms")
+            if level < depth:
+                for child in node["children"]:
+                    visit(child, level + 1)
+
+        visit(self.root, 0)
+        return "\n".join(lines)
+
+
+class FrameProfiler:
+    """
+    逐帧耗时分析器
+
+    由GameObjectManager在开启分析后调用：每帧begin_frame/end_frame之间用span或add累加各项耗时，
+    end_frame自动记录整帧耗时"frame"。每一项保留最近window帧的数据，用于计算p50/p95/p99；
+    连续window帧都没有出现的项目(如已经卸载的物体)会被移除。可以绘制到画布上，也可以导出CSV/JSON。
+    """
+    def __init__(self, window=300):
+        self.window = window
+        self.samples = {}        # 项目名 -> 最近window帧的耗时(秒)
+        self.last_seen = {}      # 项目名 -> 最后一次出现的帧序号
+        self.current = {}        # 当前帧正在累加的耗时
+        self.frame_start = 0.0
+        self.frames = 0          # 已记录的帧数
+        self.overlay_lines = []  # 缓存的覆盖层文字，避免每帧都重新渲染
+        self.overlay_surfaces = []
+        self.overlay_panel = None
+        self.font = None
+
+    def begin_frame(self):
+        self.current = {}
+        self.frame_start = time.perf_counter()
+
+    def span(self, name):
+        """返回一个计时区间，配合with使用，耗时累加到当前帧的name项目上"""
+        return _FrameSpan(self, name)
+
+    def add(self, name, seconds):
+        """把一段耗时累加到当前帧的指定项目上"""
+        self.current[name] = self.current.get(name, 0.0) + seconds
+
+    def end_frame(self):
+        """结束当前帧；本帧没有出现的项目记为0，保证各项的样本按帧对齐，连续window帧没有出现的项目移除"""
+        self.add("frame", time.perf_counter() - self.frame_start)
+        frame = self.frames
+        for name, seconds in self.current.items():
+            if name not in self.samples:
+                self.samples[name] = deque(maxlen=self.window)
+            self.samples[name].append(seconds)
+            self.last_seen[name] = frame
+        expired = []
+        for name, history in self.samples.items():
+            if name not in self.current:
+                if frame - self.last_seen[name] >= self.window:
+                    expired.append(name)
+                else:
+                    history.append(0.0)
+        for name in expired:
+            del self.samples[name]
+            del self.last_seen[name]
+        self.frames += 1
+
+    @staticmethod
+    def _percentile(ordered, percent):
+        index = min(len(ordered) - 1, int(round(percent / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def stats(self):
+        """返回 {项目名: {"mean", "p50", "p95", "p99", "max"}}，单位毫秒，按p95从大到小排序"""
+        result = {}
+        for name, history in self.samples.items():
+            if not history:
+                continue
+            ordered = sorted(history)
+            result[name] = {
+                "mean": sum(ordered) / len(ordered) * 1000,
+                "p50": self._percentile(ordered, 50) * 1000,
+                "p95": self._percentile(ordered, 95) * 1000,
+                "p99": self._percentile(ordered, 99) * 1000,
+                "max": ordered[-1] * 1000,
+            }
+        return dict(sorted(result.items(), key=lambda item: item[1]["p95"], reverse=True))
+
+    def dump_json(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"frames": self.frames, "window": self.window, "stats_ms": self.stats()},
+                      f, ensure_ascii=False, indent=2)
+
+    def dump_csv(self, path):
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["name", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"])
+            for name, values in self.stats().items():
+                writer.writerow([name] + [f"{values[key]:.4f}" for key in ("mean", "p50", "p95", "p99", "max")])
+
+    def draw_overlay(self, canvas, rows=12, refresh_frames=30):
+        """在画布左上角绘制耗时最高的几项，返回绘制区域；文字每refresh_frames帧才重新生成一次"""
+        import pygame
+        if self.font is None:
+            self.font = pygame.font.SysFont("consolas", 14)
+        if self.frames % refresh_frames == 0 or not self.overlay_surfaces:
+            self.overlay_lines = [f"{'item':<40}{'p50':>8}{'p95':>8}{'p99':>8}"]
+            for name, values in list(self.stats().items())[:rows]:
+                self.overlay_lines.append(f"{name[:40]:<40}{values['p50']:8.2f}{values['p95']:8.2f}{values['p99']:8.2f}")
+            self.overlay_surfaces = [self.font.render(line, True, (255, 255, 255)) for line in self.overlay_lines]
+            width = max(surface.get_width() for surface in self.overlay_surfaces) + 10
+            height = len(self.overlay_surfaces) * 16 + 10
+            self.overlay_panel = pygame.Surface((width, height), pygame.SRCALPHA)
+            self.overlay_panel.fill((0, 0, 0, 160))
+
+        rect = canvas.blit(self.overlay_panel, (5, 5))
+        for index, surface in enumerate(self.overlay_surfaces):
+            canvas.blit(surface, (10, 10 + index * 16))
+        return rect
@@ -1,6 +1,18 @@
 import pygame
 import random
 import os
+import json
+import queue
+import struct
+import sys
+import threading
+import time
+import wave
+from array import array
+from collections import OrderedDict
+from operator import itemgetter
+from concurrent.futures import Future, ThreadPoolExecutor
+from UnityFrame.Profiler import FrameProfiler, StartupProfiler, _NULL_SPAN
 
 class GameObjectManager:
     instance=None
@@ -8,13 +20,22 @@ class GameObjectManager:
         if cls.instance==None:
             cls.instance=super(GameObjectManager,cls).__new__(cls)
         return cls.instance
-    def __init__(self,target_fps=60,fixd_delta_time=0.02,canvasWeight=1000,canvasHeight=600):
+    def __init__(self,target_fps=60,fixd_delta_time=1/60,canvasWeight=1000,canvasHeight=600,headless=False,render=True):
         self.gameObjects=[]
         self.gameObjectDic={}
+        self.destroyQueue=[]  # 等待在本帧结束时销毁的物体
         self.started=False
         self.canvasWeight=canvasWeight
         self.canvasHeight=canvasHeight
-        self.canvas=canvas=pygame.display.set_mode((canvasWeight,canvasHeight))
+        self.render_enabled=render  # 为False时跳过渲染阶段，只运行模拟
+
+        # 无窗口模式：不创建窗口，按固定步长推进时间，可以远快于实时地运行模拟
+        self.headless=headless
+        if headless:
+            # 画到离屏Surface上；不需要画面时只给1x1的画布，所有绘制都会被直接裁剪掉
+            self.canvas=pygame.Surface((canvasWeight,canvasHeight) if render else (1,1))
+        else:
+            self.canvas=canvas=pygame.display.set_mode((canvasWeight,canvasHeight))
 
         # 帧率控制相关属性
         self.clock = pygame.time.Clock()  # Pygame时钟对象
@@ -22,30 +43,74 @@ class GameObjectManager:
         self.delta_time = 0  # 每帧的时间间隔(秒)
         self.fixed_delta_time = fixd_delta_time # 固定物理更新时间间隔(秒)
         self.accumulated_time = 0  # 累积的时间(用于固定更新)
+        self.max_fixed_steps = 5  # 每帧最多执行的固定更新次数，卡顿时丢弃多余的时间，避免越卡越慢
+        self.interpolation_alpha = 1.0  # 渲染插值系数: 剩余累积时间 / 固定步长
         self.current_fps = 0  # 当前实际帧率
         self.frame_count = 0  # 帧计数器
         self.fps_update_time = 0  # 上次FPS更新时间
+        self.frame_index = 0  # 已运行的总帧数
+        self.simulated_time = 0  # 无窗口模式下模拟经过的时间(秒)
+
+        # 输入
+        self.input = Input.get_instance()
 
         # 初始化碰撞管理器
         self.collision_manager = CollisionManager()
 
+        # 逐帧耗时分析器，调用enable_profiler后才会记录
+        self.profiler = None
+
+        # 脏矩形渲染器，调用enable_dirty_rects后只重绘和提交变化的区域
+        self.dirty_renderer = None
+
+        # 静态层：标记为static的渲染组件烘焙在一起，每帧一次blit
+        self.static_layer = StaticLayer()
+
+        # 主摄像机，由Camera组件注册；没有摄像机时世界坐标就是屏幕坐标
+        self.camera = None
+
+        # 渲染队列：组件在update中提交绘制，所有物体更新完之后按 (排序层, z) 排序并一次性绘制
+        self.render_queue = RenderQueue()
+
+        # 数组存储(需要NumPy)，调用enable_array_store后ArrayTransform才能使用
+        self.array_store = None
+
     def startGame(self):
         # 初始化FPS计算相关变量
-        self.fps_update_time = pygame.time.get_ticks() / 1000
+        self.fps_update_time = self.simulated_time if self.headless else pygame.time.get_ticks() / 1000
 
+        profiler = StartupProfiler.get_instance()
         for gameObjcet in self.gameObjects:
-            gameObjcet.awake()
+            with profiler.span(gameObjcet.name + ".awake"):
+                gameObjcet.awake()
         for gameObjcet in self.gameObjects:
             if gameObjcet.active==True:
-                gameObjcet.start()
+                with profiler.span(gameObjcet.name + ".start"):
+                    gameObjcet.start()
+        # 第一帧的update之前先确定一次视口，依赖摄像机的组件(如关卡流式加载)从第一帧起就能使用
+        if self.camera is not None:
+            self.camera.refresh()
+        self.started=True
 
     def gameLoopLogic(self):
-        # 控制帧率并获取实际帧时间
-        self.delta_time = self.clock.tick(self.target_fps) / 1000.0
+        if self.headless:
+            # 无窗口模式不等待，每帧固定前进 1/target_fps 秒，结果与机器快慢无关
+            self.delta_time = 1.0 / self.target_fps
+            self.simulated_time += self.delta_time
+            current_time = self.simulated_time
+        else:
+            # 控制帧率并获取实际帧时间
+            self.delta_time = self.clock.tick(self.target_fps) / 1000.0
+            current_time = pygame.time.get_ticks() / 1000
+        self.frame_index += 1
+
+        # 采样本帧的按键状态；回放带帧时间的录像时改用录制时的帧时间，固定更新的次数与录制时一致
+        self.input.new_frame(self.delta_time)
+        if self.input.replay_frame_time is not None:
+            self.delta_time = self.input.replay_frame_time or 1.0 / self.target_fps
 
         # 更新FPS计数
         self.frame_count += 1
-        current_time = pygame.time.get_ticks() / 1000
 
         # 每秒更新一次FPS显示
         if current_time - self.fps_update_time >= 1.0:
@@ -53,40 +118,192 @@ class GameObjectManager:
             self.frame_count = 0
             self.fps_update_time = current_time
 
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.begin_frame()
+
         # 更新游戏状态
-        self.update()
+        with self._profile("update"):
+            self.update()
 
         # 累积时间用于固定更新
         self.accumulated_time += self.delta_time
 
         # 执行固定更新（可能多次）
-        while self.accumulated_time >= self.fixed_delta_time:
-            self.fixUpdate()
-            self.accumulated_time -= self.fixed_delta_time
+        with self._profile("fixUpdate"):
+            steps = 0
+            while self.accumulated_time >= self.fixed_delta_time:
+                if steps == self.max_fixed_steps:
+                    self.accumulated_time = 0
+                    break
+                self.fixUpdate()
+                self.accumulated_time -= self.fixed_delta_time
+                steps += 1
+        self.interpolation_alpha = self.accumulated_time / self.fixed_delta_time
 
         # 碰撞检测和响应
-        self.collision_manager.update()
+        with self._profile("CollisionManager.update"):
+            self.collision_manager.update()
+
+        # 销毁本帧标记的物体
+        with self._profile("destroy"):
+            self._flushDestroyQueue()
+
+        # 给流式播放的音频补充数据(没有创建AudioManager时跳过)
+        if AudioManager._instance is not None:
+            AudioManager._instance.update_streams()
+
+        # 模拟全部完成之后再渲染，画面中是本帧最终的位置
+        if self.camera is not None:
+            self.camera.refresh()
+        if self.render_enabled:
+            with self._profile("render"):
+                self.render()
+
+        if profiler is not None:
+            profiler.end_frame()
+
+    def _profile(self, name):
+        """开启逐帧分析时返回记录到name项目的计时区间，否则返回什么都不做的空区间"""
+        if self.profiler is None:
+            return _NULL_SPAN
+        return self.profiler.span(name)
+
+    def blit(self, surface, position, area=None, special_flags=0, z=0, layer=0):
+        """
+        所有组件都通过这里按屏幕坐标绘制
+
+        绘制不会立即发生，而是提交到渲染队列，所有物体更新完之后按 (排序层layer, z) 从小到大绘制，
+        两者都相同时保持提交顺序。
+        """
+        self.render_queue.submit(surface, position, area, special_flags, z, layer)
+
+    def blits(self, sequence, rect=None, z=0, layer=0):
+        """
+        批量提交 [(surface, 屏幕坐标), ...]，整批作为渲染队列中的一项，不逐个参与排序
+
+        rect为这批绘制覆盖的屏幕区域，开启脏矩形渲染时整块登记；不给时逐个登记。
+        """
+        self.render_queue.submit_batch(sequence, rect, z, layer)
+
+    def blit_world(self, surface, position, area=None, special_flags=0, z=0, layer=0):
+        """按世界坐标绘制；有摄像机时换算成屏幕坐标，完全在视口外的直接跳过"""
+        camera = self.camera
+        if camera is not None:
+            width, height = surface.get_size() if area is None else area[2:]
+            if not camera.is_visible((position[0], position[1], width, height)):
+                camera.culled_count += 1
+                return
+            position = camera.world_to_screen(position)
+        self.render_queue.submit(surface, position, area, special_flags, z, layer)
+
+    def draw_command(self, callback, z=0, layer=0):
+        """提交无法用blit表示的绘制(如pygame.draw)：callback(canvas)在轮到它时调用，返回改动的矩形"""
+        self.render_queue.submit_command(callback, z, layer)
+
+    def flush_render_queue(self):
+        """按排序绘制本帧提交的所有内容"""
+        self.render_queue.flush(self.canvas, self.dirty_renderer)
+
+    def world_to_screen(self, position):
+        """世界坐标换算为屏幕坐标"""
+        if self.camera is None:
+            return position
+        return self.camera.world_to_screen(position)
+
+    def world_rect_to_screen(self, rect):
+        """世界坐标的矩形换算为屏幕坐标的矩形"""
+        rect = pygame.Rect(rect)
+        if self.camera is not None:
+            rect.topleft = self.camera.world_to_screen(rect.topleft)
+        return rect
+
+    def mark_dirty(self, rect):
+        """直接在画布上绘制(如pygame.draw)之后，用返回的矩形登记改动区域"""
+        if self.dirty_renderer is not None:
+            self.dirty_renderer.add(rect)
+        return rect
+
+    def enable_dirty_rects(self, background_color=(0, 0, 0)):
+        """开启脏矩形渲染，返回渲染器；静态层会合成到渲染器的背景中"""
+        self.dirty_renderer = DirtyRectRenderer(self.canvas, background_color)
+        return self.dirty_renderer
+
+    def enable_profiler(self, window=300):
+        """开启逐帧耗时分析，window为计算百分位数使用的最近帧数"""
+        self.profiler = FrameProfiler(window)
+        return self.profiler
+
+    def enable_array_store(self, capacity=1024):
+        """开启数组存储，并把碰撞检测切换为基于数组的向量化宽检测；需要安装NumPy"""
+        from UnityFrame.ArrayStore import ArrayStore, ArrayBroadPhase
+        if self.array_store is None:
+            self.array_store = ArrayStore(capacity)
+            self.collision_manager.set_broad_phase(ArrayBroadPhase(self.array_store))
+        return self.array_store
+
+    def disable_profiler(self):
+        self.profiler = None
         
     def update(self):
         for gameObject in self.gameObjects:
             if gameObject.active==True:
                 gameObject.update(self.delta_time)
+    def render(self):
+        """渲染阶段：在update、fixUpdate和碰撞检测之后调用各组件的render，最后按排序一次性绘制"""
+        with self._profile("StaticLayer"):
+            self._beginRender()
+        for gameObject in self.gameObjects:
+            if gameObject.active==True:
+                gameObject.render()
+        self.collision_manager.draw_debug()
+        with self._profile("RenderQueue.flush"):
+            self.flush_render_queue()
+    def _beginRender(self):
+        """画静态层；静态层在所有物体之下，脏矩形渲染时已经合成在背景里"""
+        if self.dirty_renderer is None:
+            self.static_layer.draw()
     def fixUpdate(self):
+        self._savePreviousPositions()
         for gameObject in self.gameObjects:
             if gameObject.active==True:
                 gameObject.fixUpdate()
+        if self.array_store is not None:
+            with self._profile("ArrayStore.integrate"):
+                self.array_store.integrate(self.fixed_delta_time)
+    def _savePreviousPositions(self):
+        """记录每个物体在本次固定更新之前的位置，渲染时在两次固定更新之间插值"""
+        for gameObject in self.gameObjects:
+            if gameObject.transform is not None:
+                gameObject.transform.previous_position = gameObject.transform.position
     def addGameobject(self,gameObject):
         if gameObject.name in self.gameObjectDic:
             print("添加物体失败！试图添加相同名称的物体")
             return
         else:
             self.gameObjectDic[gameObject.name]=gameObject
-        if self.started==False:
-            self.gameObjects.append(gameObject)
-        else:
-            gameObject.awake()
-            if gameObject.active==True:
-                gameObject.start()
+        # 游戏开始后创建的物体在添加完组件之后需要调用startGameObject
+        self.gameObjects.append(gameObject)
+    def startGameObject(self,gameObject):
+        """游戏开始后动态创建的物体，添加完组件后调用此方法执行awake和start"""
+        gameObject.awake()
+        if gameObject.active==True:
+            gameObject.start()
+    def destroyGameObject(self,gameObject):
+        """标记物体在本帧结束时销毁，避免在遍历物体列表的过程中修改列表"""
+        if gameObject not in self.destroyQueue:
+            self.destroyQueue.append(gameObject)
+    def _flushDestroyQueue(self):
+        """从管理器中移除标记的物体，并调用组件的onDestroy释放资源"""
+        # onDestroy中可能继续销毁其他物体，直到队列清空为止
+        while self.destroyQueue:
+            destroyQueue,self.destroyQueue=self.destroyQueue,[]
+            destroyed=set(destroyQueue)
+            self.gameObjects=[gameObject for gameObject in self.gameObjects if gameObject not in destroyed]
+            for gameObject in destroyQueue:
+                if self.gameObjectDic.get(gameObject.name) is gameObject:
+                    del self.gameObjectDic[gameObject.name]
+                gameObject.onDestroy()
     def findGameObjectByName(self,name):
         if name in self.gameObjectDic.keys():
             return self.gameObjectDic[name]
@@ -97,6 +314,416 @@ class GameObjectManager:
         """设置目标帧率"""
         self.target_fps = fps
 
+class DirtyRectRenderer:
+    """
+    脏矩形渲染器
+
+    背景色和静态层合成为一张背景。每帧开始时只用背景恢复上一帧画过的区域，
+    结束时只把上一帧和本帧画过的区域提交到屏幕(pygame.display.update(rects))，
+    不再每帧填充整个画布、重画全屏背景再flip。改动面积超过屏幕的一定比例时退回整屏提交；
+    静态层重新烘焙后背景随之更新，并整屏刷新一次。
+    """
+    def __init__(self, canvas, background_color=(0, 0, 0), full_update_ratio=0.5):
+        self.canvas = canvas
+        self.background = canvas.copy()  # 与画布格式相同的背景
+        self.background_color = background_color
+        self.layer_state = None  # 背景对应的 (静态层版本, 摄像机偏移)
+        self.full_update_ratio = full_update_ratio
+        self.screen_rect = canvas.get_rect()
+        self.rects = []            # 本帧画过的区域
+        self.previous_rects = []   # 上一帧画过的区域，本帧开始时需要擦除
+        self.full_update = True    # 下一次提交整个屏幕(第一帧或背景改变后)
+
+    def _update_background(self):
+        """静态层有变化或摄像机移动时重新合成背景"""
+        manager = GameObjectManager.instance
+        static_layer = manager.static_layer
+        layer = static_layer.get_surface()
+        layer_state = (static_layer.version, manager.camera.offset if manager.camera else None)
+        if layer_state == self.layer_state:
+            return
+        self.background.fill(self.background_color)
+        if layer is not None:
+            self.background.blit(layer, manager.world_to_screen(static_layer.origin))
+        self.layer_state = layer_state
+        self.full_update = True
+
+    def add(self, rect):
+        rect = rect.clip(self.screen_rect)
+        if rect.width and rect.height:
+            self.rects.append(rect)
+
+    def begin_frame(self):
+        """用背景擦除上一帧画过的区域；需要整屏刷新时直接铺满背景"""
+        self._update_background()
+        if self.full_update:
+            self.canvas.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous_rects:
+                self.canvas.blit(self.background, rect, rect)
+
+    def present(self, display=True):
+        """提交本帧改动的区域，返回提交的矩形数量(整屏为1)"""
+        rects = self.previous_rects + self.rects
+        self.previous_rects, self.rects = self.rects, []
+        area = sum(rect.width * rect.height for rect in rects)
+        if self.full_update or area > self.screen_rect.width * self.screen_rect.height * self.full_update_ratio:
+            self.full_update = False
+            if display:
+                pygame.display.flip()
+            return 1
+        if display and rects:
+            pygame.display.update(rects)
+        return len(rects)
+
+class StaticLayer:
+    """
+    静态层
+
+    标记为static的渲染组件按 (sortingOrder, 注册顺序) 烘焙到一张刚好包住它们的Surface上，
+    每帧只需要一次blit。每帧比较各组件的图片、位置和启用状态，有变化时才重新烘焙。
+    静态层使用世界坐标，origin为Surface左上角的世界坐标，绘制时由摄像机换算和裁剪。
+    """
+    def __init__(self):
+        self.renderers = []     # 注册的静态渲染组件
+        self.signatures = None  # 上次烘焙时各组件的状态
+        self.surface = None     # 烘焙结果，没有静态组件时为None
+        self.origin = (0, 0)    # surface左上角的世界坐标
+        self.version = 0        # 每次重新烘焙加一
+
+    def register(self, renderer):
+        if renderer not in self.renderers:
+            self.renderers.append(renderer)
+            self.signatures = None
+
+    def unregister(self, renderer):
+        if renderer in self.renderers:
+            self.renderers.remove(renderer)
+            self.signatures = None
+
+    def invalidate(self):
+        """强制下次使用时重新烘焙"""
+        self.signatures = None
+
+    def get_surface(self):
+        """返回烘焙好的静态层，必要时先重新烘焙"""
+        signatures = [renderer.static_signature() for renderer in self.renderers]
+        if signatures != self.signatures:
+            self._rebuild()
+            self.signatures = signatures
+        return self.surface
+
+    def _rebuild(self):
+        self.version += 1
+        rects = [rect for rect in (renderer.world_rect() for renderer in self.renderers) if rect is not None]
+        if not rects:
+            self.surface = None
+            return
+        bounds = rects[0].unionall(rects[1:])
+        surface = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        # sorted是稳定排序，sortingOrder相同时保持注册顺序
+        for renderer in sorted(self.renderers, key=lambda renderer: renderer.sortingOrder):
+            renderer.draw_to(surface, (-bounds.x, -bounds.y))
+        self.surface = surface
+        self.origin = bounds.topleft
+
+    # 静态层整体所在的排序层，在所有排序层不小于0的内容之下；脏矩形渲染时静态层本来就合成在背景里
+    SORTING_LAYER = -1
+
+    def draw(self):
+        """把静态层提交到渲染队列，视口外的部分由blit裁剪"""
+        surface = self.get_surface()
+        if surface is not None:
+            GameObjectManager.instance.blit_world(surface, self.origin, layer=StaticLayer.SORTING_LAYER)
+
+class RenderQueue:
+    """
+    渲染队列
+
+    组件在update中提交 (排序层, z, 绘制内容)，每帧所有物体更新完之后由GameObjectManager调用flush：
+    按 (排序层, z) 稳定排序一次，把所有blit合并成一次canvas.blits调用，减少Python层的调用开销，
+    绘制顺序也不再依赖物体在列表中的位置。pygame.draw这类绘制作为命令提交，轮到它时先提交之前累积的blit。
+    """
+    BLIT = 0
+    BATCH = 1
+    COMMAND = 2
+
+    _sort_key = staticmethod(itemgetter(0, 1))
+
+    def __init__(self):
+        self.entries = []  # (排序层, z, 类型, 内容, 覆盖区域)
+
+    def submit(self, surface, position, area=None, special_flags=0, z=0, layer=0):
+        if area is None and not special_flags:
+            self.entries.append((layer, z, RenderQueue.BLIT, (surface, position), None))
+        else:
+            self.entries.append((layer, z, RenderQueue.BLIT, (surface, position, area, special_flags), None))
+
+    def submit_batch(self, sequence, rect=None, z=0, layer=0):
+        """整批blit作为一项提交，rect为整批覆盖的区域(用于脏矩形)"""
+        self.entries.append((layer, z, RenderQueue.BATCH, sequence, rect))
+
+    def submit_command(self, callback, z=0, layer=0):
+        self.entries.append((layer, z, RenderQueue.COMMAND, callback, None))
+
+    def clear(self):
+        self.entries = []
+
+    def flush(self, canvas, dirty_renderer=None):
+        """排序并绘制所有提交的内容，然后清空队列"""
+        entries, self.entries = self.entries, []
+        if not entries:
+            return
+        entries.sort(key=RenderQueue._sort_key)  # 稳定排序，相同 (排序层, z) 保持提交顺序
+        sequence = []
+        covered = []  # 自带覆盖区域的批量绘制在sequence中的 (起点, 终点, 区域)
+        for entry in entries:
+            kind = entry[2]
+            if kind == RenderQueue.BLIT:
+                sequence.append(entry[3])
+            elif kind == RenderQueue.BATCH:
+                if entry[4] is not None:
+                    covered.append((len(sequence), len(sequence) + len(entry[3]), entry[4]))
+                sequence.extend(entry[3])
+            else:
+                self._blits(canvas, sequence, covered, dirty_renderer)
+                sequence, covered = [], []
+                changed = entry[3](canvas)
+                if dirty_renderer is not None and changed is not None:
+                    dirty_renderer.add(changed)
+        self._blits(canvas, sequence, covered, dirty_renderer)
+
+    @staticmethod
+    def _blits(canvas, sequence, covered, dirty_renderer):
+        if not sequence:
+            return
+        if dirty_renderer is None:
+            canvas.blits(sequence, doreturn=0)
+            return
+        # 逐个登记改动区域，自带覆盖区域的批量绘制只登记一次
+        changed = canvas.blits(sequence)
+        index = 0
+        for start, end, rect in covered:
+            for rect_changed in changed[index:start]:
+                dirty_renderer.add(rect_changed)
+            dirty_renderer.add(rect)
+            index = end
+        for rect_changed in changed[index:]:
+            dirty_renderer.add(rect_changed)
+
+class KeySnapshot:
+    """某一帧的按键状态，用法与pygame.key.get_pressed()的返回值相同: keys[pygame.K_a]"""
+    __slots__ = ("pressed",)
+
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+class Input:
+    """
+    输入管理器(单例)
+
+    GameObjectManager每帧开始时调用new_frame采样一次按键，组件通过Input.get_pressed()读取，
+    同一帧内读到的状态一致。设置了脚本时按脚本给出每帧的按键，用于无窗口模拟和自动测试。
+
+    录制时每帧把tracked_keys的按下状态压成一个16位掩码，连续相同的帧合并为 (掩码, 帧数)，
+    同时记录每帧的帧时间，保存为紧凑的二进制文件；回放时把文件解码成脚本逐帧还原按键，
+    并让GameObjectManager使用录制时的帧时间，固定更新的次数和动画进度都与录制时一致。
+    """
+    _instance = None
+
+    RECORDING_MAGIC = b"HKIN"
+    RECORDING_VERSION = 2  # 版本2增加了帧时间；版本1的录像仍可回放，但只能保证按键一致
+
+    def __init__(self):
+        if Input._instance is not None:
+            raise Exception("Input is a singleton class")
+        else:
+            Input._instance = self
+
+        self.frame = 0        # 已采样的帧数
+        self.script = None    # 脚本: frame -> 按下的键
+        self.current = None   # 本帧的按键状态
+
+        # 录制与回放
+        self.tracked_keys = (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_s,
+                             pygame.K_j, pygame.K_k, pygame.K_SPACE, pygame.K_e)  # 游戏用到的键，最多16个
+        self.recording = None      # 正在录制时为每帧掩码的列表
+        self.recording_frame_times = None  # 正在录制时为每帧帧时间(秒)的列表
+        self.replay_length = 0     # 正在回放的录像帧数
+        self.replay_frame_times = None  # 回放录像中每帧的帧时间，0表示无窗口的固定帧时间
+        self.replay_frame_time = None   # 本帧应使用的帧时间，不在回放或录像没有帧时间时为None
+
+    @staticmethod
+    def get_instance():
+        """获取单例实例"""
+        if Input._instance is None:
+            Input()
+        return Input._instance
+
+    @staticmethod
+    def get_pressed():
+        """获取本帧的按键状态"""
+        instance = Input.get_instance()
+        if instance.current is None:
+            instance.new_frame()
+        return instance.current
+
+    def new_frame(self, delta_time=None):
+        """采样新一帧的按键状态；delta_time为本帧的帧时间，录制时一并保存"""
+        if self.script is None:
+            self.current = pygame.key.get_pressed()
+        else:
+            self.current = KeySnapshot(self.script(self.frame))
+        if self.recording is not None:
+            mask = 0
+            for bit, key in enumerate(self.tracked_keys):
+                if self.current[key]:
+                    mask |= 1 << bit
+            self.recording.append(mask)
+            self.recording_frame_times.append(delta_time)
+        if self.replay_frame_times is not None and self.frame < len(self.replay_frame_times):
+            self.replay_frame_time = self.replay_frame_times[self.frame]
+        else:
+            self.replay_frame_time = None
+        self.frame += 1
+
+    def set_script(self, script):
+        """
+        设置输入脚本，None表示恢复读取键盘
+
+        参数:
+            script: 接收帧序号、返回该帧按下的键的函数，或 parse_schedule 能解析的字符串
+        """
+        if isinstance(script, str):
+            script = Input.parse_schedule(script)
+        self.script = script
+        self.frame = 0
+        self.current = None
+        self.replay_length = 0
+        self.replay_frame_times = None
+        self.replay_frame_time = None
+
+    def start_recording(self):
+        """从下一帧开始录制按键和帧时间"""
+        self.recording = []
+        self.recording_frame_times = []
+
+    def stop_recording(self):
+        """停止录制，返回编码后的录像数据"""
+        masks, self.recording = self.recording or [], None
+        frame_times, self.recording_frame_times = self.recording_frame_times or [], None
+        return Input.encode_recording(self.tracked_keys, masks, frame_times)
+
+    def save_recording(self, path):
+        """停止录制并写入文件，返回录制的帧数"""
+        frames = len(self.recording or [])
+        with open(path, "wb") as f:
+            f.write(self.stop_recording())
+        return frames
+
+    def play_recording(self, data):
+        """以录像数据作为输入脚本，录像结束后不再有按键；录像带有帧时间时按录制时的帧时间推进"""
+        keys, masks, frame_times = Input.decode_recording(data)
+
+        def script(frame):
+            if frame >= len(masks):
+                return ()
+            mask = masks[frame]
+            return [key for bit, key in enumerate(keys) if mask >> bit & 1]
+        self.set_script(script)
+        self.replay_length = len(masks)
+        self.replay_frame_times = frame_times
+
+    def load_recording(self, path):
+        """读取录像文件并开始回放，返回录像帧数"""
+        with open(path, "rb") as f:
+            self.play_recording(f.read())
+        return self.replay_length
+
+    @staticmethod
+    def _run_lengths(values, limit=0xFFFF):
+        """把连续相同的值合并为 [值, 个数]"""
+        runs = []
+        for value in values:
+            if runs and runs[-1][0] == value and runs[-1][1] < limit:
+                runs[-1][1] += 1
+            else:
+                runs.append([value, 1])
+        return runs
+
+    @staticmethod
+    def encode_recording(keys, masks, frame_times=None):
+        """
+        编码录像: 文件头(魔数、版本、键数、帧数、掩码游程数) + 键码表 + 掩码游程 (掩码, 帧数)
+        + 帧时间游程 (毫秒, 帧数)，均为小端
+
+        窗口模式的帧时间来自clock.tick，总是整数毫秒，按毫秒保存可以精确还原；
+        不是整数毫秒的帧时间(无窗口模式的 1/目标帧率)以及没有给出帧时间的帧记为0，回放时使用 1/目标帧率。
+        """
+        if frame_times is None:
+            frame_times = [None] * len(masks)
+        milliseconds = []
+        for frame_time in frame_times:
+            value = 0 if frame_time is None else int(round(frame_time * 1000))
+            milliseconds.append(value if value > 0 and value / 1000.0 == frame_time else 0)
+        mask_runs = Input._run_lengths(masks)
+        time_runs = Input._run_lengths(milliseconds)
+        data = [Input.RECORDING_MAGIC,
+                struct.pack("<BBII", Input.RECORDING_VERSION, len(keys), len(masks), len(mask_runs)),
+                struct.pack("<%dI" % len(keys), *keys)]
+        data.extend(struct.pack("<HH", mask, count) for mask, count in mask_runs)
+        data.extend(struct.pack("<IH", value, count) for value, count in time_runs)
+        return b"".join(data)
+
+    @staticmethod
+    def decode_recording(data):
+        """解码录像，返回 (键码表, 每帧掩码列表, 每帧帧时间列表)；版本1的录像没有帧时间，最后一项为None"""
+        if data[:4] != Input.RECORDING_MAGIC:
+            raise ValueError("不是有效的输入录像文件")
+        version = data[4]
+        if version == 1:
+            key_count, frame_count = struct.unpack_from("<BI", data, 5)
+            offset = 4 + struct.calcsize("<BBI")
+        elif version == Input.RECORDING_VERSION:
+            key_count, frame_count, mask_run_count = struct.unpack_from("<BII", data, 5)
+            offset = 4 + struct.calcsize("<BBII")
+        else:
+            raise ValueError("不支持的录像版本: %d" % version)
+        keys = struct.unpack_from("<%dI" % key_count, data, offset)
+        offset += 4 * key_count
+        mask_end = len(data) if version == 1 else offset + struct.calcsize("<HH") * mask_run_count
+        masks = []
+        for mask, count in struct.iter_unpack("<HH", data[offset:mask_end]):
+            masks.extend([mask] * count)
+        frame_times = None
+        if version != 1:
+            frame_times = []
+            for value, count in struct.iter_unpack("<IH", data[mask_end:]):
+                frame_times.extend([value / 1000.0] * count)
+        if len(masks) != frame_count or (frame_times is not None and len(frame_times) != frame_count):
+            raise ValueError("录像数据不完整")
+        return keys, masks, frame_times
+
+    @staticmethod
+    def parse_schedule(text):
+        """
+        解析形如 "d:10-40,k:20-25" 的按键时间表: 键名:起始帧-结束帧(不含)，返回脚本函数
+        """
+        schedule = []
+        for part in filter(None, (item.strip() for item in text.split(","))):
+            name, frames = part.split(":")
+            start, end = frames.split("-")
+            schedule.append((pygame.key.key_code(name), int(start), int(end)))
+
+        def script(frame):
+            return [key for key, start, end in schedule if start <= frame < end]
+        return script
+
 class GameObject:
     def __init__(self,name,active=True):
         self.name=name
@@ -124,19 +751,46 @@ class GameObject:
                 component.start()
         self.started=True
 
+    # 开启逐帧分析时，各组件的耗时按 阶段:组件类名 汇总，update另外按物体记录 object:物体名；
+    # 已销毁物体的项目在连续window帧没有出现后由FrameProfiler移除
     def update(self,deltaTime):
         if self.active==False:
             return
+        profiler = GameObjectManager.instance.profiler
+        if profiler is None:
+            for component in self.components:
+                if component.enable:
+                    component.update(deltaTime)
+            return
+        with profiler.span("object:" + self.name):
+            for component in self.components:
+                if component.enable:
+                    with profiler.span("update:" + component.__class__.__name__):
+                        component.update(deltaTime)
+
+    def fixUpdate(self):
+        if self.active==False:
+            return
+        profiler = GameObjectManager.instance.profiler
         for component in self.components:
             if component.enable:
-                component.update(deltaTime)
+                if profiler is None:
+                    component.fixUpdate()
+                else:
+                    with profiler.span("fixUpdate:" + component.__class__.__name__):
+                        component.fixUpdate()
 
-    def fixUpdate(self):
+    def render(self):
         if self.active==False:
             return
+        profiler = GameObjectManager.instance.profiler
         for component in self.components:
             if component.enable:
-                component.fixUpdate()
+                if profiler is None:
+                    component.render()
+                else:
+                    with profiler.span("render:" + component.__class__.__name__):
+                        component.render()
     def onEnable(self):
         if self.active==True:
             for component in self.components:
@@ -148,16 +802,20 @@ class GameObject:
     def onDestroy(self):
         for component in self.components:
             component.onDestroy()
+    def destroy(self):
+        """在本帧结束时销毁物体"""
+        GameObjectManager.instance.destroyGameObject(self)
     def addComponent(self,componentType,*args,**kwargs):
         for component in self.components:
             if isinstance(component,componentType):
                 print("添加组件失败： 尝试重复添加相同组件！")
                 return
-        component=componentType(self,*args,**kwargs)
+        with StartupProfiler.get_instance().span(self.name + ".addComponent(" + componentType.__name__ + ")"):
+            component=componentType(self,*args,**kwargs)
         if component==None:
             print("实例化组件失败！")
             return
-        if component.__class__.__name__=="Transform":
+        if component.__class__.__name__ in ("Transform","ArrayTransform"):
             self.transform=component
         self.components.append(component)
         print("添加 "+ str(componentType)+" 组件成功！")
@@ -186,26 +844,302 @@ class Component:
         pass
     def fixUpdate(self):
         pass
+    def render(self):
+        # 渲染阶段，在update、fixUpdate和碰撞检测之后调用；只负责提交绘制，不修改游戏状态
+        pass
     def onDisable(self):
         pass
     def onDestroy(self):
         pass
 
+class BroadPhase:
+    """碰撞检测的宽检测阶段基类，负责筛选出可能相交的碰撞体对"""
+    def find_pairs(self, colliders):
+        """
+        返回可能发生碰撞的索引对列表
+
+        参数:
+            colliders: 本帧参与检测的碰撞体列表
+        返回:
+            按 (i, j) 升序排列的索引对，且 i < j，保证事件触发顺序与遍历顺序一致
+        """
+        raise NotImplementedError
+
+class BruteForceBroadPhase(BroadPhase):
+    """暴力宽检测：返回所有碰撞体对，O(n²)"""
+    def find_pairs(self, colliders):
+        count = len(colliders)
+        return [(i, j) for i in range(count) for j in range(i + 1, count)]
+
+class SpatialHashBroadPhase(BroadPhase):
+    """空间哈希宽检测：把碰撞体的包围盒映射到均匀网格中，只有落在同一格子里的碰撞体才会被配对"""
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size  # 网格单元大小(像素)，建议略大于常见碰撞体尺寸
+
+    def find_pairs(self, colliders):
+        cell_size = self.cell_size
+        cells = {}
+        for index, collider in enumerate(colliders):
+            left, top, right, bottom = collider.get_bounds()
+            for cell_x in range(int(left // cell_size), int(right // cell_size) + 1):
+                for cell_y in range(int(top // cell_size), int(bottom // cell_size) + 1):
+                    bucket = cells.get((cell_x, cell_y))
+                    if bucket is None:
+                        cells[(cell_x, cell_y)] = [index]
+                    else:
+                        bucket.append(index)
+
+        # 同一格子内的索引按加入顺序递增，直接组成 i < j 的对；跨多个格子的对用集合去重
+        pairs = set()
+        for bucket in cells.values():
+            count = len(bucket)
+            if count < 2:
+                continue
+            for a in range(count - 1):
+                first = bucket[a]
+                for b in range(a + 1, count):
+                    pairs.add((first, bucket[b]))
+        return sorted(pairs)
+
+class StaticColliderGrid:
+    """
+    静态碰撞体的均匀网格索引
+
+    静态碰撞体不会移动，网格只在静态碰撞体增删时重建一次；每帧用动态碰撞体的包围盒查询可能相交的静态碰撞体。
+    """
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def rebuild(self, colliders):
+        cell_size = self.cell_size
+        cells = {}
+        for collider in colliders:
+            left, top, right, bottom = collider.get_bounds()
+            for cell_x in range(int(left // cell_size), int(right // cell_size) + 1):
+                for cell_y in range(int(top // cell_size), int(bottom // cell_size) + 1):
+                    bucket = cells.get((cell_x, cell_y))
+                    if bucket is None:
+                        cells[(cell_x, cell_y)] = [collider]
+                    else:
+                        bucket.append(collider)
+        self.cells = cells
+
+    def query(self, bounds):
+        """返回与包围盒所在格子重叠的静态碰撞体集合"""
+        cell_size = self.cell_size
+        left, top, right, bottom = bounds
+        found = set()
+        for cell_x in range(int(left // cell_size), int(right // cell_size) + 1):
+            for cell_y in range(int(top // cell_size), int(bottom // cell_size) + 1):
+                bucket = self.cells.get((cell_x, cell_y))
+                if bucket is not None:
+                    found.update(bucket)
+        return found
+
+class RaycastHit:
+    """射线检测的结果"""
+    def __init__(self, collider, point, distance, normal):
+        self.collider = collider  # 击中的碰撞体
+        self.point = point        # 击中点的世界坐标
+        self.distance = distance  # 从起点到击中点的距离
+        self.normal = normal      # 击中表面的法线
+
 class CollisionManager:
-    def __init__(self):
+    ALL_LAYERS = 0xFFFFFFFF  # 包含所有层的层掩码
+    LAYER_COUNT = 32
+
+    def __init__(self, broad_phase=None):
         self.colliders = []
         self.collision_pairs = {}  # 跟踪已经发生碰撞的对象对
         self.debug_draw = False  # 是否绘制碰撞体的调试视图
+        self.broad_phase = broad_phase if broad_phase is not None else SpatialHashBroadPhase()
+
+        # 静态碰撞体(地面、椅子等不会移动的物体)单独建立索引，静态与静态之间从不检测
+        self.static_colliders = []
+        self.static_grid = StaticColliderGrid()
+        self.static_dirty = True  # 静态碰撞体有增删，下次更新前需要重建索引
+        self.next_order = 0  # 碰撞体加入的序号，决定碰撞对中两者的先后和事件的触发顺序
+
+        # 按标签和层索引的碰撞体，列表内保持加入顺序，供overlap_box、raycast等查询使用
+        self.tag_index = {}
+        self.layer_index = {}
+
+        # 层碰撞矩阵：layer_collision_masks[n]的第m位为1表示第n层与第m层之间需要检测，默认全部检测
+        self.layer_names = {0: "Default"}
+        self.layer_collision_masks = [self.ALL_LAYERS] * self.LAYER_COUNT
+
+    def define_layer(self, layer, name):
+        """给层命名，之后可以用名字查询层号"""
+        if not 0 <= layer < self.LAYER_COUNT:
+            raise ValueError(f"层号必须在0到{self.LAYER_COUNT - 1}之间: {layer}")
+        self.layer_names[layer] = name
+        return layer
+
+    def name_to_layer(self, name):
+        """根据名字获取层号，没有定义的名字返回-1"""
+        for layer, layer_name in self.layer_names.items():
+            if layer_name == name:
+                return layer
+        return -1
+
+    def layer_mask(self, *names):
+        """由层名(或层号)组成层掩码，用于overlap_box、raycast的layer_mask参数"""
+        mask = 0
+        for name in names:
+            layer = name if isinstance(name, int) else self.name_to_layer(name)
+            if layer < 0:
+                raise ValueError(f"没有定义的层: {name}")
+            mask |= 1 << layer
+        return mask
+
+    def _to_layer(self, layer):
+        """层名转换为层号，层号原样返回"""
+        if isinstance(layer, int):
+            return layer
+        result = self.name_to_layer(layer)
+        if result < 0:
+            raise ValueError(f"没有定义的层: {layer}")
+        return result
+
+    def ignore_layer_collision(self, layer1, layer2, ignore=True):
+        """设置两个层(层号或层名)之间是否忽略碰撞，矩阵是对称的"""
+        layer1, layer2 = self._to_layer(layer1), self._to_layer(layer2)
+        masks = self.layer_collision_masks
+        if ignore:
+            masks[layer1] &= ~(1 << layer2)
+            masks[layer2] &= ~(1 << layer1)
+        else:
+            masks[layer1] |= 1 << layer2
+            masks[layer2] |= 1 << layer1
+
+    def layers_collide(self, layer1, layer2):
+        """两个层之间是否需要检测碰撞"""
+        return bool(self.layer_collision_masks[self._to_layer(layer1)] >> self._to_layer(layer2) & 1)
+
+    def set_broad_phase(self, broad_phase):
+        """切换宽检测算法，已有的碰撞记录保持不变"""
+        self.broad_phase = broad_phase
 
     def add_collider(self, collider):
         """添加碰撞体到管理器"""
         if collider not in self.colliders:
+            collider.order = self.next_order
+            self.next_order += 1
             self.colliders.append(collider)
+            self.tag_index.setdefault(collider.tag, []).append(collider)
+            self.layer_index.setdefault(collider.layer, []).append(collider)
+            if collider.static:
+                self.static_colliders.append(collider)
+                self.static_dirty = True
+
+    @staticmethod
+    def _index_remove(index, key, collider):
+        bucket = index.get(key)
+        if bucket is not None and collider in bucket:
+            bucket.remove(collider)
+            if not bucket:
+                del index[key]
+
+    @staticmethod
+    def _index_insert(index, key, collider):
+        """按加入顺序插入到索引中"""
+        bucket = index.setdefault(key, [])
+        position = len(bucket)
+        while position > 0 and bucket[position - 1].order > collider.order:
+            position -= 1
+        bucket.insert(position, collider)
+
+    def set_tag(self, collider, tag):
+        """修改碰撞体的标签并更新标签索引"""
+        if collider in self.colliders:
+            self._index_remove(self.tag_index, collider.tag, collider)
+            self._index_insert(self.tag_index, tag, collider)
+        collider.tag = tag
+
+    def set_layer(self, collider, layer):
+        """修改碰撞体的层并更新层索引"""
+        if collider in self.colliders:
+            self._index_remove(self.layer_index, collider.layer, collider)
+            self._index_insert(self.layer_index, layer, collider)
+        collider.layer = layer
+
+    def set_static(self, collider, static):
+        """切换碰撞体的静态/动态分类"""
+        if collider.static == static:
+            return
+        collider.static = static
+        if collider in self.colliders:
+            if static:
+                self.static_colliders.append(collider)
+            else:
+                self.static_colliders.remove(collider)
+            self.static_dirty = True
+
+    def invalidate_static(self):
+        """移动了静态碰撞体之后调用，下次更新前重建静态索引"""
+        self.static_dirty = True
+
+    def merge_static_colliders(self, colliders=None):
+        """
+        把相邻或重叠、能拼成一个矩形的静态矩形碰撞体合并，返回被合并掉的碰撞体数量
+
+        保留每组中最先加入的碰撞体并扩大它的尺寸，其余的从管理器中移除并停用。只合并标签、层和
+        触发器设置相同的碰撞体；通常在关卡加载完成后调用一次。
+        """
+        boxes = [collider for collider in (colliders if colliders is not None else self.static_colliders)
+                 if collider.static and collider.enabled and hasattr(collider, "width") and collider in self.colliders]
+        rects = {collider: collider.get_rect() for collider in boxes}
+        merged_count = 0
+        changed = True
+        while changed:
+            changed = False
+            # 先合并上下边对齐的横向相邻矩形，再合并左右边对齐的纵向相邻矩形
+            for horizontal in (True, False):
+                if horizontal:
+                    key = lambda collider: (collider.tag, collider.layer, collider.isTrigger,
+                                            rects[collider].top, rects[collider].bottom, rects[collider].left)
+                else:
+                    key = lambda collider: (collider.tag, collider.layer, collider.isTrigger,
+                                            rects[collider].left, rects[collider].right, rects[collider].top)
+                ordered = sorted(boxes, key=key)
+                survivors = []
+                for collider in ordered:
+                    if survivors:
+                        last = survivors[-1]
+                        a, b = rects[last], rects[collider]
+                        if key(last)[:5] == key(collider)[:5] and (
+                                b.left <= a.right if horizontal else b.top <= a.bottom):
+                            keep, drop = (last, collider) if last.order < collider.order else (collider, last)
+                            rects[keep] = a.union(b)
+                            survivors[-1] = keep
+                            self.remove_collider(drop)
+                            drop.enabled = False
+                            merged_count += 1
+                            changed = True
+                            continue
+                    survivors.append(collider)
+                boxes = survivors
+
+        # 用合并后的矩形更新保留下来的碰撞体
+        for collider in boxes:
+            rect = rects[collider]
+            if rect != collider.get_rect():
+                position = collider.gameObject.transform.position
+                collider.width, collider.height = rect.width, rect.height
+                collider.offset = (rect.centerx - position[0], rect.centery - position[1])
+        self.static_dirty = True
+        return merged_count
 
     def remove_collider(self, collider):
         """从管理器中移除碰撞体"""
         if collider in self.colliders:
             self.colliders.remove(collider)
+            self._index_remove(self.tag_index, collider.tag, collider)
+            self._index_remove(self.layer_index, collider.layer, collider)
+            if collider in self.static_colliders:
+                self.static_colliders.remove(collider)
+                self.static_dirty = True
             # 清理碰撞记录
             pairs_to_remove = []
             for pair in self.collision_pairs:
@@ -215,52 +1149,158 @@ class CollisionManager:
             for pair in pairs_to_remove:
                 del self.collision_pairs[pair]
 
+    def get_colliders(self, tags=None, layer_mask=ALL_LAYERS):
+        """按标签和层掩码筛选碰撞体，按加入顺序返回；tags为None时不限标签"""
+        if tags is None:
+            if layer_mask == self.ALL_LAYERS:
+                return list(self.colliders)
+            buckets = [bucket for layer, bucket in self.layer_index.items() if layer_mask & (1 << layer)]
+        else:
+            if isinstance(tags, str):
+                tags = (tags,)
+            buckets = [self.tag_index[tag] for tag in tags if tag in self.tag_index]
+        if len(buckets) == 1:
+            result = [collider for collider in buckets[0] if layer_mask & (1 << collider.layer)]
+        else:
+            result = [collider for bucket in buckets for collider in bucket if layer_mask & (1 << collider.layer)]
+            result.sort(key=lambda collider: collider.order)
+        return result
+
+    def _query_candidates(self, bounds, tags, layer_mask):
+        """
+        查询可能与包围盒相交的碰撞体，按加入顺序返回
+
+        静态碰撞体通过静态网格只取附近的，动态碰撞体从标签/层索引中取
+        """
+        if self.static_dirty:
+            self.static_grid.rebuild(self.static_colliders)
+            self.static_dirty = False
+        if isinstance(tags, str):
+            tags = (tags,)
+        candidates = [collider for collider in self.static_grid.query(bounds)
+                      if (tags is None or collider.tag in tags) and layer_mask & (1 << collider.layer)]
+        candidates += [collider for collider in self.get_colliders(tags, layer_mask) if not collider.static]
+        candidates.sort(key=lambda collider: collider.order)
+        return candidates
+
+    def overlap_box(self, rect, tags=None, layer_mask=ALL_LAYERS, include_triggers=True, exclude=None):
+        """
+        返回与世界坐标矩形相交的碰撞体列表(按加入顺序)
+
+        参数:
+            rect: pygame.Rect或 (x, y, 宽, 高)
+            tags: 只返回这些标签的碰撞体，可以是单个字符串
+            layer_mask: 层掩码，第n位为1表示包含第n层
+            exclude: 不返回的碰撞体(通常是自己)
+        """
+        rect = pygame.Rect(rect)
+        result = []
+        for collider in self._query_candidates((rect.left, rect.top, rect.right, rect.bottom), tags, layer_mask):
+            if collider is exclude or not collider.enabled or not collider.gameObject.active:
+                continue
+            if collider.isTrigger and not include_triggers:
+                continue
+            if collider.overlaps_rect(rect):
+                result.append(collider)
+        return result
+
+    def raycast(self, origin, direction, max_distance=10000, tags=None, layer_mask=ALL_LAYERS,
+                include_triggers=False, exclude=None):
+        """
+        从origin沿direction发射射线，返回最近的RaycastHit，没有击中返回None
+
+        direction不需要是单位向量；只检测射线包围盒附近的静态碰撞体
+        """
+        length = (direction[0] * direction[0] + direction[1] * direction[1]) ** 0.5
+        if length == 0:
+            return None
+        direction = (direction[0] / length, direction[1] / length)
+        end = (origin[0] + direction[0] * max_distance, origin[1] + direction[1] * max_distance)
+        bounds = (min(origin[0], end[0]), min(origin[1], end[1]), max(origin[0], end[0]), max(origin[1], end[1]))
+
+        nearest = None
+        for collider in self._query_candidates(bounds, tags, layer_mask):
+            if collider is exclude or not collider.enabled or not collider.gameObject.active:
+                continue
+            if collider.isTrigger and not include_triggers:
+                continue
+            hit = collider.intersect_ray(origin, direction, max_distance)
+            if hit is not None and (nearest is None or hit[0] < nearest[0]):
+                nearest = (hit[0], hit[1], collider)
+        if nearest is None:
+            return None
+        distance, normal, collider = nearest
+        point = (origin[0] + direction[0] * distance, origin[1] + direction[1] * distance)
+        return RaycastHit(collider, point, distance, normal)
+
     def update(self):
         """更新所有碰撞检测"""
         # 创建当前帧的碰撞对集合
         current_collisions = set()
-        
-        # 检测所有碰撞体之间的碰撞
-        for i, collider1 in enumerate(self.colliders):
-            if not collider1.enabled or not collider1.gameObject.active:
-                continue
-                
-            for collider2 in self.colliders[i+1:]:
-                if not collider2.enabled or not collider2.gameObject.active:
-                    continue
-                    
-                # 跳过同一游戏对象上的碰撞体之间的检测
-                if collider1.gameObject == collider2.gameObject:
-                    continue
-                
-                # 确保碰撞对的排序一致性
-                collision_pair = tuple(sorted([collider1, collider2], key=id))
-                
-                # 检查碰撞
-                is_colliding = collider1.check_collision(collider2)
-                
-                if is_colliding:
-                    current_collisions.add(collision_pair)
-                    
-                    # 如果这是新的碰撞
-                    if collision_pair not in self.collision_pairs:
-                        self.collision_pairs[collision_pair] = True
-                        
-                        # 触发Enter事件
-                        if collider1.isTrigger or collider2.isTrigger:
-                            collider1.on_trigger_enter(collider2)
-                            collider2.on_trigger_enter(collider1)
+
+        if self.static_dirty:
+            self.static_grid.rebuild(self.static_colliders)
+            self.static_dirty = False
+
+        # 只让启用且激活的动态碰撞体参与宽检测，保持它们在管理器中的相对顺序；
+        # 所在层与任何层都不检测的碰撞体直接排除
+        masks = self.layer_collision_masks
+        dynamic_colliders = [collider for collider in self.colliders
+                             if not collider.static and collider.enabled and collider.gameObject.active
+                             and masks[collider.layer]]
+
+        # 动态与动态之间用宽检测筛选，动态与静态之间查询静态网格，静态与静态之间不检测；
+        # 层碰撞矩阵中不检测的碰撞对在精确检测之前剔除
+        candidate_pairs = []
+        for i, j in self.broad_phase.find_pairs(dynamic_colliders):
+            collider1, collider2 = dynamic_colliders[i], dynamic_colliders[j]
+            if masks[collider1.layer] >> collider2.layer & 1:
+                candidate_pairs.append((collider1, collider2))
+        if self.static_colliders:
+            for collider in dynamic_colliders:
+                mask = masks[collider.layer]
+                for static_collider in self.static_grid.query(collider.get_bounds()):
+                    if mask >> static_collider.layer & 1 and static_collider.enabled and static_collider.gameObject.active:
+                        # 按加入顺序排列碰撞对，(前, 后) 即可作为稳定的碰撞对键
+                        if static_collider.order < collider.order:
+                            candidate_pairs.append((static_collider, collider))
                         else:
-                            collider1.on_collision_enter(collider2)
-                            collider2.on_collision_enter(collider1)
+                            candidate_pairs.append((collider, static_collider))
+            candidate_pairs.sort(key=lambda pair: (pair[0].order, pair[1].order))
+
+        # 逐对做精确检测
+        for collision_pair in candidate_pairs:
+            collider1, collider2 = collision_pair
+
+            # 跳过同一游戏对象上的碰撞体之间的检测
+            if collider1.gameObject == collider2.gameObject:
+                continue
+
+            # 检查碰撞
+            is_colliding = collider1.check_collision(collider2)
+
+            if is_colliding:
+                current_collisions.add(collision_pair)
+
+                # 如果这是新的碰撞
+                if collision_pair not in self.collision_pairs:
+                    self.collision_pairs[collision_pair] = True
+
+                    # 触发Enter事件
+                    if collider1.isTrigger or collider2.isTrigger:
+                        collider1.on_trigger_enter(collider2)
+                        collider2.on_trigger_enter(collider1)
                     else:
-                        # 触发Stay事件
-                        if collider1.isTrigger or collider2.isTrigger:
-                            collider1.on_trigger_stay(collider2)
-                            collider2.on_trigger_stay(collider1)
-                        else:
-                            collider1.on_collision_stay(collider2)
-                            collider2.on_collision_stay(collider1)
+                        collider1.on_collision_enter(collider2)
+                        collider2.on_collision_enter(collider1)
+                else:
+                    # 触发Stay事件
+                    if collider1.isTrigger or collider2.isTrigger:
+                        collider1.on_trigger_stay(collider2)
+                        collider2.on_trigger_stay(collider1)
+                    else:
+                        collider1.on_collision_stay(collider2)
+                        collider2.on_collision_stay(collider1)
                             
         # 检查结束的碰撞
         ended_collisions = set(self.collision_pairs.keys()) - current_collisions
@@ -276,7 +1316,8 @@ class CollisionManager:
                 collider1.on_collision_exit(collider2)
                 collider2.on_collision_exit(collider1)
         
-        # 绘制碰撞体调试视图
+    def draw_debug(self):
+        """渲染阶段由管理器调用，绘制碰撞体调试视图"""
         if self.debug_draw:
             for collider in self.colliders:
                 if hasattr(collider, 'draw_debug') and collider.enabled:
@@ -286,24 +1327,413 @@ class CollisionManager:
         """切换碰撞体调试视图的显示状态"""
         self.debug_draw = not self.debug_draw
 
+class AssetCache:
+    """
+    全局图片资源缓存
+
+    以路径(和缩放尺寸)为键共享Surface，同一张图片在整个进程中只解码和convert_alpha一次。
+    每次load增加引用计数，release减少引用计数；总占用超过预算时，按最近最少使用顺序
+    淘汰引用计数为0的图片，仍被引用的图片不会被淘汰。
+    注册图集后，图集中包含的图片会以图集大图的subsurface返回，不再单独打开文件。
+    preload可以在后台线程池中读取和解码图片，只能在主线程执行的convert_alpha由pump
+    按每帧的时间预算分批完成，加载期间画面可以继续刷新。
+    """
+    _instance = None
+
+    def __init__(self, budget_bytes=256 * 1024 * 1024, loader_threads=4):
+        if AssetCache._instance is not None:
+            raise Exception("AssetCache is a singleton class")
+        else:
+            AssetCache._instance = self
+
+        self.budget_bytes = budget_bytes  # 缓存占用上限(字节)
+        self.used_bytes = 0               # 当前缓存占用(字节)
+        self.entries = OrderedDict()      # 键 -> [surface, 引用计数, 字节数, 所属图集键]，按最近使用排序
+        self.folder_listings = {}         # (目录, 前缀, 后缀) -> 排序后的文件路径列表
+        self.atlas_frames = {}            # 规范化的图片路径 -> (图集大图路径, (x, y, 宽, 高))
+
+        # 后台预加载相关
+        self.loader_threads = loader_threads  # 解码线程数
+        self.executor = None                  # 首次预加载时创建的线程池
+        self.pending = {}                     # 键 -> 等待转换完成的Future
+        self.decoded = queue.Queue()          # 后台线程解码完成、等待主线程转换的 (键, 路径, 图片)
+
+    @staticmethod
+    def get_instance():
+        """获取单例实例"""
+        if AssetCache._instance is None:
+            AssetCache()
+        return AssetCache._instance
+
+    @staticmethod
+    def _make_key(path, size=None):
+        return (os.path.normcase(os.path.normpath(path)), tuple(size) if size else None)
+
+    def register_atlas(self, index_path):
+        """
+        注册由 Tools/AtlasBuilder.py 生成的图集索引
+
+        注册后，索引中列出的图片路径在load时会返回图集上的subsurface
+        """
+        with open(index_path, encoding="utf-8") as index_file:
+            index = json.load(index_file)
+        sheet_path = os.path.join(os.path.dirname(index_path), index["image"])
+        for frame_path, rect in index["frames"].items():
+            self.atlas_frames[os.path.normcase(os.path.normpath(frame_path))] = (sheet_path, tuple(rect))
+        # 图集可能覆盖已经缓存过的目录，清空目录缓存让其重新生成
+        self.folder_listings.clear()
+        print(f"注册图集 {index_path}: {len(index['frames'])} 帧")
+
+    def list_folder(self, folder, prefix="", suffix=""):
+        """列出目录下以prefix开头、suffix结尾的图片路径（按文件名排序），结果会被缓存"""
+        listing_key = (os.path.normcase(os.path.normpath(folder)), prefix, suffix)
+        paths = self.folder_listings.get(listing_key)
+        if paths is None:
+            # 目录已被图集收录时直接使用图集索引，不再访问文件系统
+            names = [os.path.basename(path) for path in self.atlas_frames
+                     if os.path.dirname(path) == listing_key[0]]
+            if not names:
+                names = os.listdir(folder)
+            paths = [os.path.join(folder, f) for f in sorted(names)
+                     if f.startswith(prefix) and f.endswith(suffix)]
+            self.folder_listings[listing_key] = paths
+        return paths
+
+    def preload(self, paths):
+        """
+        在后台线程中读取并解码图片，返回与路径一一对应的Future列表
+
+        Future在主线程调用pump完成convert_alpha、图片进入缓存之后才会完成。预加载的图片
+        引用计数为0，之后用load获取时不再需要解码。
+        """
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.loader_threads, thread_name_prefix="AssetLoader")
+        futures = []
+        for path in paths:
+            # 图集中的图片只需要预加载所在的图集大图
+            atlas_frame = self.atlas_frames.get(self._make_key(path)[0])
+            if atlas_frame is not None:
+                path = atlas_frame[0]
+            key = self._make_key(path)
+            future = self.pending.get(key)
+            if future is None:
+                future = Future()
+                entry = self.entries.get(key)
+                if entry is not None:
+                    future.set_result(entry[0])
+                else:
+                    self.pending[key] = future
+                    self.executor.submit(self._decode_in_background, key, path)
+            futures.append(future)
+        return futures
+
+    def preload_folder(self, folder, suffixes=(".png",)):
+        """递归预加载目录下的所有图片，返回Future列表"""
+        paths = []
+        for root, _, files in os.walk(folder):
+            for name in sorted(files):
+                if name.lower().endswith(suffixes):
+                    paths.append(os.path.join(root, name))
+        return self.preload(paths)
+
+    def _decode_in_background(self, key, path):
+        """后台线程：只做文件读取和解码，不涉及显示相关的操作"""
+        try:
+            self.decoded.put((key, path, pygame.image.load(path)))
+        except Exception as e:
+            self.decoded.put((key, path, e))
+
+    def pump(self, budget_ms=4.0):
+        """
+        在主线程中把后台解码好的图片convert_alpha并放入缓存，耗时超过budget_ms后停止，
+        剩下的留到下一帧。返回本次处理的图片数量
+        """
+        deadline = time.perf_counter() + budget_ms / 1000.0
+        processed = 0
+        while self.pending and time.perf_counter() < deadline:
+            try:
+                key, path, image = self.decoded.get_nowait()
+            except queue.Empty:
+                break
+            future = self.pending.pop(key, None)
+            if isinstance(image, Exception):
+                print(f"无法加载图片 {path}: {image}")
+                if future is not None:
+                    future.set_exception(image)
+                continue
+            entry = self.entries.get(key)
+            if entry is None:
+                # 期间可能已经被同步load过，此时直接复用已有的图片
+                image = self._convert(image)
+                entry = [image, 0, image.get_pitch() * image.get_height(), None]
+                self.entries[key] = entry
+                self.used_bytes += entry[2]
+                self._evict()
+            if future is not None:
+                future.set_result(entry[0])
+            processed += 1
+        return processed
+
+    def is_loading(self):
+        """是否还有预加载的图片没有完成"""
+        return bool(self.pending)
+
+    def load(self, path, size=None):
+        """
+        获取图片Surface并增加一次引用
+
+        参数:
+            path: 图片路径
+            size: 可选的缩放尺寸 (宽, 高)，缩放后的图片同样会被缓存共享
+        """
+        key = self._make_key(path, size)
+        entry = self.entries.get(key)
+        if entry is None:
+            entry = self._create_entry(key)
+            self.entries[key] = entry
+            self.used_bytes += entry[2]
+        else:
+            self.entries.move_to_end(key)
+        entry[1] += 1
+        self._evict()
+        return entry[0]
+
+    def release(self, path, size=None):
+        """释放一次引用，引用计数为0的图片在超出预算时会被淘汰"""
+        self._release_key(self._make_key(path, size))
+        self._evict()
+
+    def set_budget(self, budget_bytes):
+        """设置缓存预算(字节)，并立即按新预算淘汰"""
+        self.budget_bytes = budget_bytes
+        self._evict()
+
+    def clear(self):
+        """清空所有未被引用的图片"""
+        while self._evict_one():
+            pass
+
+    def _create_entry(self, key):
+        """解码图片并生成缓存条目；带尺寸的请求在原图基础上缩放，图集中的图片返回subsurface"""
+        path, size = key
+        if size is not None:
+            image = pygame.transform.scale(self.load(path), size)
+            self._release_key((path, None))
+            return [image, 0, image.get_pitch() * image.get_height(), None]
+
+        atlas_frame = self.atlas_frames.get(path)
+        if atlas_frame is not None:
+            # subsurface与图集共享像素，不计入占用；条目存在期间持有图集的一次引用
+            sheet_path, rect = atlas_frame
+            sheet = self.load(sheet_path)
+            return [sheet.subsurface(rect), 0, 0, self._make_key(sheet_path)]
+
+        image = self._convert(pygame.image.load(path))
+        return [image, 0, image.get_pitch() * image.get_height(), None]
+
+    @staticmethod
+    def _convert(image):
+        """转换为显示格式以加快绘制；无窗口运行时没有显示格式，保持原样"""
+        if pygame.display.get_surface() is None:
+            return image
+        return image.convert_alpha()  # convert_alpha保留透明度
+
+    def _release_key(self, key):
+        entry = self.entries.get(key)
+        if entry is not None and entry[1] > 0:
+            entry[1] -= 1
+
+    def _evict_one(self):
+        """淘汰最久未使用且没有引用的一张图片，没有可淘汰的返回False"""
+        for key, entry in self.entries.items():
+            if entry[1] == 0:
+                del self.entries[key]
+                self.used_bytes -= entry[2]
+                if entry[3] is not None:
+                    self._release_key(entry[3])
+                return True
+        return False
+
+    def _evict(self):
+        """按最近最少使用顺序淘汰未被引用的图片，直到占用不超过预算"""
+        while self.used_bytes > self.budget_bytes and self._evict_one():
+            pass
+
+class EffectCache:
+    """
+    特效Surface预烘焙缓存
+
+    按 (原图, 缩放, 翻转, 透明度) 缓存处理好的Surface，同一种组合只做一次
+    scale/flip/copy/set_alpha，之后直接复用；缓存条目数量有限，超出时按LRU淘汰。
+    """
+    _instance = None
+
+    def __init__(self, max_entries=256):
+        if EffectCache._instance is not None:
+            raise Exception("EffectCache is a singleton class")
+        else:
+            EffectCache._instance = self
+
+        self.max_entries = max_entries  # 最多缓存的烘焙结果数量
+        self.entries = OrderedDict()    # 键 -> (原图, 烘焙结果)，按最近使用排序
+
+    @staticmethod
+    def get_instance():
+        """获取单例实例"""
+        if EffectCache._instance is None:
+            EffectCache()
+        return EffectCache._instance
+
+    def get(self, surface, scale=1.0, flipX=False, alpha=None):
+        """
+        获取烘焙后的特效Surface
+
+        参数:
+            surface: 原始特效图片
+            scale: 缩放比例
+            flipX: 是否水平翻转
+            alpha: 整体透明度(0-255)，None表示不修改
+        """
+        flipX = bool(flipX)
+        key = (id(surface), scale, flipX, alpha)
+        entry = self.entries.get(key)
+        # 同时比对原图本身，防止原图被回收后id被复用
+        if entry is not None and entry[0] is surface:
+            self.entries.move_to_end(key)
+            return entry[1]
+
+        baked = self._bake(surface, scale, flipX, alpha)
+        self.entries[key] = (surface, baked)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return baked
+
+    def _bake(self, surface, scale, flipX, alpha):
+        """依次应用缩放、翻转、透明度，每一步都基于缓存中的上一步结果"""
+        if alpha is not None:
+            # 复制一份再设置透明度，避免修改其他组合共享的Surface
+            baked = self.get(surface, scale, flipX).copy()
+            baked.set_alpha(alpha)
+            return baked
+        if flipX:
+            return pygame.transform.flip(self.get(surface, scale), True, False)
+        if scale != 1.0:
+            return pygame.transform.scale(surface, (int(surface.get_width() * scale), int(surface.get_height() * scale)))
+        return surface
+
+    def clear(self):
+        """清空所有烘焙结果"""
+        self.entries.clear()
+
+class AudioStream:
+    """
+    把WAV文件分段读取、在一个Channel上边读边播(流式播放)
+
+    每段chunk_seconds秒的采样数据包装成一个小的Sound，用Channel.queue排在正在播放的那段后面；
+    update每帧检查一次，排队的那段开始播放后再读取下一段，同一时间最多只有两段已解码的数据。
+    只支持与混音器采样率相同的16位单声道/立体声WAV，其他格式用can_stream判断后改为整体解码。
+    """
+    def __init__(self, path, channel, loops=0, chunk_seconds=0.5):
+        self.path = path
+        self.channel = channel
+        self.loops = loops  # 还要重复播放的次数，-1表示无限循环
+        self.reader = wave.open(path, "rb")
+        self.frame_bytes = self.reader.getnchannels() * self.reader.getsampwidth()
+        self.chunk_frames = max(1, int(self.reader.getframerate() * chunk_seconds))
+        self.mono_to_stereo = self.reader.getnchannels() == 1 and pygame.mixer.get_init()[2] == 2
+        self.finished = False
+
+    @staticmethod
+    def can_stream(path):
+        """文件格式是否可以不经转换直接交给混音器"""
+        frequency, size, channels = pygame.mixer.get_init()
+        try:
+            with wave.open(path, "rb") as reader:
+                return (reader.getframerate() == frequency and size == -16 and reader.getsampwidth() == 2
+                        and reader.getnchannels() in (1, channels) and reader.getnframes() > 0)
+        except (wave.Error, EOFError, OSError):
+            return False
+
+    def _read_chunk(self):
+        """读取下一段采样，到文件末尾时按循环次数回到开头接着读，返回Sound；全部播完返回None"""
+        wanted = self.chunk_frames * self.frame_bytes
+        data = self.reader.readframes(self.chunk_frames)
+        while len(data) < wanted and self.loops != 0:
+            if self.loops > 0:
+                self.loops -= 1
+            self.reader.rewind()
+            data += self.reader.readframes((wanted - len(data)) // self.frame_bytes)
+        if not data:
+            return None
+        if self.mono_to_stereo or sys.byteorder == "big":
+            # WAV是小端16位采样，混音器使用本机字节序的立体声
+            samples = array("h", data)
+            if sys.byteorder == "big":
+                samples.byteswap()
+            if self.mono_to_stereo:
+                stereo = array("h", bytes(len(data) * 2))
+                stereo[0::2] = samples
+                stereo[1::2] = samples
+                samples = stereo
+            data = samples.tobytes()
+        return pygame.mixer.Sound(buffer=data)
+
+    def update(self):
+        """排队的那段已经开始播放(或通道空闲)时补充下一段，返回是否还在播放"""
+        if self.finished:
+            return False
+        if self.channel.get_queue() is None:
+            chunk = self._read_chunk()
+            if chunk is None:
+                self.reader.close()
+                self.finished = True
+                return self.channel.get_busy()
+            if self.channel.get_busy():
+                self.channel.queue(chunk)
+            else:
+                # 刚开始播放(或卡顿导致两段都已播完)：先播这一段，再立即排上下一段
+                self.channel.play(chunk)
+                return self.update()
+        return True
+
+    def stop(self):
+        self.channel.stop()
+        if not self.finished:
+            self.reader.close()
+            self.finished = True
+
+
 class AudioManager:
     _instance = None
     
-    def __init__(self):
+    def __init__(self, budget_bytes=64 * 1024 * 1024, stream_threshold_bytes=2 * 1024 * 1024):
         if AudioManager._instance is not None:
             raise Exception("AudioManager is a singleton class")
         else:
             AudioManager._instance = self
             
         pygame.mixer.init()  # 初始化音频系统
-        self.sounds = {}     # 存储单个加载的音效
-        self.sound_groups = {}  # 存储音效组，每个组包含多个相似音效
+        self.sounds = {}     # 单个音效: 名称 -> 文件路径
+        self.sound_groups = {}  # 音效组: 组名 -> 文件路径列表，每个组包含多个相似音效
         self.volumes = {     # 音效类别的音量配置
             "Others": 0.5,
         }
+
+        # 延迟加载相关
+        self.sound_categories = {}   # 文件路径 -> 类别，用于设置音量
+        self.ambient_paths = set()   # 长时间循环的环境音，默认无限循环
+        self.stream_paths = set()    # 以流的方式播放的长音频（分段读取，不整体解码）
+        self.reserved_channels = {}  # 环境音和流式音频的文件路径 -> 保留的Channel，首次播放时分配
+        self.streams = {}            # 正在流式播放的音频: 文件路径 -> AudioStream
+        self.loaded = OrderedDict()  # 已解码的音效: 文件路径 -> [Sound, 字节数]，按最近使用排序
+        self.budget_bytes = budget_bytes  # 已解码音效的内存上限(字节)
+        self.used_bytes = 0
+        self.stream_threshold_bytes = stream_threshold_bytes  # 超过该大小的文件默认以流的方式播放
+        self.lock = threading.Lock()  # 后台预加载线程与主线程共享解码缓存
         
-        # 加载所有音效
-        self._load_all_sounds()
+        # 登记所有音效（只记录路径，首次播放时才解码）
+        with StartupProfiler.get_instance().span("AudioManager._load_all_sounds"):
+            self._load_all_sounds()
     
     @staticmethod
     def get_instance():
@@ -313,12 +1743,17 @@ class AudioManager:
         return AudioManager._instance
     
     def _load_all_sounds(self):
-        """加载所有音效文件"""
+        """登记所有音效文件，不做解码"""
         # 单个音效
         sound_categories = {
             "Knight": ["run","dash", "land","jump","doublejump","falling"],
+            "Scene": ["WindCaveLoop"],
+            "Others": ["Salubra_Blessing_Loop"],
         }
         
+        # 长时间循环的环境音，始终以流的方式播放
+        ambient_sounds = {"WindCaveLoop", "Salubra_Blessing_Loop"}
+        
         # 音效组 - 每个动作的多个变体
         sound_group_categories = {
             "Knight": {
@@ -326,17 +1761,15 @@ class AudioManager:
             }
         }
         
-        # 加载单个音效
+        # 登记单个音效
         for category, sound_names in sound_categories.items():
             for sound_name in sound_names:
                 path = f"Assets/Audios/{category}/{sound_name}.wav"
                 if os.path.exists(path):
-                    sound = pygame.mixer.Sound(path)
-                    sound.set_volume(self.volumes.get(category, 0.5))
-                    self.sounds[sound_name] = sound
-                    print(f"Loaded sound: {sound_name}")
+                    ambient = sound_name in ambient_sounds
+                    self.register_sound(sound_name, path, category, ambient=ambient, stream=True if ambient else None)
         
-        # 加载音效组
+        # 登记音效组
         for category, groups in sound_group_categories.items():
             for group_name, count in groups.items():
                 self.sound_groups[group_name] = []
@@ -346,41 +1779,215 @@ class AudioManager:
                     path = f"Assets/Audios/{category}/{sound_name}.wav"
                     
                     if os.path.exists(path):
-                        sound = pygame.mixer.Sound(path)
-                        sound.set_volume(self.volumes.get(category, 0.5))
-                        self.sound_groups[group_name].append(sound)
-                        print(f"Loaded sound for group {group_name}: {sound_name}")
+                        self.register_sound(group_name, path, category, group=True)
+
+    def register_sound(self, sound_name, path, category="Others", group=False, ambient=False, stream=None):
+        """
+        登记一个音效，只记录路径，首次播放或预加载时才解码
+
+        参数:
+            sound_name: 音效名称（group为True时是音效组名）
+            path: 文件路径
+            category: 音量类别
+            group: 是否加入音效组（播放时从组内随机选择）
+            ambient: 是否为环境循环音（默认无限循环）
+            stream: 是否以流的方式播放，None表示按文件大小自动决定
+
+        环境音和流式音频都在自己的保留通道上播放，不会被其他音效挤掉，也不占用背景音乐的music通道。
+        """
+        if group:
+            self.sound_groups.setdefault(sound_name, []).append(path)
+        else:
+            self.sounds[sound_name] = path
+        self.sound_categories[path] = category
+        if ambient:
+            self.ambient_paths.add(path)
+        else:
+            self.ambient_paths.discard(path)
+        if stream is None:
+            stream = os.path.getsize(path) > self.stream_threshold_bytes
+        if stream:
+            self.stream_paths.add(path)
+        else:
+            self.stream_paths.discard(path)
+
+    def get_sound(self, path):
+        """获取已解码的Sound，未解码时立即解码，并在超出预算时淘汰空闲的音效"""
+        with self.lock:
+            entry = self.loaded.get(path)
+            if entry is not None:
+                self.loaded.move_to_end(path)
+                return entry[0]
+        # 解码在锁外进行，避免阻塞其他线程
+        sound = pygame.mixer.Sound(path)
+        sound.set_volume(self.volumes.get(self.sound_categories.get(path), 0.5))
+        with self.lock:
+            entry = self.loaded.get(path)
+            if entry is None:
+                entry = [sound, self._sound_bytes(sound)]
+                self.loaded[path] = entry
+                self.used_bytes += entry[1]
+                print(f"Loaded sound: {path}")
+            self.loaded.move_to_end(path)
+            self._evict()
+            return entry[0]
+
+    def _sound_bytes(self, sound):
+        """按混音器格式估算一个Sound解码后占用的内存"""
+        frequency, size, channels = pygame.mixer.get_init()
+        return int(sound.get_length() * frequency * channels * (abs(size) // 8))
+
+    def _evict(self):
+        """按最近最少使用顺序淘汰当前没有在播放的音效，直到占用不超过预算（调用时需持有锁）"""
+        if self.used_bytes <= self.budget_bytes:
+            return
+        for path in list(self.loaded.keys()):
+            if self.used_bytes <= self.budget_bytes:
+                break
+            sound, size = self.loaded[path]
+            if sound.get_num_channels() == 0:
+                del self.loaded[path]
+                self.used_bytes -= size
+
+    def set_budget(self, budget_bytes):
+        """设置已解码音效的内存上限(字节)"""
+        with self.lock:
+            self.budget_bytes = budget_bytes
+            self._evict()
+
+    def _resolve_paths(self, names):
+        """把音效名或音效组名展开为文件路径"""
+        paths = []
+        for name in names:
+            if name in self.sounds:
+                paths.append(self.sounds[name])
+            elif name in self.sound_groups:
+                paths.extend(self.sound_groups[name])
+            else:
+                print(f"Sound not found: {name}")
+        return paths
+
+    def preload(self, names, background=True):
+        """
+        预先解码指定的音效或音效组，流式音频会被跳过
+
+        参数:
+            names: 音效名/音效组名列表
+            background: 为True时在后台线程中解码并返回该线程，否则在当前线程同步解码
+        """
+        paths = [path for path in self._resolve_paths(names) if path not in self.stream_paths]
+
+        def load_paths():
+            for path in paths:
+                self.get_sound(path)
+
+        if not background:
+            load_paths()
+            return None
+        thread = threading.Thread(target=load_paths, name="AudioPreloader", daemon=True)
+        thread.start()
+        return thread
+
+    def preload_category(self, category, background=True):
+        """预加载某个类别下登记的所有音效"""
+        names = [name for name, path in self.sounds.items() if self.sound_categories[path] == category]
+        names += [name for name, paths in self.sound_groups.items()
+                  if any(self.sound_categories[path] == category for path in paths)]
+        return self.preload(names, background)
     
-    def play_sound(self, sound_name):
-        """播放指定名称的音效"""
+    def play_sound(self, sound_name, loops=None):
+        """
+        播放指定名称的音效，首次播放时才解码
+
+        loops为None时按登记的类型决定：环境循环音无限循环，其他音效播放一次。
+        流式音频在自己的保留通道上分段播放(见AudioStream)，不会替换music通道上的背景音乐；
+        格式无法直接流式播放的文件退回整体解码。
+        """
         if sound_name in self.sounds:
-            self.sounds[sound_name].play()
+            path = self.sounds[sound_name]
         elif sound_name in self.sound_groups:
             # 如果是音效组，随机选择一个播放
-            if self.sound_groups[sound_name]:
-                random.choice(self.sound_groups[sound_name]).play()
+            if not self.sound_groups[sound_name]:
+                return
+            path = random.choice(self.sound_groups[sound_name])
         else:
             print(f"Sound not found: {sound_name}")
+            return
+
+        if loops is None:
+            loops = -1 if path in self.ambient_paths else 0
+        if path in self.stream_paths and AudioStream.can_stream(path):
+            self.play_stream(path, loops)
+        elif path in self.ambient_paths or path in self.stream_paths:
+            # 同一个环境音重复播放时替换自己通道上的循环，而不是叠加
+            self._reserved_channel(path).play(self.get_sound(path), loops)
+        else:
+            self.get_sound(path).play(loops)
+
+    def play_stream(self, path, loops=0):
+        """在该文件的保留通道上流式播放，已经在播放的同一文件从头开始"""
+        stream = self.streams.pop(path, None)
+        if stream is not None:
+            stream.stop()
+        channel = self._reserved_channel(path)
+        channel.set_volume(self.volumes.get(self.sound_categories.get(path), 0.5))
+        stream = AudioStream(path, channel, loops)
+        if stream.update():
+            self.streams[path] = stream
+
+    def update_streams(self):
+        """给正在流式播放的音频补充数据，由GameObjectManager每帧调用"""
+        if not self.streams:
+            return
+        for path, stream in list(self.streams.items()):
+            if not stream.update():
+                del self.streams[path]
+
+    def stop_sound(self, sound_name):
+        """停止指定名称的音效（音效组停止组内所有音效）"""
+        for path in self._resolve_paths([sound_name]):
+            stream = self.streams.pop(path, None)
+            if stream is not None:
+                stream.stop()
+            channel = self.reserved_channels.get(path)
+            if channel is not None:
+                channel.stop()
+            with self.lock:
+                entry = self.loaded.get(path)
+            if entry is not None:
+                entry[0].stop()
+
+    def _reserved_channel(self, path):
+        """为环境音或流式音频分配一个保留通道，保留通道不会被Sound.play自动选用"""
+        channel = self.reserved_channels.get(path)
+        if channel is None:
+            index = len(self.reserved_channels)
+            # 保留通道之外至少留8个通道给普通音效
+            if pygame.mixer.get_num_channels() < index + 1 + 8:
+                pygame.mixer.set_num_channels(index + 1 + 8)
+            pygame.mixer.set_reserved(index + 1)
+            channel = pygame.mixer.Channel(index)
+            self.reserved_channels[path] = channel
+        return channel
     
     def set_volume(self, category, volume):
         """设置某个类别的音量 (0.0 to 1.0)"""
         if category in self.volumes:
             self.volumes[category] = max(0.0, min(1.0, volume))
             
-            # 更新该类别下所有音效的音量
-            for name, sound in self.sounds.items():
-                if any(name.startswith(key) for key in self.volumes.keys() if key == category):
-                    sound.set_volume(self.volumes[category])
-            
-            # 更新音效组的音量
-            for group_name, sounds in self.sound_groups.items():
-                if any(group_name.startswith(key) for key in self.volumes.keys() if key == category):
-                    for sound in sounds:
-                        sound.set_volume(self.volumes[category])
+            # 更新该类别下所有已解码音效的音量，未解码的音效会在解码时使用新音量
+            with self.lock:
+                for path, entry in self.loaded.items():
+                    if self.sound_categories.get(path) == category:
+                        entry[0].set_volume(self.volumes[category])
+            # 流式音频的音量设置在通道上
+            for path, stream in self.streams.items():
+                if self.sound_categories.get(path) == category:
+                    stream.channel.set_volume(self.volumes[category])
 
     def play_background_music(self, music_file, volume=0.5, loop=-1):
         """
-        播放背景音乐
+        播放背景音乐，通过pygame.mixer.music以流的方式播放(边读边播，不整体解码)
         
         参数:
             music_file: 音乐文件路径